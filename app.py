@@ -1,45 +1,113 @@
-from flask import Flask, render_template, session, jsonify
-from dotenv import load_dotenv
-import os
+from flask import Flask, make_response, render_template, request, send_from_directory, session, jsonify, url_for
 from datetime import timedelta
+import mimetypes
+import config
+from services.logging_setup import configure_logging
 
-# Load environment variables first
-load_dotenv()
+# Before the routes are imported, so their import-time messages are formatted too
+configure_logging(config.LOG_LEVEL, config.LOG_FORMAT)
 
-# Import blueprints after loading env
 from routes.auth import auth_bp
 from routes.entries import entries_bp
 from routes.transcribe import transcribe_bp
-from services.supabase_service import supabase_service
+from routes.insights import insights_bp
+from routes.stats import stats_bp
+from routes.metrics import metrics_bp
+from services.supabase_service import supabase_client
+from services.lazy import readiness
+from services.assets import AssetManifest, IMMUTABLE_CACHE_CONTROL
+from services.json_provider import make_json_provider
+from services.compression import compress_response
 
 app = Flask(__name__)
-app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret-key")
+app.secret_key = config.SECRET_KEY
 app.permanent_session_lifetime = timedelta(days=7)
 app.config['SESSION_COOKIE_SECURE'] = False  # Set to True if using HTTPS
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+# orjson for jsonify and request.json when installed
+app.json = make_json_provider(app)
 
-# Register blueprints
+# Register blueprints (metrics first, so its timing hooks wrap the others')
+app.register_blueprint(metrics_bp)
 app.register_blueprint(auth_bp)
 app.register_blueprint(entries_bp)
 app.register_blueprint(transcribe_bp)
+app.register_blueprint(insights_bp)
+app.register_blueprint(stats_bp)
+
+# Bundles built by build_assets.py; sources from static/src until then
+assets = AssetManifest(app.static_folder)
+
+@app.context_processor
+def asset_helpers():
+    return {'asset_url': lambda name: url_for('static', filename=assets.resolve(name))}
+
+@app.endpoint('static')
+def static_file(filename):
+    """
+    Static files; bundles go out as the gzip or brotli copies built next to
+    them when the client accepts one, so they're compressed once at build
+    time instead of never (send_file responses are not compressed per request)
+    """
+    precompressed = assets.precompressed(filename, request.accept_encodings)
+    if not precompressed:
+        response = app.send_static_file(filename)
+    else:
+        path, encoding = precompressed
+        response = send_from_directory(
+            app.static_folder, path,
+            mimetype=mimetypes.guess_type(filename)[0],
+            max_age=app.get_send_file_max_age(filename)
+        )
+        response.headers['Content-Encoding'] = encoding
+    if assets.is_fingerprinted(filename):
+        response.vary.add('Accept-Encoding')
+    return response
+
+@app.after_request
+def cache_fingerprinted_assets(response):
+    """Content-hashed bundles never change under the same name"""
+    if request.endpoint == 'static' and response.status_code == 200 \
+            and assets.is_fingerprinted(request.view_args.get('filename', '')):
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+@app.after_request
+def compress_text_responses(response):
+    """
+    gzip or brotli for JSON and page bodies. Registered after the metrics
+    hooks, so it runs before them and they record the bytes actually sent.
+    """
+    return compress_response(response, request.accept_encodings)
 
 @app.route("/")
 def home():
-    return render_template("index.html")
+    """The page shell; CSS and JS come from the long-cached bundles it links"""
+    response = make_response(render_template("index.html"))
+    # Revalidated on every visit, so a new build is picked up straight away
+    response.headers['Cache-Control'] = 'no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
 
 @app.route("/api/health")
 def health_check():
-    """Check if Supabase is connected"""
-    if supabase_service:
-        try:
-            supabase = supabase_service.get_client()
-            supabase.table('symptoms').select('count', count='exact').limit(1).execute()
-            return jsonify({"status": "healthy", "supabase": "connected"}), 200
-        except Exception as e:
-            return jsonify({"status": "unhealthy", "error": str(e)}), 500
-    else:
-        return jsonify({"status": "unhealthy", "error": "Supabase service not initialized"}), 500
+    """
+    Readiness check. Builds any service that hasn't been used yet and
+    reports each one; Supabase must also answer a query. Gemini or
+    ElevenLabs being unavailable only degrades their features.
+    """
+    services = readiness()
+    if not supabase_client:
+        return jsonify({"status": "unhealthy", "error": "Supabase service not initialized", "services": services}), 500
+    
+    try:
+        supabase_client.table('symptoms').select('count', count='exact').limit(1).execute()
+    except Exception as e:
+        return jsonify({"status": "unhealthy", "error": str(e), "services": services}), 500
+    
+    status = "healthy" if all(service['ready'] for service in services.values()) else "degraded"
+    return jsonify({"status": status, "supabase": "connected", "services": services}), 200
 
 @app.route("/api/debug/app-session")
 def debug_app_session():
@@ -50,4 +118,5 @@ def debug_app_session():
     }), 200
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    # Development server only; production runs `gunicorn wsgi:app` (see gunicorn.conf.py)
+    app.run(debug=config.DEBUG)
\ No newline at end of file
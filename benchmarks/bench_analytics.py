@@ -0,0 +1,197 @@
+"""
+Throughput benchmark for services.analytics.
+
+Generates synthetic multi-year histories (one record per logged day, in the
+shape EntryStore.fetch_columns returns) for many users and times
+build_frame + analyze per user. A sample of users is also run through a
+plain row-by-row implementation of the same statistics to show the speedup
+and check that both agree.
+
+    python -m benchmarks.bench_analytics --users 10000 --years 3
+"""
+import argparse
+import math
+import statistics
+import sys
+import time
+from collections import Counter
+from datetime import date, timedelta
+from itertools import combinations
+
+import numpy as np
+
+from benchmarks.seed import SYMPTOMS
+from services import analytics
+
+SYMPTOM_KEYS = [key for key, _, _ in SYMPTOMS]
+
+
+def synthetic_records(rng, days, end, log_rate=0.8):
+    """One user's history: periods every ~28 days, stress-linked pain, random gaps"""
+    dates = [end - timedelta(days=offset) for offset in range(days)][::-1]
+    logged = rng.random(days) < log_rate
+    cycle_length = int(rng.integers(25, 33))
+    cycle_day = (np.arange(days) + int(rng.integers(0, cycle_length))) % cycle_length
+    period = cycle_day < 5
+    stress = rng.integers(1, 6, days)
+    sick = rng.random(days) < 0.04
+    birth_control = rng.random() < 0.3
+    pain = np.clip(np.round(stress * 1.2 + period * 2 + rng.normal(0, 1.5, days)), 0, 10).astype(int)
+    symptom_flags = rng.random((days, len(SYMPTOM_KEYS))) < 0.15
+    symptom_flags[:, 1] |= period & (rng.random(days) < 0.7)
+
+    return [
+        {
+            'entry_date': dates[i].isoformat(),
+            'pain_level': int(pain[i]),
+            'stress': int(stress[i]),
+            'period': bool(period[i]),
+            'birth_control': birth_control,
+            'sick': bool(sick[i]),
+            'symptoms': [SYMPTOM_KEYS[j] for j in np.flatnonzero(symptom_flags[i])],
+        }
+        for i in np.flatnonzero(logged)
+    ]
+
+
+def rowwise_analyze(records):
+    """The same statistics computed with per-row Python loops, for comparison"""
+    by_date = {date.fromisoformat(r['entry_date']): r for r in records}
+    days = sorted(by_date)
+
+    pairs = [(r['pain_level'], r['stress']) for r in records
+             if r['pain_level'] is not None and r['stress'] is not None]
+    n = len(pairs)
+    mean_x = sum(p for p, _ in pairs) / n
+    mean_y = sum(s for _, s in pairs) / n
+    cov = sum((p - mean_x) * (s - mean_y) for p, s in pairs)
+    var_x = sum((p - mean_x) ** 2 for p, _ in pairs)
+    var_y = sum((s - mean_y) ** 2 for _, s in pairs)
+    pearson = round(cov / math.sqrt(var_x * var_y), 3)
+
+    by_stress = {}
+    for pain, stress in pairs:
+        by_stress.setdefault(stress, []).append(pain)
+    mean_pain_by_stress = {k: round(sum(v) / len(v), 2) for k, v in by_stress.items()}
+
+    cooccurrence = Counter()
+    for record in records:
+        for a, b in combinations(sorted(record['symptoms']), 2):
+            cooccurrence[(a, b)] += 1
+
+    phases = {}
+    last_start = None
+    day = days[0]
+    while day <= days[-1]:
+        record = by_date.get(day)
+        in_period = bool(record and record['period'])
+        previous = by_date.get(day - timedelta(days=1))
+        if in_period and not (previous and previous['period']):
+            last_start = day
+        if record and last_start:
+            cycle_day = (day - last_start).days + 1
+            for name, first, last in analytics.CYCLE_PHASES:
+                if first <= cycle_day <= last:
+                    phase = phases.setdefault(name, {'days': 0, 'pain': [], 'symptoms': Counter()})
+                    phase['days'] += 1
+                    phase['pain'].append(record['pain_level'])
+                    phase['symptoms'].update(record['symptoms'])
+        day += timedelta(days=1)
+
+    lagged = {}
+    for factor in ('sick', 'birth_control'):
+        flagged = [day for day in days if by_date[day][factor]]
+        for lag in range(analytics.DEFAULT_MAX_LAG + 1):
+            pains = [by_date[d + timedelta(days=lag)]['pain_level'] for d in flagged
+                     if d + timedelta(days=lag) in by_date]
+            lagged[(factor, lag)] = round(sum(pains) / len(pains), 2) if pains else None
+        quiet = [
+            by_date[day]['pain_level'] for day in days
+            if not any(
+                (day - timedelta(days=back)) in by_date and by_date[day - timedelta(days=back)][factor]
+                for back in range(analytics.DEFAULT_MAX_LAG + 1)
+            )
+        ]
+        lagged[(factor, 'baseline')] = round(sum(quiet) / len(quiet), 2) if quiet else None
+
+    return pearson, mean_pain_by_stress, cooccurrence, phases, lagged
+
+
+def vectorized_lag(result, factor, lag):
+    effects = result['lagged_effects'][factor]
+    return effects['baseline_pain'] if lag == 'baseline' else effects['mean_pain_by_lag'][lag]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--years', type=float, default=3)
+    parser.add_argument('--baseline-sample', type=int, default=100,
+                        help='users also run through the row-by-row implementation')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    days = int(args.years * 365)
+    end = date(2026, 1, 1)
+
+    vectorized_ms, rowwise_ms, logged_days = [], [], 0
+    mismatches = 0
+    started = time.perf_counter()
+
+    for user in range(args.users):
+        records = synthetic_records(rng, days, end)
+        logged_days += len(records)
+
+        t0 = time.perf_counter()
+        result = analytics.analyze(analytics.build_frame(records))
+        vectorized_ms.append((time.perf_counter() - t0) * 1000)
+
+        if user < args.baseline_sample:
+            t0 = time.perf_counter()
+            pearson, by_stress, cooccurrence, phases, lagged = rowwise_analyze(records)
+            rowwise_ms.append((time.perf_counter() - t0) * 1000)
+
+            keys = result['cooccurrence']['symptoms']
+            matrix = result['cooccurrence']['matrix']
+            same_pairs = all(
+                matrix[keys.index(a)][keys.index(b)] == count
+                for (a, b), count in cooccurrence.items()
+            )
+            same_phases = all(
+                result['period_phase'][name]['days'] == phase['days']
+                for name, phase in phases.items()
+            )
+            same_lags = all(
+                vectorized_lag(result, factor, lag) == value
+                for (factor, lag), value in lagged.items()
+            )
+            if (result['pain_vs_stress']['pearson_r'] != pearson
+                    or result['pain_vs_stress']['mean_pain_by_stress'] != by_stress
+                    or not (same_pairs and same_phases and same_lags)):
+                mismatches += 1
+
+        if (user + 1) % 1000 == 0:
+            print(f"  {user + 1} users...", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    print(f"{args.users} users x {days} days ({logged_days} logged days)")
+    print(f"vectorized: p50 {statistics.median(vectorized_ms):.1f}ms  "
+          f"p95 {percentile(vectorized_ms, 95):.1f}ms  "
+          f"total {sum(vectorized_ms) / 1000:.1f}s  (wall incl. data generation {elapsed:.1f}s)")
+    if rowwise_ms:
+        sample = vectorized_ms[:len(rowwise_ms)]
+        print(f"row-by-row ({len(rowwise_ms)} users): p50 {statistics.median(rowwise_ms):.1f}ms  "
+              f"vs vectorized p50 {statistics.median(sample):.1f}ms on the same users")
+    if mismatches:
+        print(f"❌ {mismatches} users where the vectorized and row-by-row results differ")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Round-trip benchmark for reading a user's entries.
+
+Compares the old per-entry loop against EntryStore.fetch_entries on
+FakeSupabase with growing histories, and checks that walking the history
+page by page with fetch_page returns the same entries at one round-trip per
+page. Exits non-zero if the batched path's round-trip count grows with
+history size.
+
+    python -m benchmarks.bench_entries --latency-ms 20
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.seed import seed_entries, seed_symptoms, seed_user
+from services.entry_store import EntryStore
+
+
+def legacy_fetch(client, user_id):
+    """The old N+1 loop from routes/entries.py, kept for comparison"""
+    result = client.table('journal_entries') \
+        .select('*') \
+        .eq('user_id', user_id) \
+        .order('entry_date', desc=True) \
+        .execute()
+
+    entries = []
+    for entry in result.data:
+        symptoms_result = client.table('entry_symptoms') \
+            .select('symptoms(id, symptom_key, label, icon)') \
+            .eq('entry_id', entry['id']) \
+            .execute()
+        factors_result = client.table('entry_factors') \
+            .select('*') \
+            .eq('entry_id', entry['id']) \
+            .execute()
+        entries.append({
+            **entry,
+            'symptoms': [s['symptoms'] for s in symptoms_result.data],
+            'factors': factors_result.data[0] if factors_result.data else {},
+        })
+    return entries
+
+
+def walk_pages(store, user_id, page_size):
+    """Read a whole history through fetch_page, following next_cursor"""
+    entries, cursor, pages = [], None, 0
+    while True:
+        page, cursor = store.fetch_page(user_id, limit=page_size, cursor=cursor)
+        entries.extend(page)
+        pages += 1
+        if not cursor:
+            return entries, pages
+
+
+def measure(db, fetch, user_id):
+    db.reset_round_trips()
+    start = time.perf_counter()
+    entries = fetch(user_id)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return entries, db.round_trips, elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, nargs='+', default=[7, 30, 365, 730])
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='simulated network latency per round-trip')
+    args = parser.parse_args()
+
+    print(f"{'days':>6} {'legacy trips':>13} {'legacy ms':>10} {'batched trips':>14} {'batched ms':>11}")
+    batched_trips = set()
+    for days in args.days:
+        db = FakeSupabase(latency=args.latency_ms / 1000)
+        seed_symptoms(db)
+        user = seed_user(db, f'bench{days}@advora.com')
+        seed_entries(db, user['id'], days)
+        store = EntryStore(db)
+        # The symptom catalog is process-wide, so measure with it warm
+        store.catalog.refresh()
+
+        legacy, legacy_trips, legacy_ms = measure(db, lambda uid: legacy_fetch(db, uid), user['id'])
+        batched, trips, batched_ms = measure(db, store.fetch_entries, user['id'])
+
+        if legacy != batched:
+            print(f"❌ Batched result differs from legacy result for {days} days")
+            return 1
+
+        paged, page_trips, _ = measure(db, lambda uid: walk_pages(store, uid, args.page_size), user['id'])
+        paged_entries, pages = paged
+        if paged_entries != batched or page_trips != pages:
+            print(f"❌ Paged walk differs from full fetch for {days} days")
+            return 1
+
+        batched_trips.add(trips)
+        print(f"{days:>6} {legacy_trips:>13} {legacy_ms:>10.1f} {trips:>14} {batched_ms:>11.1f}")
+
+    if len(batched_trips) != 1:
+        print(f"❌ Batched round-trips vary with history size: {sorted(batched_trips)}")
+        return 1
+    print("✅ Batched round-trips are constant")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Bulk import benchmark: a multi-year history written one day at a time
+versus through POST /api/entries/import's batched RPC.
+
+Exports a seeded history as NDJSON, then writes it into an empty
+FakeSupabase twice: once with one EntryStore.save_entry call per day (what
+a client has to do without the import endpoint) and once with
+parse_import + EntryStore.import_entries. Both paths must store the same
+data. Times are the fake's own work plus --latency-ms per round-trip.
+
+    python -m benchmarks.bench_import --years 5 --latency-ms 20
+"""
+import argparse
+import io
+import random
+import sys
+import time
+
+from benchmarks.bench_save_entry import snapshot
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.seed import seed_entries, seed_symptoms, seed_user
+from services.entry_store import DEFAULT_IMPORT_BATCH_SIZE, EntryStore
+from services.entry_transfer import export_record, ndjson_line, parse_import
+
+
+def make_export(years):
+    """NDJSON export of `years` of daily entries"""
+    db = FakeSupabase()
+    seed_symptoms(db)
+    user = seed_user(db, 'source@advora.com')
+    seed_entries(db, user['id'], years * 365, rng=random.Random(5))
+    lines = [ndjson_line(export_record(entry)) for entry in EntryStore(db).iter_entries(user['id'])]
+    return ''.join(lines).encode('utf-8')
+
+
+def empty_db():
+    db = FakeSupabase()
+    seed_symptoms(db)
+    return db, seed_user(db, 'bench@advora.com')
+
+
+def per_day(db, user_id, entries, batch_size):
+    store = EntryStore(db)
+    for entry in entries:
+        store.save_entry(user_id, entry['entry_date'], entry['text'], entry['pain_level'],
+                         entry['symptom_keys'], entry['factors'])
+
+
+def batched(db, user_id, entries, batch_size):
+    EntryStore(db).import_entries(user_id, entries, batch_size)
+
+
+def run(label, write, export, latency, batch_size):
+    db, user = empty_db()
+    known = {symptom['symptom_key'] for symptom in db.tables['symptoms']}
+    db.reset_round_trips()
+    start = time.perf_counter()
+    entries = parse_import(io.BytesIO(export), 'ndjson', known, max_entries=export.count(b'\n'))
+    write(db, user['id'], entries, batch_size)
+    seconds = time.perf_counter() - start + db.round_trips * latency
+    print(f"{label:<8} entries={len(entries)} round-trips={db.round_trips:<6} est. time={seconds:8.2f}s")
+    stats = sorted(
+        ({key: value for key, value in row.items() if key != 'id'} for row in db.tables.get('symptom_stats', [])),
+        key=lambda row: (row['bucket'], row['bucket_start'])
+    )
+    return db.round_trips, snapshot(db, user['id']), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=20.0,
+                        help='simulated network latency per round-trip')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    export = make_export(args.years)
+    print(f"Export: {len(export) / 1024:.0f} KiB of NDJSON")
+    latency = args.latency_ms / 1000
+    trips_daily, data_daily, stats_daily = run('per-day', per_day, export, latency, args.batch_size)
+    trips_batch, data_batch, stats_batch = run('import', batched, export, latency, args.batch_size)
+
+    if data_daily != data_batch or stats_daily != stats_batch:
+        print("❌ Import stored different data than per-day saves")
+        return 1
+    print(f"✅ Same data in {trips_batch} round-trips instead of {trips_daily}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+JSON serialization and compression benchmark for the large API payloads.
+
+Builds the /api/entries body for one or more years of seeded daily entries
+(the whole history in one response, as export and a first sync see it),
+then encodes it with Flask's standard-library provider and with
+OrjsonProvider, and compresses the result with gzip and brotli at the
+levels config.py uses. Reports the best-of-N time of each step and the
+bytes that would go over the wire, and checks both providers decode to the
+same data.
+
+    python -m benchmarks.bench_json --years 1 --years 5
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import config
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.seed import seed_entries, seed_symptoms, seed_user
+from services.compression import brotli, compress
+from services.entry_store import EntryStore
+from services.json_provider import OrjsonProvider, orjson
+
+
+def make_payload(years):
+    db = FakeSupabase()
+    seed_symptoms(db)
+    user = seed_user(db, 'json@advora.com')
+    seed_entries(db, user['id'], years * 365, rng=random.Random(7))
+    return {'entries': EntryStore(db).fetch_entries(user['id']), 'next_cursor': None}
+
+
+def best_of(repeat, fn):
+    """(fastest run in ms, last result)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, action='append', help='years of entries (repeatable; default 1, 3 and 5)')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("❌ orjson is not installed (pip install orjson)")
+        return 1
+    app = Flask(__name__)
+    providers = [('stdlib', DefaultJSONProvider(app)), ('orjson', OrjsonProvider(app))]
+    encodings = ['gzip'] + (['br'] if brotli is not None else [])
+
+    ok = True
+    print(f"{'years':>5} {'entries':>7} {'provider':8} {'encode ms':>9} {'raw KiB':>8} "
+          + ' '.join(f"{name + ' ms':>8} {name + ' KiB':>8}" for name in encodings))
+    for years in args.years or [1, 3, 5]:
+        payload = make_payload(years)
+        decoded = []
+        for label, provider in providers:
+            with app.app_context():
+                encode_ms, response = best_of(args.repeat, lambda: provider.response(payload))
+            body = response.get_data()
+            decoded.append(json.loads(body))
+            row = f"{years:>5} {len(payload['entries']):>7} {label:8} {encode_ms:9.2f} {len(body) / 1024:8.1f}"
+            for encoding in encodings:
+                compress_ms, compressed = best_of(args.repeat, lambda: compress(body, encoding))
+                row += f" {compress_ms:8.2f} {len(compressed) / 1024:8.1f}"
+            print(row)
+        ok = ok and all(other == decoded[0] for other in decoded[1:])
+
+    print(f"(gzip level {config.COMPRESS_GZIP_LEVEL}, brotli quality {config.COMPRESS_BROTLI_QUALITY})")
+    if not ok:
+        print("❌ Providers encoded different data")
+        return 1
+    print("✅ Providers encode the same data")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Round-trip and latency benchmark for saving an entry.
+
+Replays the same mix of new and edited entries through the old multi-call
+save path and through EntryStore.save_entry (the save_journal_entry RPC) on
+FakeSupabase, with a simulated per-call network latency.
+
+    python -m benchmarks.bench_save_entry --saves 200 --latency-ms 20
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.seed import SYMPTOMS, seed_symptoms, seed_user
+from services.entry_store import EntryStore, normalize_factors
+
+
+def legacy_save(client, user_id, entry_date, text, pain_level, symptoms, factors):
+    """The old save_entry body from routes/entries.py, kept for comparison"""
+    user_check = client.table('users').select('id').eq('id', user_id).execute()
+    if not user_check.data:
+        raise LookupError('User not found')
+
+    existing = client.table('journal_entries') \
+        .select('id') \
+        .eq('user_id', user_id) \
+        .eq('entry_date', entry_date) \
+        .execute()
+
+    if existing.data:
+        entry_id = existing.data[0]['id']
+        client.table('journal_entries') \
+            .update({'text': text, 'pain_level': pain_level, 'updated_at': client.now()}) \
+            .eq('id', entry_id) \
+            .eq('user_id', user_id) \
+            .execute()
+        client.table('entry_symptoms').delete().eq('entry_id', entry_id).execute()
+        client.table('entry_factors').delete().eq('entry_id', entry_id).execute()
+    else:
+        entry_result = client.table('journal_entries') \
+            .insert({'user_id': user_id, 'entry_date': entry_date, 'text': text, 'pain_level': pain_level}) \
+            .execute()
+        entry_id = entry_result.data[0]['id']
+
+    if symptoms:
+        symptom_ids = client.table('symptoms').select('id, symptom_key').in_('symptom_key', symptoms).execute()
+        for symptom in symptom_ids.data:
+            client.table('entry_symptoms').insert({'entry_id': entry_id, 'symptom_id': symptom['id']}).execute()
+
+    client.table('entry_factors').insert({'entry_id': entry_id, **normalize_factors(factors)}).execute()
+    return entry_id
+
+
+def make_saves(count, seed=7):
+    """A reproducible mix of new days and re-edits of earlier days"""
+    rng = random.Random(seed)
+    keys = [key for key, _, _ in SYMPTOMS]
+    today = date.today()
+    saves = []
+    for i in range(count):
+        day = today - timedelta(days=rng.randint(0, max(1, count // 2)))
+        saves.append((
+            day.isoformat(),
+            f'Entry {i}',
+            rng.randint(0, 10),
+            rng.sample(keys, rng.randint(0, 5)),
+            {'period': rng.random() < 0.2, 'period_flow': 'light', 'stress': rng.randint(1, 5)},
+        ))
+    return saves
+
+
+def run(label, save, db, user_id, saves):
+    trips, timings = [], []
+    for args in saves:
+        db.reset_round_trips()
+        start = time.perf_counter()
+        save(user_id, *args)
+        timings.append((time.perf_counter() - start) * 1000)
+        trips.append(db.round_trips)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<8} trips/save min={min(trips)} max={max(trips)} "
+          f"mean={statistics.mean(trips):.1f}   "
+          f"ms p50={statistics.median(timings):.1f} p95={p95:.1f}")
+    return trips
+
+
+def snapshot(db, user_id):
+    """Comparable view of a user's data, without ids or timestamps"""
+    rows = []
+    for entry in EntryStore(db).fetch_entries(user_id):
+        factors = {k: v for k, v in entry['factors'].items() if k not in ('id', 'entry_id')}
+        rows.append((
+            entry['entry_date'],
+            entry['text'],
+            entry['pain_level'],
+            sorted(s['symptom_key'] for s in entry['symptoms']),
+            sorted(factors.items()),
+        ))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--saves', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=20.0,
+                        help='simulated network latency per round-trip')
+    args = parser.parse_args()
+    saves = make_saves(args.saves)
+
+    results = {}
+    for label in ('legacy', 'rpc'):
+        db = FakeSupabase(latency=args.latency_ms / 1000)
+        seed_symptoms(db)
+        user = seed_user(db, 'bench@advora.com')
+        if label == 'legacy':
+            save = lambda *a: legacy_save(db, *a)
+        else:
+            save = EntryStore(db).save_entry
+        trips = run(label, save, db, user['id'], saves)
+        results[label] = (trips, snapshot(db, user['id']))
+
+    if results['legacy'][1] != results['rpc'][1]:
+        print("❌ RPC path stored different data than the legacy path")
+        return 1
+    if set(results['rpc'][0]) != {1}:
+        print("❌ RPC path made more than one round-trip per save")
+        return 1
+    print("✅ RPC path stores the same data in one round-trip per save")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
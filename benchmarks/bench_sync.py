@@ -0,0 +1,126 @@
+"""
+Sync traffic benchmark: reopening the app with a full reload versus delta sync.
+
+Seeds a multi-year history, then simulates a client that reopens the app
+after a few edits each time. The full reload pages through /api/entries as
+index.html used to; the delta sync asks /api/entries/changes for what
+changed since its last token, with If-None-Match. Reports response bytes
+and Supabase round-trips per reopen, and checks the delta client ends up
+with the same entries. Runs the real Flask app on FakeSupabase.
+
+    python -m benchmarks.bench_sync --years 5 --edits 0 --edits 3
+"""
+import argparse
+import random
+import statistics
+import sys
+from datetime import date, timedelta
+
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.seed import SYMPTOMS, seed_entries, seed_symptoms, seed_user
+from benchmarks.suite import PASSWORD, build_app
+
+
+def full_reload(client):
+    """Every page of /api/entries; returns (entries by date, bytes)"""
+    entries, size, cursor = {}, 0, None
+    while True:
+        response = client.get('/api/entries', query_string={'limit': 500, **({'cursor': cursor} if cursor else {})})
+        size += len(response.data)
+        page = response.get_json()
+        entries.update((entry['entry_date'], entry) for entry in page['entries'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return entries, size
+
+
+class DeltaClient:
+    """What index.html keeps in IndexedDB: entries by date, the sync token and the last ETag"""
+
+    def __init__(self, client):
+        self.client = client
+        self.entries = {}
+        self.token = None
+        self.etags = {}
+
+    def sync(self):
+        size = 0
+        while True:
+            query = {'limit': 500, **({'since': self.token} if self.token else {})}
+            etag = self.etags.get(self.token)
+            response = self.client.get('/api/entries/changes', query_string=query,
+                                       headers={'If-None-Match': etag} if etag else {})
+            size += len(response.data)
+            if response.status_code == 304:
+                return size
+            page = response.get_json()
+            self.etags[self.token] = response.headers.get('ETag')
+            for gone in page['deleted']:
+                if self.entries.get(gone['entry_date'], {}).get('id') == gone['id']:
+                    del self.entries[gone['entry_date']]
+            self.entries.update((entry['entry_date'], entry) for entry in page['entries'])
+            self.token = page['next_token']
+            if not page['more']:
+                return size
+
+
+def edit(client, rng, history_days):
+    client.post('/api/entries', json={
+        'entry_date': (date.today() - timedelta(days=rng.randrange(history_days))).isoformat(),
+        'text': 'Edited ' * rng.randint(1, 8),
+        'pain_level': rng.randint(0, 10),
+        'symptoms': [key for key, _, _ in rng.sample(SYMPTOMS, rng.randint(0, 3))],
+        'factors': {'stress': rng.randint(1, 5)}
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--reopens', type=int, default=20)
+    parser.add_argument('--edits', type=int, action='append',
+                        help='edits between reopens (repeatable; default 0 and 3)')
+    args = parser.parse_args()
+
+    db = FakeSupabase()
+    seed_symptoms(db)
+    user = seed_user(db, 'sync@advora.com', PASSWORD)
+    history_days = args.years * 365
+    seed_entries(db, user['id'], history_days)
+    app = build_app(db, 'http://127.0.0.1:9/v1')
+    client = app.test_client()
+    client.post('/api/login', json={'email': user['email'], 'password': PASSWORD})
+    rng = random.Random(3)
+
+    delta = DeltaClient(client)
+    db.reset_round_trips()
+    initial = delta.sync()
+    print(f"Initial sync: {len(delta.entries)} entries, {initial / 1024:.0f} KiB, {db.round_trips} round-trips")
+
+    ok = True
+    print(f"{'edits':>5} {'full KiB':>9} {'full trips':>11} {'delta KiB':>10} {'delta trips':>12}")
+    for edits in args.edits or [0, 3]:
+        full_sizes, full_trips, delta_sizes, delta_trips = [], [], [], []
+        for _ in range(args.reopens):
+            for _ in range(edits):
+                edit(client, rng, history_days)
+            db.reset_round_trips()
+            expected, size = full_reload(client)
+            full_sizes.append(size)
+            full_trips.append(db.round_trips)
+            db.reset_round_trips()
+            delta_sizes.append(delta.sync())
+            delta_trips.append(db.round_trips)
+            ok = ok and delta.entries == expected
+        print(f"{edits:>5} {statistics.fmean(full_sizes) / 1024:9.1f} {statistics.fmean(full_trips):11.1f} "
+              f"{statistics.fmean(delta_sizes) / 1024:10.1f} {statistics.fmean(delta_trips):12.1f}")
+
+    if not ok:
+        print("❌ Delta sync ended up with different entries than a full reload")
+        return 1
+    print("✅ Delta sync matches a full reload")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Transcript cache benchmark: retried and double-tapped uploads with the
+cache off and on.
+
+Each simulated recording is uploaded to /api/transcribe once; some are
+double-tapped (a second identical upload at the same moment) and some are
+retried after the first upload returned, as a client does after a timeout.
+Runs the real Flask app against the mock STT server with the transcript
+cache disabled and then enabled, and reports ElevenLabs calls, latency, the
+cache hit rate and the upstream calls saved. Every upload must get the mock
+transcript back either way.
+
+    python -m benchmarks.bench_transcript_cache --recordings 200 --double-tap 0.1 --retry 0.2
+"""
+import argparse
+import io
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import mock_stt_server
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.seed import seed_symptoms, seed_user
+from benchmarks.suite import PASSWORD, build_app, percentile
+
+
+class Uploader:
+    """Uploads recordings as clients do: some twice at once, some again afterwards"""
+
+    def __init__(self, app, users, audio_bytes, double_tap, retry):
+        self.app = app
+        self.users = users
+        self.audio_bytes = audio_bytes
+        self.double_tap = double_tap
+        self.retry = retry
+        self.latencies = []
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def upload(self, user, audio):
+        client = self.app.test_client()
+        client.post('/api/login', json={'email': user['email'], 'password': PASSWORD})
+        start = time.perf_counter()
+        response = client.post('/api/transcribe', data={
+            'audio': (io.BytesIO(audio), 'audio.webm', 'audio/webm')
+        }, content_type='multipart/form-data')
+        elapsed = (time.perf_counter() - start) * 1000
+        ok = response.status_code == 200 \
+            and response.get_json()['transcript'] == mock_stt_server.MockSTTHandler.transcript
+        with self._lock:
+            self.latencies.append(elapsed)
+            self.failures += not ok
+
+    def recording(self, rng):
+        user = rng.choice(self.users)
+        audio = os.urandom(self.audio_bytes)
+        double_tap, retry = rng.random() < self.double_tap, rng.random() < self.retry
+        taps = [threading.Thread(target=self.upload, args=(user, audio)) for _ in range(1 + double_tap)]
+        for tap in taps:
+            tap.start()
+        for tap in taps:
+            tap.join()
+        if retry:
+            self.upload(user, audio)
+
+
+def run(app, service, cache, stt, users, args):
+    service.transcript_cache = cache
+    uploader = Uploader(app, users, args.audio_kb * 1024, args.double_tap, args.retry)
+    rng = random.Random(args.seed)
+    seeds = [rng.random() for _ in range(args.recordings)]
+    calls_before = stt.RequestHandlerClass.requests_seen
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(lambda seed: uploader.recording(random.Random(seed)), seeds))
+    return {
+        'uploads': len(uploader.latencies),
+        'upstream': stt.RequestHandlerClass.requests_seen - calls_before,
+        'p50_ms': statistics.median(uploader.latencies),
+        'p95_ms': percentile(uploader.latencies, 95),
+        'seconds': time.perf_counter() - start,
+        'failures': uploader.failures,
+        'cache': cache.stats() if cache else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recordings', type=int, default=200)
+    parser.add_argument('--double-tap', type=float, default=0.1, help='share of recordings uploaded twice at once')
+    parser.add_argument('--retry', type=float, default=0.2, help='share of recordings uploaded again afterwards')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--stt-delay-ms', type=float, default=200, help='mock STT response delay')
+    parser.add_argument('--audio-kb', type=int, default=64)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    db = FakeSupabase()
+    seed_symptoms(db)
+    users = [seed_user(db, f"stt{index}@advora.com", PASSWORD) for index in range(args.users)]
+    stt = mock_stt_server.start(delay_ms=args.stt_delay_ms)
+    app = build_app(db, f"http://127.0.0.1:{stt.server_address[1]}/v1")
+
+    from routes.transcribe import elevenlabs
+    from services.transcript_cache import TranscriptCache
+    service = elevenlabs.get()
+
+    try:
+        results = {
+            'off': run(app, service, None, stt, users, args),
+            'on': run(app, service, TranscriptCache(), stt, users, args),
+        }
+    finally:
+        stt.shutdown()
+
+    print(f"{'cache':5} {'uploads':>7} {'upstream':>8} {'p50 ms':>7} {'p95 ms':>7} {'seconds':>7} {'hit rate':>8} {'saved':>5}")
+    for label, result in results.items():
+        cache = result['cache'] or {}
+        hit_rate = f"{cache['hit_rate']:.1%}" if cache.get('hit_rate') is not None else '-'
+        print(f"{label:5} {result['uploads']:7} {result['upstream']:8} {result['p50_ms']:7.1f} {result['p95_ms']:7.1f} "
+              f"{result['seconds']:7.2f} {hit_rate:>8} {cache.get('upstream_calls_saved', '-'):>5}")
+    if results['on']['cache']:
+        print(f"Cache: {results['on']['cache']}")
+
+    if any(result['failures'] for result in results.values()):
+        print("❌ Some uploads did not get the transcript back")
+        return 1
+    print("✅ Every upload got its transcript")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
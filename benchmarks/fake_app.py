@@ -0,0 +1,38 @@
+"""
+The real Flask app wired to a seeded FakeSupabase, for load tests without
+a database or API keys:
+
+    gunicorn -c gunicorn.conf.py benchmarks.fake_app:app
+
+FAKE_SUPABASE_LATENCY_MS adds a delay to every fake round-trip (default 20)
+so the server spends its time waiting on I/O the way it does in production.
+Seeds one user, bench@example.com / test123, with FAKE_SEED_DAYS of entries.
+"""
+import os
+
+import supabase
+
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.seed import seed_entries, seed_symptoms, seed_user
+
+BENCH_EMAIL = 'bench@example.com'
+BENCH_PASSWORD = 'test123'
+
+for name, value in {
+    'SUPABASE_URL': 'http://fake-supabase',
+    'SUPABASE_KEY': 'fake',
+    'GEMINI_API_KEY': 'fake',
+    'ELEVENLABS_API_KEY': 'fake',
+    'FLASK_SECRET_KEY': 'bench-secret',
+}.items():
+    os.environ.setdefault(name, value)
+
+db = FakeSupabase(latency=float(os.getenv("FAKE_SUPABASE_LATENCY_MS", 20)) / 1000)
+seed_symptoms(db)
+user = seed_user(db, BENCH_EMAIL, BENCH_PASSWORD)
+seed_entries(db, user['id'], int(os.getenv("FAKE_SEED_DAYS", 365)))
+
+# Everything that builds a client goes through supabase.create_client
+supabase.create_client = lambda url, key: db
+
+from app import app  # noqa: E402
@@ -0,0 +1,564 @@
+"""
+In-process stand-in for the Supabase client.
+
+Implements the table().select().eq()...execute() surface used by the app,
+including PostgREST embedded selects, and counts every execute() as one
+round-trip so benchmarks can check how many HTTP calls a code path makes.
+"""
+import copy
+import itertools
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+
+# (parent table, embedded table) -> (parent column, embedded column, many)
+RELATIONS = {
+    ('journal_entries', 'entry_symptoms'): ('id', 'entry_id', True),
+    ('journal_entries', 'entry_factors'): ('id', 'entry_id', True),
+    ('entry_symptoms', 'symptoms'): ('symptom_id', 'id', False),
+    ('entry_symptoms', 'journal_entries'): ('entry_id', 'id', False),
+    ('journal_entries', 'entry_summaries'): ('id', 'entry_id', True),
+}
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _split_top_level(text):
+    """Split a select string on commas that are not inside parentheses"""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        current.append(char)
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return parts
+
+
+def _coerce(raw, current):
+    """Convert a PostgREST filter value to the type stored in the row"""
+    if isinstance(current, bool):
+        return raw == 'true'
+    if isinstance(current, int):
+        return int(raw)
+    if isinstance(current, float):
+        return float(raw)
+    return raw
+
+
+OPERATORS = {
+    'eq': lambda a, b: a == b,
+    'neq': lambda a, b: a != b,
+    'lt': lambda a, b: a < b,
+    'lte': lambda a, b: a <= b,
+    'gt': lambda a, b: a > b,
+    'gte': lambda a, b: a >= b,
+}
+
+
+def _parse_logic(text):
+    """Turn a PostgREST or=(...) body into a row predicate"""
+    checks = []
+    for part in _split_top_level(text):
+        if part.startswith(('and(', 'or(')):
+            combine = all if part.startswith('and(') else any
+            inner = _parse_logic(part[part.index('(') + 1:-1])
+            checks.append(lambda row, inner=inner, combine=combine: combine(c(row) for c in inner))
+            continue
+        column, op, raw = part.split('.', 2)
+        if raw.startswith('"') and raw.endswith('"'):
+            raw = raw[1:-1]
+        checks.append(
+            lambda row, column=column, op=op, raw=raw:
+                row.get(column) is not None
+                and OPERATORS[op](row.get(column), _coerce(raw, row.get(column)))
+        )
+    return checks
+
+
+def _parse_select(text):
+    """Turn 'a, b, child(x, y)' into (['a', 'b'], {'child': [...]})"""
+    columns, embeds = [], {}
+    for part in _split_top_level(text or '*'):
+        if '(' in part:
+            name, inner = part.split('(', 1)
+            embeds[name.strip()] = inner[:-1]
+        else:
+            columns.append(part)
+    return columns, embeds
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.action = 'select'
+        self.columns = '*'
+        self.payload = None
+        self.filters = []
+        self.orders = []
+        self.row_limit = None
+        self.count = None
+        self.conflict_columns = None
+        # (column, value) of eq() filters, answered from an index
+        self.eq_filters = []
+
+    # ----- builders -----
+
+    def select(self, columns='*', count=None):
+        self.action = 'select'
+        self.columns = columns
+        self.count = count
+        return self
+
+    def insert(self, payload):
+        self.action = 'insert'
+        self.payload = payload
+        return self
+
+    def upsert(self, payload, on_conflict=''):
+        self.action = 'upsert'
+        self.payload = payload
+        self.conflict_columns = [c.strip() for c in on_conflict.split(',') if c.strip()] or ['id']
+        return self
+
+    def update(self, payload):
+        self.action = 'update'
+        self.payload = payload
+        return self
+
+    def delete(self):
+        self.action = 'delete'
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        self.eq_filters.append((column, value))
+        return self
+
+    def _compare(self, column, op, value):
+        self.filters.append(
+            lambda row: row.get(column) is not None and OPERATORS[op](row.get(column), value)
+        )
+        return self
+
+    def neq(self, column, value):
+        return self._compare(column, 'neq', value)
+
+    def lt(self, column, value):
+        return self._compare(column, 'lt', value)
+
+    def lte(self, column, value):
+        return self._compare(column, 'lte', value)
+
+    def gt(self, column, value):
+        return self._compare(column, 'gt', value)
+
+    def gte(self, column, value):
+        return self._compare(column, 'gte', value)
+
+    def or_(self, filters):
+        checks = _parse_logic(filters)
+        self.filters.append(lambda row: any(check(row) for check in checks))
+        return self
+
+    def in_(self, column, values):
+        values = list(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    # ----- execution -----
+
+    def execute(self):
+        self.db.round_trips += 1
+        if self.db.latency:
+            time.sleep(self.db.latency)
+        started = time.perf_counter()
+        try:
+            return getattr(self, f'_execute_{self.action}')()
+        finally:
+            self.db.busy_seconds += time.perf_counter() - started
+
+    def _matching(self):
+        if self.eq_filters:
+            column, value = self.eq_filters[0]
+            rows = self.db.index(self.table, column).get(value, [])
+        else:
+            rows = self.db.tables.setdefault(self.table, [])
+        return [row for row in rows if all(f(row) for f in self.filters)]
+
+    def _execute_select(self):
+        rows = self._matching()
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        total = len(rows)
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+        data = [self.db.project(self.table, row, self.columns) for row in rows]
+        return FakeResponse(data, count=total if self.count else None)
+
+    def _execute_insert(self):
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        inserted = [self.db.insert_row(self.table, row) for row in payload]
+        return FakeResponse(copy.deepcopy(inserted))
+
+    def _execute_upsert(self):
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        rows = self.db.tables.setdefault(self.table, [])
+        written = []
+        for item in payload:
+            key = tuple(item.get(c) for c in self.conflict_columns)
+            existing = next((row for row in rows if tuple(row.get(c) for c in self.conflict_columns) == key), None)
+            if existing:
+                existing.update(item)
+                self.db.touch(self.table, item)
+                written.append(existing)
+            else:
+                written.append(self.db.insert_row(self.table, item))
+        return FakeResponse(copy.deepcopy(written))
+
+    def _execute_update(self):
+        rows = self._matching()
+        for row in rows:
+            row.update(self.payload)
+        self.db.touch(self.table, self.payload)
+        return FakeResponse(copy.deepcopy(rows))
+
+    def _execute_delete(self):
+        rows = self._matching()
+        removed = {id(row) for row in rows}
+        table = self.db.tables[self.table]
+        self.db.tables[self.table] = [row for row in table if id(row) not in removed]
+        return FakeResponse(copy.deepcopy(rows))
+
+
+class FakeAPIError(Exception):
+    """Mirrors postgrest.exceptions.APIError closely enough for error handling"""
+
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def save_journal_entry(db, p_user_id, p_entry_date, p_text, p_pain_level, p_symptom_keys, p_factors):
+    """Python twin of the save_journal_entry SQL function"""
+    if not any(user['id'] == p_user_id for user in db.tables.get('users', [])):
+        raise FakeAPIError('User not found', code='P0002')
+
+    existing = [
+        row for row in db.tables.get('journal_entries', [])
+        if row['user_id'] == p_user_id and row['entry_date'] == p_entry_date
+    ]
+    if existing:
+        entry = existing[0]
+        entry.update({'text': p_text, 'pain_level': p_pain_level, 'updated_at': db.now()})
+        db.touch('journal_entries', ['text', 'pain_level', 'updated_at'])
+    else:
+        entry = db.insert_row('journal_entries', {
+            'user_id': p_user_id,
+            'entry_date': p_entry_date,
+            'text': p_text,
+            'pain_level': p_pain_level,
+            'created_at': db.now(),
+            'updated_at': db.now(),
+        })
+
+    for child in ('entry_symptoms', 'entry_factors'):
+        db.tables[child] = [row for row in db.tables.get(child, []) if row['entry_id'] != entry['id']]
+
+    for symptom in db.tables.get('symptoms', []):
+        if symptom['symptom_key'] in (p_symptom_keys or []):
+            db.insert_row('entry_symptoms', {'entry_id': entry['id'], 'symptom_id': symptom['id']})
+
+    db.insert_row('entry_factors', {
+        'entry_id': entry['id'],
+        'period': bool(p_factors.get('period')),
+        'period_flow': p_factors.get('period_flow'),
+        'birth_control': bool(p_factors.get('birth_control')),
+        'birth_control_type': p_factors.get('birth_control_type'),
+        'sick': bool(p_factors.get('sick')),
+        'sick_type': p_factors.get('sick_type'),
+        'stress': p_factors.get('stress', 3),
+    })
+    refresh_symptom_stats(db, p_user_id, p_entry_date)
+    return entry['id']
+
+
+def _bucket_range(bucket, day):
+    if bucket == 'day':
+        return day, day + timedelta(days=1)
+    if bucket == 'week':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    start = day.replace(day=1)
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+def refresh_symptom_stats(db, p_user_id, p_entry_date):
+    """Python twin of the refresh_symptom_stats SQL function"""
+    day = date.fromisoformat(p_entry_date)
+    for bucket in ('day', 'week', 'month'):
+        refresh_symptom_stats_bucket(db, p_user_id, bucket, _bucket_range(bucket, day)[0].isoformat())
+
+
+def refresh_symptom_stats_bucket(db, p_user_id, p_bucket, p_start):
+    """Python twin of the refresh_symptom_stats_bucket SQL function"""
+    end = _bucket_range(p_bucket, date.fromisoformat(p_start))[1].isoformat()
+    symptom_keys = {s['id']: s['symptom_key'] for s in db.tables.get('symptoms', [])}
+    factors_by_entry = db.index('entry_factors', 'entry_id')
+    links_by_entry = db.index('entry_symptoms', 'entry_id')
+    entries = [
+        e for e in db.index('journal_entries', 'user_id').get(p_user_id, [])
+        if p_start <= e['entry_date'] < end
+    ]
+
+    stats = db.tables.setdefault('symptom_stats', [])
+    existing = next((
+        row for row in db.index('symptom_stats', 'user_id').get(p_user_id, [])
+        if row['bucket'] == p_bucket and row['bucket_start'] == p_start
+    ), None)
+    if not entries:
+        if existing:
+            db.tables['symptom_stats'] = [row for row in stats if row is not existing]
+        return
+
+    counts, period_counts, stress_counts = Counter(), Counter(), Counter()
+    row = {
+        'user_id': p_user_id, 'bucket': p_bucket, 'bucket_start': p_start,
+        'entry_count': len(entries), 'pain_sum': 0, 'pain_max': None,
+        'stress_sum': 0, 'stress_count': 0, 'high_stress_days': 0,
+        'period_days': 0, 'period_high_stress_days': 0, 'sick_days': 0,
+    }
+    for entry in entries:
+        factors = (factors_by_entry.get(entry['id']) or [{}])[0]
+        pain = entry.get('pain_level') or 0
+        row['pain_sum'] += pain
+        row['pain_max'] = max(row['pain_max'] or 0, pain)
+        stress = factors.get('stress')
+        high_stress = stress is not None and stress >= 4
+        if stress is not None:
+            row['stress_sum'] += stress
+            row['stress_count'] += 1
+        row['high_stress_days'] += high_stress
+        row['period_days'] += bool(factors.get('period'))
+        row['period_high_stress_days'] += bool(factors.get('period')) and high_stress
+        row['sick_days'] += bool(factors.get('sick'))
+        for link in links_by_entry.get(entry['id'], []):
+            key = symptom_keys[link['symptom_id']]
+            counts[key] += 1
+            if factors.get('period'):
+                period_counts[key] += 1
+            if high_stress:
+                stress_counts[key] += 1
+    row.update({
+        'symptom_counts': dict(counts),
+        'period_symptom_counts': dict(period_counts),
+        'high_stress_symptom_counts': dict(stress_counts),
+    })
+    if existing:
+        # Same key columns, so the table's indexes stay valid
+        existing.clear()
+        existing.update(row)
+    else:
+        db.insert_row('symptom_stats', row)
+
+
+def import_journal_entries(db, p_user_id, p_entries):
+    """Python twin of the import_journal_entries SQL function"""
+    if not any(user['id'] == p_user_id for user in db.tables.get('users', [])):
+        raise FakeAPIError('User not found', code='P0002')
+
+    existing = {e['entry_date']: e for e in db.index('journal_entries', 'user_id').get(p_user_id, [])}
+    symptom_ids = {s['symptom_key']: s['id'] for s in db.tables.get('symptoms', [])}
+    written = []
+    for item in p_entries:
+        entry = existing.get(item['entry_date'])
+        if entry:
+            entry.update({'text': item['text'], 'pain_level': item['pain_level'], 'updated_at': db.now()})
+        else:
+            entry = db.insert_row('journal_entries', {
+                'user_id': p_user_id,
+                'entry_date': item['entry_date'],
+                'text': item['text'],
+                'pain_level': item['pain_level'],
+                'created_at': db.now(),
+                'updated_at': db.now(),
+            })
+        written.append((entry, item))
+    db.touch('journal_entries', ['text', 'pain_level', 'updated_at'])
+
+    entry_ids = {entry['id'] for entry, _ in written}
+    for child in ('entry_symptoms', 'entry_factors'):
+        db.tables[child] = [row for row in db.tables.get(child, []) if row['entry_id'] not in entry_ids]
+
+    for entry, item in written:
+        for key in item.get('symptom_keys') or []:
+            if key in symptom_ids:
+                db.insert_row('entry_symptoms', {'entry_id': entry['id'], 'symptom_id': symptom_ids[key]})
+        factors = item.get('factors') or {}
+        db.insert_row('entry_factors', {
+            'entry_id': entry['id'],
+            'period': bool(factors.get('period')),
+            'period_flow': factors.get('period_flow'),
+            'birth_control': bool(factors.get('birth_control')),
+            'birth_control_type': factors.get('birth_control_type'),
+            'sick': bool(factors.get('sick')),
+            'sick_type': factors.get('sick_type'),
+            'stress': factors.get('stress'),
+        })
+
+    # Each affected bucket once, like the SQL function
+    buckets = {
+        (bucket, _bucket_range(bucket, date.fromisoformat(item['entry_date']))[0].isoformat())
+        for item in p_entries for bucket in ('day', 'week', 'month')
+    }
+    for bucket, start in sorted(buckets):
+        refresh_symptom_stats_bucket(db, p_user_id, bucket, start)
+    return len(written)
+
+
+def entries_needing_summary(db, p_after_id, p_limit, p_date_from=None, p_date_to=None):
+    """Python twin of the entries_needing_summary SQL function"""
+    summaries = {s['entry_id']: s for s in db.tables.get('entry_summaries', [])}
+    rows = [
+        e for e in db.tables.get('journal_entries', [])
+        if e['id'] > p_after_id
+        and (p_date_from is None or e['entry_date'] >= p_date_from)
+        and (p_date_to is None or e['entry_date'] <= p_date_to)
+        and (e['id'] not in summaries or summaries[e['id']].get('entry_updated_at') != e.get('updated_at'))
+    ]
+    rows.sort(key=lambda e: e['id'])
+    return copy.deepcopy(rows[:p_limit])
+
+
+def journal_sync_position(db, p_user_id):
+    """Python twin of the journal_sync_position SQL function"""
+    entries = db.index('journal_entries', 'user_id').get(p_user_id, [])
+    tombstones = [t for t in db.tables.get('entry_tombstones', []) if t['user_id'] == p_user_id]
+    return {
+        'updated_at': max((e['updated_at'] for e in entries), default=None),
+        'deleted_at': max((t['deleted_at'] for t in tombstones), default=None),
+    }
+
+
+FUNCTIONS = {
+    'save_journal_entry': save_journal_entry,
+    'refresh_symptom_stats': refresh_symptom_stats,
+    'refresh_symptom_stats_bucket': refresh_symptom_stats_bucket,
+    'entries_needing_summary': entries_needing_summary,
+    'import_journal_entries': import_journal_entries,
+    'journal_sync_position': journal_sync_position,
+}
+
+
+class FakeRpc:
+    def __init__(self, db, name, params):
+        self.db = db
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        self.db.round_trips += 1
+        if self.db.latency:
+            time.sleep(self.db.latency)
+        started = time.perf_counter()
+        try:
+            return FakeResponse(FUNCTIONS[self.name](self.db, **self.params))
+        finally:
+            self.db.busy_seconds += time.perf_counter() - started
+
+
+class FakeSupabase:
+    """Minimal in-memory database that quacks like supabase.Client"""
+
+    def __init__(self, latency=0.0):
+        self.tables = {}
+        self.latency = latency
+        self.round_trips = 0
+        self._ids = itertools.count(1)
+        self._indexes = {}
+        # Time spent inside execute() other than the simulated latency
+        self.busy_seconds = 0.0
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return FakeRpc(self, name, params or {})
+
+    @staticmethod
+    def now():
+        return datetime.now(timezone.utc).isoformat()
+
+    def insert_row(self, table, row):
+        row = dict(row)
+        row.setdefault('id', next(self._ids))
+        rows = self.tables.setdefault(table, [])
+        rows.append(row)
+        for (indexed_table, column), (indexed_rows, size, grouped) in list(self._indexes.items()):
+            if indexed_table == table and indexed_rows is rows and size == len(rows) - 1:
+                grouped.setdefault(row.get(column), []).append(row)
+                self._indexes[(table, column)] = (rows, len(rows), grouped)
+        return row
+
+    def touch(self, table, columns):
+        """Note an in-place change to `columns` of rows in `table`; their indexes are rebuilt"""
+        for column in columns:
+            self._indexes.pop((table, column), None)
+
+    def index(self, table, column):
+        """
+        Rows of `table` grouped by `column`, in table order, so lookups stay
+        cheap with multi-year histories for many users. Kept up to date by
+        insert_row(); rebuilt after touch() or when the table's list is
+        replaced or appended to directly.
+        """
+        rows = self.tables.setdefault(table, [])
+        cached = self._indexes.get((table, column))
+        if cached and cached[0] is rows and cached[1] == len(rows):
+            return cached[2]
+        grouped = {}
+        for row in rows:
+            grouped.setdefault(row.get(column), []).append(row)
+        self._indexes[(table, column)] = (rows, len(rows), grouped)
+        return grouped
+
+    def project(self, table, row, columns):
+        """Apply a select string, resolving embedded tables through RELATIONS"""
+        names, embeds = _parse_select(columns)
+        if '*' in names:
+            result = dict(row)
+        else:
+            result = {name: row.get(name) for name in names}
+
+        for child, child_columns in embeds.items():
+            parent_col, child_col, many = RELATIONS[(table, child)]
+            matches = [
+                self.project(child, child_row, child_columns)
+                for child_row in self.index(child, child_col).get(row.get(parent_col), [])
+            ]
+            result[child] = matches if many else (matches[0] if matches else None)
+        return result
+
+    def reset_round_trips(self):
+        self.round_trips = 0
@@ -0,0 +1,151 @@
+"""
+HTTP load test for GET /api/entries and GET /api/me.
+
+Each client thread logs in once, then requests the endpoints in turn for
+--duration seconds. Prints requests per second and latency percentiles per
+endpoint.
+
+Against a running server:
+
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --email you@example.com --password ...
+
+Or let the script start the server on benchmarks.fake_app (seeded fake
+database, no credentials needed) and compare serving modes:
+
+    python -m benchmarks.load_test --spawn gunicorn
+    python -m benchmarks.load_test --spawn dev
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+DEFAULT_PATHS = ['/api/entries?limit=100', '/api/me']
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(mode, port):
+    """Start benchmarks.fake_app under gunicorn or the Flask dev server"""
+    env = dict(os.environ, PORT=str(port))
+    if mode == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                   '--bind', f'127.0.0.1:{port}', '--access-logfile', '/dev/null',
+                   'benchmarks.fake_app:app']
+    else:
+        code = f"from benchmarks.fake_app import app; app.run(port={port}, debug=True, use_reloader=False)"
+        command = [sys.executable, '-c', code]
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_up(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{url}/api/me", timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+
+def client(url, email, password, paths, stop_at, results, errors):
+    session = requests.Session()
+    response = session.post(f"{url}/api/login", json={'email': email, 'password': password})
+    if response.status_code != 200:
+        errors['login'] = errors.get('login', 0) + 1
+        return
+
+    while time.monotonic() < stop_at:
+        for path in paths:
+            started = time.perf_counter()
+            try:
+                response = session.get(f"{url}{path}", timeout=30)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = (time.perf_counter() - started) * 1000
+            if ok:
+                results[path].append(elapsed)
+            else:
+                errors[path] = errors.get(path, 0) + 1
+
+
+def run(url, email, password, paths, concurrency, duration):
+    results = {path: [] for path in paths}
+    errors = {}
+    stop_at = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=client, args=(url, email, password, paths, stop_at, results, errors))
+        for _ in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors, time.monotonic() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--spawn', choices=['gunicorn', 'dev'],
+                        help='start benchmarks.fake_app with this server instead of using --url')
+    parser.add_argument('--email', default='bench@example.com')
+    parser.add_argument('--password', default='test123')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--path', action='append', dest='paths',
+                        help=f"endpoint to hit (repeatable, default {' '.join(DEFAULT_PATHS)})")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if args.spawn:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = spawn_server(args.spawn, port)
+    try:
+        wait_until_up(url)
+        results, errors, elapsed = run(url, args.email, args.password, args.paths or DEFAULT_PATHS,
+                                       args.concurrency, args.duration)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    label = args.spawn or url
+    print(f"{label}: {args.concurrency} clients for {elapsed:.1f}s")
+    total = 0
+    for path, samples in results.items():
+        total += len(samples)
+        if not samples:
+            print(f"  {path:28} no successful requests")
+            continue
+        print(f"  {path:28} {len(samples) / elapsed:8.1f} req/s  "
+              f"p50 {statistics.median(samples):6.1f}ms  "
+              f"p95 {percentile(samples, 95):6.1f}ms  "
+              f"p99 {percentile(samples, 99):6.1f}ms")
+    print(f"  {'total':28} {total / elapsed:8.1f} req/s")
+    if errors:
+        print(f"  errors: {errors}")
+
+
+if __name__ == '__main__':
+    main()
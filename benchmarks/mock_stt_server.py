@@ -0,0 +1,98 @@
+"""
+Local stand-in for the ElevenLabs speech-to-text endpoint.
+
+Answers POST /v1/speech-to-text with a fixed transcript after a configurable
+delay, so transcription can be exercised without network or an API key:
+
+    python -m benchmarks.mock_stt_server --port 8765 --delay-ms 800
+    ELEVENLABS_BASE_URL=http://127.0.0.1:8765/v1 ELEVENLABS_API_KEY=mock python app.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockSTTHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    status = 200
+    transcript = "Mild cramps this morning, headache after lunch."
+    requests_seen = 0
+    bytes_seen = 0
+    # The next this many requests get 503 with Retry-After: 0, then `status` again
+    fail_next = 0
+    _lock = threading.Lock()
+
+    def do_POST(self):
+        if not self.path.endswith('/speech-to-text'):
+            self.send_error(404)
+            return
+
+        body = self._read_body()
+        with self._lock:
+            type(self).requests_seen += 1
+            type(self).bytes_seen += len(body)
+            failing = type(self).fail_next > 0
+            if failing:
+                type(self).fail_next -= 1
+
+        time.sleep(self.delay)
+        status = 503 if failing else self.status
+        payload = json.dumps({'text': self.transcript}) if status == 200 else '{"detail": "mock error"}'
+        self.send_response(status)
+        if failing:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload.encode())
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(port=0, delay_ms=0, status=200):
+    """Start the server on a background thread and return it; port 0 picks a free port"""
+    handler = type('Handler', (MockSTTHandler,), {
+        'delay': delay_ms / 1000,
+        'status': status,
+        'requests_seen': 0,
+        'bytes_seen': 0,
+        'fail_next': 0,
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay-ms', type=float, default=800)
+    parser.add_argument('--status', type=int, default=200, help='HTTP status to answer with')
+    args = parser.parse_args()
+
+    server = start(args.port, args.delay_ms, args.status)
+    print(f"🎙️  Mock STT listening on http://127.0.0.1:{server.server_address[1]}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
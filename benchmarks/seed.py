@@ -0,0 +1,60 @@
+"""Synthetic data for benchmarks run against FakeSupabase"""
+import random
+from datetime import date, timedelta
+
+SYMPTOMS = [
+    ('headache', 'Headache', 'fa-solid fa-brain'),
+    ('cramps', 'Cramps', 'fa-solid fa-bolt'),
+    ('nausea', 'Nausea', 'fa-solid fa-face-frown'),
+    ('fatigue', 'Fatigue', 'fa-solid fa-bed'),
+    ('brainFog', 'Brain Fog', 'fa-solid fa-cloud'),
+    ('bloating', 'Bloating', 'fa-solid fa-circle'),
+    ('breastTenderness', 'Tenderness', 'fa-solid fa-heart'),
+    ('backPain', 'Back Pain', 'fa-solid fa-ribbon'),
+    ('sex', 'Sex', 'fa-solid fa-face-smile'),
+]
+
+
+def seed_symptoms(db):
+    for key, label, icon in SYMPTOMS:
+        db.insert_row('symptoms', {'symptom_key': key, 'label': label, 'icon': icon})
+
+
+def seed_user(db, email, password='test123', name='Bench User', age=30):
+    return db.insert_row('users', {
+        'email': email,
+        'password': password,
+        'name': name,
+        'age': age,
+    })
+
+
+def seed_entries(db, user_id, days, end=None, rng=None):
+    """Write one entry per day for the last `days` days, with symptoms and factors"""
+    rng = rng or random.Random(user_id)
+    end = end or date.today()
+    symptom_rows = db.tables.get('symptoms', [])
+
+    for offset in range(days):
+        day = end - timedelta(days=offset)
+        in_period = (day.toordinal() % 28) < 5
+        entry = db.insert_row('journal_entries', {
+            'user_id': user_id,
+            'entry_date': day.isoformat(),
+            'text': 'Synthetic entry ' * rng.randint(1, 8),
+            'pain_level': rng.randint(0, 10),
+            'created_at': f'{day.isoformat()}T00:00:00+00:00',
+            'updated_at': f'{day.isoformat()}T00:00:00+00:00',
+        })
+        for symptom in rng.sample(symptom_rows, rng.randint(0, 3)):
+            db.insert_row('entry_symptoms', {'entry_id': entry['id'], 'symptom_id': symptom['id']})
+        db.insert_row('entry_factors', {
+            'entry_id': entry['id'],
+            'period': in_period,
+            'period_flow': 'medium' if in_period else None,
+            'birth_control': False,
+            'birth_control_type': None,
+            'sick': rng.random() < 0.05,
+            'sick_type': None,
+            'stress': rng.randint(1, 5),
+        })
@@ -0,0 +1,253 @@
+"""
+End-to-end benchmark suite for login, get_entries, revalidate_entries,
+save_entry and transcribe.
+
+Runs the real Flask app in-process (Flask test client) against a seeded
+FakeSupabase with a simulated per-round-trip latency, and against the mock
+STT server for transcription, so it needs no network or credentials. For
+each scenario it reports p50/p95/p99 latency and the Supabase round-trips and
+STT calls made per request. Time the fake spends evaluating queries is
+not counted; the simulated latency stands in for the database.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --json results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json
+
+With --baseline the run fails (exit 1) when a scenario makes more
+round-trips or STT calls per request than the baseline, or when a latency
+percentile is more than --tolerance (plus --slack-ms) slower. Round-trip counts are
+deterministic; latencies are dominated by the simulated network delay, so a
+baseline recorded on one machine is usable on another. Refresh the
+baseline with --json benchmarks/baseline.json after an intended change.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks import mock_stt_server
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.seed import SYMPTOMS, seed_entries, seed_symptoms, seed_user
+
+SCENARIOS = ('login', 'get_entries', 'revalidate_entries', 'save_entry', 'transcribe')
+PERCENTILES = (50, 95, 99)
+PASSWORD = 'test123'
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def build_app(db, stt_url):
+    """Import the app wired to `db` and the mock STT server"""
+    os.environ.update({
+        'SUPABASE_URL': 'http://fake-supabase',
+        'SUPABASE_KEY': 'fake',
+        'GEMINI_API_KEY': 'fake',
+        'ELEVENLABS_API_KEY': 'fake',
+        'ELEVENLABS_BASE_URL': stt_url,
+        'FLASK_SECRET_KEY': 'bench-secret',
+    })
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    import supabase
+    supabase.create_client = lambda url, key: db
+
+    from app import app
+    return app
+
+
+def seed(db, users, years, rng):
+    seed_symptoms(db)
+    accounts = []
+    for index in range(users):
+        user = seed_user(db, f'bench{index}@example.com', PASSWORD)
+        seed_entries(db, user['id'], years * 365, rng=random.Random(rng.random()))
+        accounts.append(user)
+    return accounts
+
+
+class Runner:
+    def __init__(self, app, db, stt, accounts, years, audio_bytes, rng):
+        self.app = app
+        self.db = db
+        self.stt = stt
+        self.accounts = accounts
+        self.years = years
+        self.audio = os.urandom(audio_bytes)
+        self.recordings = 0
+        self.rng = rng
+        self.clients = {}
+        self.etags = {}
+
+    def _client(self, user):
+        """A test client with a logged-in session for `user`"""
+        client = self.clients.get(user['id'])
+        if client is None:
+            client = self.app.test_client()
+            response = client.post('/api/login', json={'email': user['email'], 'password': PASSWORD})
+            assert response.status_code == 200, response.get_json()
+            self.clients[user['id']] = client
+        return client
+
+    def login(self, user):
+        client = self.app.test_client()
+        return client.post('/api/login', json={'email': user['email'], 'password': PASSWORD})
+
+    def get_entries(self, user):
+        return self._client(user).get('/api/entries')
+
+    def revalidate_entries(self, user):
+        """A reload of an unchanged entries page by a client that has it cached"""
+        etag = self.etags.get(user['id'])
+        response = self._client(user).get('/api/entries', headers={'If-None-Match': etag} if etag else {})
+        self.etags[user['id']] = response.headers.get('ETag', etag)
+        return response
+
+    def save_entry(self, user):
+        # Mostly edits of seeded days, plus new days before the seeded history
+        history = self.years * 365
+        offset = self.rng.randrange(history + history // 4)
+        return self._client(user).post('/api/entries', json={
+            'entry_date': (date.today() - timedelta(days=offset)).isoformat(),
+            'text': 'Benchmark entry ' * self.rng.randint(1, 8),
+            'pain_level': self.rng.randint(0, 10),
+            'symptoms': [key for key, _, _ in self.rng.sample(SYMPTOMS, self.rng.randint(0, 3))],
+            'factors': {'period': self.rng.random() < 0.2, 'stress': self.rng.randint(1, 5)}
+        })
+
+    def transcribe(self, user):
+        # A new recording each time, so the transcript cache never answers
+        self.recordings += 1
+        audio = self.recordings.to_bytes(8, 'big') + self.audio[8:]
+        return self._client(user).post('/api/transcribe', data={
+            'audio': (io.BytesIO(audio), 'audio.webm', 'audio/webm')
+        }, content_type='multipart/form-data')
+
+    def run(self, scenario, requests, warmup):
+        """Time `requests` calls of one scenario, after `warmup` untimed ones"""
+        call = getattr(self, scenario)
+        latencies, round_trips, stt_calls = [], [], []
+        for index in range(warmup + requests):
+            user = self.rng.choice(self.accounts)
+            self._client(user)
+            trips_before = self.db.round_trips
+            busy_before = self.db.busy_seconds
+            stt_before = self.stt.RequestHandlerClass.requests_seen
+
+            started = time.perf_counter()
+            response = call(user)
+            # The fake database's own Python work stands in for server time
+            # that --latency-ms already models, so it is left out
+            elapsed = (time.perf_counter() - started - (self.db.busy_seconds - busy_before)) * 1000
+
+            if response.status_code not in (200, 304):
+                raise RuntimeError(f"{scenario} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+            if index >= warmup:
+                latencies.append(elapsed)
+                round_trips.append(self.db.round_trips - trips_before)
+                stt_calls.append(self.stt.RequestHandlerClass.requests_seen - stt_before)
+
+        result = {f'p{pct}_ms': round(percentile(latencies, pct), 2) for pct in PERCENTILES}
+        result.update({
+            'requests': requests,
+            'mean_ms': round(statistics.fmean(latencies), 2),
+            'round_trips': round(statistics.fmean(round_trips), 2),
+            'max_round_trips': max(round_trips),
+            'stt_calls': round(statistics.fmean(stt_calls), 2),
+        })
+        return result
+
+
+def compare(results, baseline, tolerance, slack_ms):
+    """Regressions against a baseline run, as human-readable strings"""
+    problems = []
+    for scenario, expected in baseline['scenarios'].items():
+        actual = results['scenarios'].get(scenario)
+        if actual is None:
+            continue
+        for key in ('round_trips', 'max_round_trips', 'stt_calls'):
+            if actual[key] > expected[key]:
+                problems.append(f"{scenario}: {key} {actual[key]} > baseline {expected[key]}")
+        for pct in PERCENTILES:
+            key = f'p{pct}_ms'
+            limit = expected[key] * (1 + tolerance) + slack_ms
+            if actual[key] > limit:
+                problems.append(f"{scenario}: {key} {actual[key]} > {limit:.1f} "
+                                f"(baseline {expected[key]} +{tolerance:.0%} +{slack_ms}ms)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--years', type=int, default=3, help='years of daily entries per user')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--latency-ms', type=float, default=5, help='simulated delay per Supabase round-trip')
+    parser.add_argument('--stt-delay-ms', type=float, default=50, help='mock STT response delay')
+    parser.add_argument('--audio-kb', type=int, default=64, help='size of the uploaded audio')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, dest='scenarios',
+                        help='run only this scenario (repeatable)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH', help='write the results here')
+    parser.add_argument('--baseline', metavar='PATH', help='fail on regressions against this results file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed latency increase over the baseline (default 0.25 = 25%%)')
+    parser.add_argument('--slack-ms', type=float, default=5,
+                        help='allowed latency increase on top of --tolerance, for timer noise on fast scenarios')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    db = FakeSupabase()
+    print(f"Seeding {args.users} users x {args.years} years of entries...")
+    accounts = seed(db, args.users, args.years, rng)
+    db.latency = args.latency_ms / 1000
+
+    stt = mock_stt_server.start(delay_ms=args.stt_delay_ms)
+    app = build_app(db, f"http://127.0.0.1:{stt.server_address[1]}/v1")
+    runner = Runner(app, db, stt, accounts, args.years, args.audio_kb * 1024, rng)
+
+    results = {
+        'settings': {key: getattr(args, key) for key in ('users', 'years', 'requests', 'latency_ms', 'stt_delay_ms', 'audio_kb', 'seed')},
+        'scenarios': {}
+    }
+    try:
+        for scenario in args.scenarios or SCENARIOS:
+            results['scenarios'][scenario] = runner.run(scenario, args.requests, args.warmup)
+    finally:
+        stt.shutdown()
+
+    print(f"{'scenario':18} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'trips/req':>10} {'stt/req':>8}")
+    for scenario, result in results['scenarios'].items():
+        print(f"{scenario:18} {result['p50_ms']:8.1f} {result['p95_ms']:8.1f} {result['p99_ms']:8.1f} "
+              f"{result['round_trips']:10.2f} {result['stt_calls']:8.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"Results written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('settings') != results['settings']:
+            print(f"⚠️  Baseline was recorded with different settings: {baseline.get('settings')}")
+        problems = compare(results, baseline, args.tolerance, args.slack_ms)
+        if problems:
+            print("❌ Regressions against baseline:")
+            for problem in problems:
+                print(f"  {problem}")
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Build the front end's static bundles.
+
+Minifies static/src/app.css and static/src/app.js into content-hashed files
+under static/dist and records them in static/dist/manifest.json, which the
+page shell (templates/index.html) reads through asset_url(). Fingerprinted
+files are served with a one-year immutable Cache-Control, so after the
+first visit a browser only fetches the small shell. Each bundle also gets
+a maximally compressed .gz copy (and .br with the optional `brotli`
+package), which app.py sends to clients that accept it.
+
+    python build_assets.py            # build and print the payload report
+    python build_assets.py --check    # exit 1 if static/dist is out of date
+
+gunicorn.conf.py runs the build at startup. With the optional `rjsmin` and
+`rcssmin` packages installed (pip install rjsmin rcssmin) their minifiers
+are used; otherwise a conservative built-in one that only drops comments
+and whitespace.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+from services.assets import DIST_DIR, MANIFEST_NAME, PRECOMPRESSED, SOURCE_DIR
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_FOLDER = os.path.join(ROOT, 'static')
+SHELL_TEMPLATE = os.path.join(ROOT, 'templates', 'index.html')
+ASSETS = ('app.css', 'app.js')
+
+# Characters hashed into the file name; enough to never collide in practice
+HASH_CHARS = 12
+
+
+def minify_css(text):
+    try:
+        import rcssmin
+        return rcssmin.cssmin(text)
+    except ImportError:
+        pass
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    # Not around ':' or '+': "a :hover" and calc(1px + 2px) need their spaces
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    return text.replace(';}', '}').strip() + '\n'
+
+
+def minify_js(text):
+    """
+    Drops indentation, blank lines and whole-line // comments, leaving
+    every statement on its own line so automatic semicolon insertion is
+    unaffected. Lines inside multi-line template literals are only
+    re-indented, which is safe for the HTML they hold.
+    """
+    try:
+        import rjsmin
+        return rjsmin.jsmin(text) + '\n'
+    except ImportError:
+        pass
+    lines = []
+    in_template = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not in_template and (not stripped or stripped.startswith('//')):
+            continue
+        lines.append(stripped if not in_template else line.lstrip())
+        # Unescaped backticks open and close template literals
+        if len(re.findall(r'(?<!\\)`', line)) % 2:
+            in_template = not in_template
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def fingerprinted(name, content):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_CHARS]}{ext}"
+
+
+def compressed_copies(content):
+    """{suffix: bytes} of the precompressed copies served for a bundle"""
+    # Built once, so the slowest, smallest settings; mtime=0 keeps builds reproducible
+    copies = {PRECOMPRESSED['gzip']: gzip.compress(content, 9, mtime=0)}
+    try:
+        import brotli
+        copies[PRECOMPRESSED['br']] = brotli.compress(content, quality=11, mode=brotli.MODE_TEXT)
+    except ImportError:
+        pass
+    return copies
+
+
+def _write(path, content):
+    # Write then rename, so a request never gets half a file
+    with open(path + '.tmp', 'wb') as f:
+        f.write(content)
+    os.replace(path + '.tmp', path)
+
+
+def build(static_folder=STATIC_FOLDER):
+    """Write the bundles and manifest; returns {name: (source bytes, built bytes, built name)}"""
+    dist = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(dist, exist_ok=True)
+    results, files = {}, {}
+    for name in ASSETS:
+        with open(os.path.join(static_folder, SOURCE_DIR, name), encoding='utf-8') as f:
+            source = f.read()
+        built = MINIFIERS[os.path.splitext(name)[1]](source).encode('utf-8')
+        built_name = fingerprinted(name, built)
+        path = os.path.join(dist, built_name)
+        if not os.path.exists(path):
+            _write(path, built)
+        for suffix, compressed in compressed_copies(built).items():
+            if not os.path.exists(path + suffix):
+                _write(path + suffix, compressed)
+        files[name] = built_name
+        results[name] = (source.encode('utf-8'), built, built_name)
+
+    # Bundles from earlier builds stay, so pages already served keep working
+    manifest_path = os.path.join(dist, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump({'files': files}, f, indent=2)
+        f.write('\n')
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return results
+
+
+def is_current(static_folder=STATIC_FOLDER):
+    """Whether the manifest points at bundles built from the current sources"""
+    try:
+        with open(os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)) as f:
+            files = json.load(f)['files']
+    except (FileNotFoundError, ValueError, KeyError):
+        return False
+    for name in ASSETS:
+        with open(os.path.join(static_folder, SOURCE_DIR, name), encoding='utf-8') as f:
+            built = MINIFIERS[os.path.splitext(name)[1]](f.read()).encode('utf-8')
+        if files.get(name) != fingerprinted(name, built):
+            return False
+    return True
+
+
+def _sizes(data):
+    return len(data), len(gzip.compress(data, 9))
+
+
+def report(results):
+    """Bytes a browser downloads for the page, as one inline page versus shell plus bundles"""
+    with open(SHELL_TEMPLATE, 'rb') as f:
+        template = f.read()
+    css_tag = b"<link rel=\"stylesheet\" href=\"{{ asset_url('app.css') }}\">"
+    js_tag = b"<script src=\"{{ asset_url('app.js') }}\"></script>"
+    inline = template \
+        .replace(css_tag, b'<style>\n' + results['app.css'][0] + b'</style>') \
+        .replace(js_tag, b'<script>\n' + results['app.js'][0] + b'</script>')
+    shell = template \
+        .replace(b"{{ asset_url('app.css') }}", f"/static/{DIST_DIR}/{results['app.css'][2]}".encode()) \
+        .replace(b"{{ asset_url('app.js') }}", f"/static/{DIST_DIR}/{results['app.js'][2]}".encode())
+    # Each file is its own response, so each is compressed separately
+    first_visit = [_sizes(shell)] + [_sizes(results[name][1]) for name in ASSETS]
+
+    rows = [
+        ('inline page (before), every visit', _sizes(inline)),
+        ('shell + bundles, first visit', tuple(map(sum, zip(*first_visit)))),
+        ('shell only, repeat visit', _sizes(shell)),
+    ]
+    for name in ASSETS:
+        source, built, built_name = results[name]
+        rows.append((f"  {built_name} (source {len(source)} B)", _sizes(built)))
+
+    print(f"{'payload':48} {'raw B':>9} {'gzip B':>9}")
+    for label, (raw, gz) in rows:
+        print(f"{label:48} {raw:9} {gz:9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--check', action='store_true', help='only check that static/dist is up to date')
+    args = parser.parse_args()
+
+    if args.check:
+        if not is_current():
+            print("❌ static/dist is out of date; run python build_assets.py")
+            return 1
+        print("✅ static/dist is up to date")
+        return 0
+
+    report(build())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Application settings.
+
+Everything configurable is read here, once, from the environment (and .env
+when present). Modules import the values from here instead of calling
+os.getenv themselves. Missing credentials are not an error at this point:
+the service that needs them reports itself as unavailable in /api/health.
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _int(name, default):
+    return int(os.getenv(name, default))
+
+
+def _float(name, default):
+    return float(os.getenv(name, default))
+
+
+# Flask
+SECRET_KEY = os.getenv("FLASK_SECRET_KEY", "dev-secret-key")
+DEBUG = os.getenv("FLASK_DEBUG") == "1"
+
+# Supabase
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+SYMPTOM_CATALOG_TTL = _int("SYMPTOM_CATALOG_TTL", 300)
+
+# Gemini
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_PROMPT_TOKEN_BUDGET = _int("GEMINI_PROMPT_TOKEN_BUDGET", 4000)
+
+# ElevenLabs speech-to-text
+ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
+# Override to point at a local mock STT server when testing
+ELEVENLABS_BASE_URL = os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io/v1")
+ELEVENLABS_CONNECT_TIMEOUT = _float("ELEVENLABS_CONNECT_TIMEOUT", 5)
+ELEVENLABS_TIMEOUT = _float("ELEVENLABS_TIMEOUT", 30)
+ELEVENLABS_MAX_RETRIES = _int("ELEVENLABS_MAX_RETRIES", 2)
+ELEVENLABS_POOL_SIZE = _int("ELEVENLABS_POOL_SIZE", 10)
+
+# Transcription uploads and background jobs
+TRANSCRIBE_MAX_UPLOAD_BYTES = _int("TRANSCRIBE_MAX_UPLOAD_BYTES", 25 * 1024 * 1024)
+TRANSCRIBE_MAX_WORKERS = _int("TRANSCRIBE_MAX_WORKERS", 4)
+TRANSCRIBE_MAX_QUEUE = _int("TRANSCRIBE_MAX_QUEUE", 32)
+TRANSCRIBE_JOB_TTL = _int("TRANSCRIBE_JOB_TTL", 600)
+# A job still queued or running this long after submission is failed
+TRANSCRIBE_JOB_MAX_SECONDS = _int("TRANSCRIBE_JOB_MAX_SECONDS", 300)
+
+# Daily summaries batch worker
+SUMMARY_WORKER_CONCURRENCY = _int("SUMMARY_WORKER_CONCURRENCY", 4)
+SUMMARY_WORKER_RPM = _int("SUMMARY_WORKER_RPM", 60)
+
+# Caches. With REDIS_URL set (e.g. redis://localhost:6379/0) they are shared
+# by every worker; otherwise each worker keeps its own in-process copy.
+REDIS_URL = os.getenv("REDIS_URL")
+USER_CACHE_TTL = _int("USER_CACHE_TTL", 300)
+USER_CACHE_MAX = _int("USER_CACHE_MAX", 10000)
+# AI insights and analytics results, kept this long after last use
+INSIGHTS_CACHE_TTL = _int("INSIGHTS_CACHE_TTL", 7 * 24 * 3600)
+# Without Redis, per-user data versions (ETags of /api/entries) are kept in
+# this directory so every worker sees them; gunicorn.conf.py sets one up
+DATA_VERSION_DIR = os.getenv("DATA_VERSION_DIR")
+
+# Metrics (/api/metrics, Prometheus text format)
+# Requests slower than this many milliseconds are logged; 0 turns the log off
+SLOW_REQUEST_MS = _int("SLOW_REQUEST_MS", 0)
+# When set, /api/metrics requires "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# Directory where each server process writes its metrics so any of them can
+# serve the total; gunicorn.conf.py sets one up
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_SECONDS = _float("METRICS_FLUSH_SECONDS", 5)
+
+# Logging (services/logging_setup.py): DEBUG, INFO, WARNING or ERROR, and
+# "json" (one object per line) or "text"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text" if DEBUG else "json")
+
+# Bulk import (POST /api/entries/import)
+IMPORT_MAX_BYTES = _int("IMPORT_MAX_BYTES", 20 * 1024 * 1024)
+IMPORT_MAX_ENTRIES = _int("IMPORT_MAX_ENTRIES", 20000)
+IMPORT_BATCH_SIZE = _int("IMPORT_BATCH_SIZE", 500)
+
+# Response compression (services/compression.py). JSON, HTML, CSS and JS
+# bodies of at least COMPRESS_MIN_BYTES are sent brotli- (with the optional
+# `brotli` package) or gzip-compressed, as the client accepts; 0 turns it off
+COMPRESS_MIN_BYTES = _int("COMPRESS_MIN_BYTES", 1024)
+COMPRESS_GZIP_LEVEL = _int("COMPRESS_GZIP_LEVEL", 6)
+COMPRESS_BROTLI_QUALITY = _int("COMPRESS_BROTLI_QUALITY", 4)
+
+# Transcript cache (services/transcript_cache.py): repeats of the same audio
+# from the same user within TRANSCRIPT_CACHE_TTL seconds are answered without
+# calling ElevenLabs. TRANSCRIPT_CACHE_MAX=0 turns it off. With
+# TRANSCRIPT_CACHE_DIR set, transcripts are also kept there (one 0600 file
+# each), shared by every server process on the host.
+TRANSCRIPT_CACHE_MAX = _int("TRANSCRIPT_CACHE_MAX", 1000)
+TRANSCRIPT_CACHE_TTL = _int("TRANSCRIPT_CACHE_TTL", 3600)
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR")
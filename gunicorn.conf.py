@@ -0,0 +1,89 @@
+"""
+Production server settings, picked up automatically by
+
+    gunicorn wsgi:app
+
+Every setting can be overridden from the environment (PORT, WEB_CONCURRENCY,
+GUNICORN_THREADS, GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT).
+"""
+import os
+import shutil
+import tempfile
+
+
+def _cpu_count():
+    """Cores this process may use (respects container CPU affinity)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+
+# Requests mostly wait on Supabase, ElevenLabs and Gemini, so each process
+# runs several threads; one process per core keeps JSON/pandas work parallel.
+# SSE endpoints (insight streaming, transcription job events) hold a thread
+# for their whole duration, which is why the thread count is generous.
+worker_class = 'gthread'
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, _cpu_count())))
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+
+# Import the app once in the master and fork workers from it: faster
+# restarts and shared read-only memory. Service clients (Supabase, Gemini,
+# ElevenLabs) are built lazily on first use, so each worker creates its own
+# after the fork and no connection pools are shared between processes.
+preload_app = True
+
+# Seconds a worker may go silent before it is restarted, and how long
+# in-flight requests get to finish after SIGTERM/SIGHUP
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Recycle workers now and then so slow leaks can't accumulate
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = '-'
+errorlog = '-'
+
+# Heartbeat files on tmpfs; a disk-backed /tmp can stall workers in containers
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# Each worker writes its metrics here so /api/metrics can report all of them
+# (read by config.py, which is imported after this file). One directory per
+# port, emptied at startup so counters restart with the server.
+os.environ.setdefault("METRICS_DIR", os.path.join(
+    worker_tmp_dir if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    f"advora-metrics-{bind.rsplit(':', 1)[-1]}"
+))
+
+# Per-user data versions behind the /api/entries ETags, when REDIS_URL isn't
+# set. Emptied at startup too: new versions only cost clients one full reload.
+os.environ.setdefault("DATA_VERSION_DIR", os.path.join(
+    os.path.dirname(os.environ["METRICS_DIR"]),
+    f"advora-versions-{bind.rsplit(':', 1)[-1]}"
+))
+
+
+def on_starting(server):
+    shutil.rmtree(os.environ["METRICS_DIR"], ignore_errors=True)
+    shutil.rmtree(os.environ["DATA_VERSION_DIR"], ignore_errors=True)
+    # Fingerprinted CSS/JS bundles for the page shell (see build_assets.py)
+    import build_assets
+    try:
+        build_assets.build()
+    except OSError as e:
+        # e.g. a read-only image; whatever was built into it is served
+        server.log.warning("Could not build static bundles: %s", e)
+
+
+def worker_exit(server, worker):
+    """Fail jobs that never started, let running transcriptions finish, save metrics"""
+    from routes.transcribe import transcription_jobs
+    from routes.metrics import metrics_files
+    transcription_jobs.shutdown(wait=True)
+    if metrics_files:
+        metrics_files.retire()
@@ -1,101 +1,88 @@
 from flask import Blueprint, request, jsonify, session
-from services.supabase_service import supabase_service
+import logging
+from services.supabase_service import supabase_client as supabase
+from services.user_cache import user_cache
+from routes.conditional import etag_for, not_modified, with_validators
 
 # Create blueprint FIRST
 auth_bp = Blueprint('auth', __name__)
 
-if supabase_service:
-    supabase = supabase_service.get_client()
-else:
-    supabase = None
-    print("⚠️  Auth routes: Supabase not available")
+logger = logging.getLogger(__name__)
+
+def _profile_response(profile):
+    """/api/me body with an ETag of its content, or a 304 if the client already has it"""
+    etag = etag_for(profile)
+    return not_modified(etag) or with_validators((jsonify({'user': profile}), 200), etag)
 
 @auth_bp.route('/api/login', methods=['POST'])
 def login():
-    print("\n" + "="*50)
-    print("LOGIN ATTEMPT DETECTED")
-    print("="*50)
-    
     if not supabase:
-        print("❌ Supabase not available")
+        logger.error("Login failed: Supabase not available")
         return jsonify({'error': 'Database connection not available'}), 500
     
     # Get request data
     data = request.json
-    print(f"📨 Request data received: {data}")
     
     email = data.get('email')
     password = data.get('password')
     
-    print(f"📧 Email: '{email}'")
-    print(f"🔑 Password: '{password}'")
-    
     try:
         # Query user from Supabase
-        print("\n🔍 Querying Supabase for user...")
         result = supabase.table('users') \
             .select('*') \
             .eq('email', email) \
             .execute()
         
-        print(f"📊 Query result: {result.data}")
-        
         if not result.data:
-            print("❌ No user found with that email")
+            logger.info("Login failed: no user with that email")
             return jsonify({'error': 'Invalid credentials'}), 401
         
         user = result.data[0]
-        print(f"✅ Found user: {user['email']}")
-        print(f"🔐 Stored password: '{user['password']}'")
-        print(f"🔐 Provided password: '{password}'")
         
         # Check password
         if user['password'] == password:
-            print("✅ Password match!")
-            
             # Set session
             session['user_id'] = user['id']
             session['user_email'] = user['email']
             session.permanent = True
             
-            print(f"✅ Session set - user_id: {session.get('user_id')}")
-            print(f"✅ Session set - user_email: {session.get('user_email')}")
+            # /api/me reads the profile from here instead of the users table
+            profile = user_cache.put(user)
+            
+            logger.info("User %s logged in", user['id'])
             
             return jsonify({
                 'success': True,
-                'user': {
-                    'id': user['id'],
-                    'email': user['email'],
-                    'name': user['name'],
-                    'age': user['age']
-                }
+                'user': profile
             }), 200
         else:
-            print("❌ Password mismatch!")
-            print(f"   Expected: '{user['password']}'")
-            print(f"   Got: '{password}'")
+            logger.info("Login failed: wrong password for user %s", user['id'])
             return jsonify({'error': 'Invalid credentials'}), 401
             
     except Exception as e:
-        print(f"❌ Login error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Login error")
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/api/logout', methods=['POST'])
 def logout():
+    user_id = session.get('user_id')
+    if user_id:
+        user_cache.invalidate(user_id)
     session.clear()
-    print("✅ User logged out, session cleared")
+    logger.info("User %s logged out", user_id)
     return jsonify({'success': True}), 200
 
 @auth_bp.route('/api/me', methods=['GET'])
 def get_current_user():
     user_id = session.get('user_id')
-    print(f"Getting current user - session user_id: {user_id}")
     
     if not user_id:
         return jsonify({'user': None}), 200
     
+    cached = user_cache.get(user_id)
+    if cached:
+        return _profile_response(cached)
+    
     if not supabase:
         return jsonify({'error': 'Database connection not available'}), 500
     
@@ -106,14 +93,13 @@ def get_current_user():
             .execute()
         
         if result.data:
-            print(f"✅ Found user in database: {result.data[0]['email']}")
-            return jsonify({'user': result.data[0]}), 200
+            return _profile_response(user_cache.put(result.data[0]))
         else:
-            print("❌ User not found in database, clearing session")
+            logger.info("User %s no longer exists, clearing session", user_id)
             session.clear()
             return jsonify({'user': None}), 200
     except Exception as e:
-        print(f"Error fetching user: {e}")
+        logger.exception("Error fetching user %s", user_id)
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/api/debug/users', methods=['GET'])
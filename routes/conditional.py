@@ -0,0 +1,45 @@
+"""
+Conditional GET helpers for per-user JSON endpoints.
+
+Handlers compute a strong ETag (and optionally Last-Modified) before doing
+any expensive work, return not_modified() when it is not None, and pass
+their full response through with_validators().
+"""
+from flask import request, make_response
+from werkzeug.http import is_resource_modified
+import hashlib
+import json
+
+# The browser must revalidate every time, and shared caches must not keep
+# a copy: the body depends on the session cookie
+CACHE_CONTROL = 'private, no-cache'
+
+
+def etag_for(*parts):
+    """Strong ETag from version tokens or content, plus the query string"""
+    digest = hashlib.sha256()
+    for part in (*parts, request.query_string):
+        digest.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()[:32]
+
+
+def not_modified(etag, last_modified=None):
+    """
+    A 304 response when the client's If-None-Match (or, without one,
+    If-Modified-Since) still matches, otherwise None.
+    """
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return with_validators(('', 304), etag, last_modified)
+
+
+def with_validators(result, etag, last_modified=None):
+    """Attach ETag, Last-Modified and the caching headers to a view result"""
+    response = make_response(result)
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.vary.add('Cookie')
+    return response
@@ -1,19 +1,33 @@
-from flask import Blueprint, request, jsonify, session
-from services.supabase_service import supabase_service
-from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, session, stream_with_context
+import logging
+from services.supabase_service import supabase_client as supabase
+from services.entry_store import EntryStore, UserNotFound, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, DEFAULT_SYNC_LIMIT
+from services import entry_transfer
+from services.entry_transfer import InvalidImport, ImportTooLarge
+from services.symptom_catalog import SymptomCatalog
+from services.user_cache import user_cache
+from services.data_version import data_versions
+from routes.conditional import etag_for, not_modified, with_validators
+from datetime import date, datetime, timezone
+import config
 
 # Create the blueprint FIRST
 entries_bp = Blueprint('entries', __name__)
 
-if supabase_service:
-    supabase = supabase_service.get_client()
-else:
-    supabase = None
-    print("⚠️  Entries routes: Supabase not available")
+logger = logging.getLogger(__name__)
+
+# Both only hold the (lazy) client; nothing connects until the first query
+symptom_catalog = SymptomCatalog(supabase, ttl=config.SYMPTOM_CATALOG_TTL)
+entry_store = EntryStore(supabase, catalog=symptom_catalog)
 
 @entries_bp.route('/api/entries', methods=['GET'])
 def get_entries():
-    """Get all entries for the logged-in user"""
+    """
+    Get one page of entries for the logged-in user, newest first.
+    Query params: from, to (YYYY-MM-DD), limit, cursor (from a previous page)
+    Answers If-None-Match / If-Modified-Since with 304 while the user's
+    entries are unchanged, without querying Supabase.
+    """
     user_id = session.get('user_id')
     if not user_id:
         return jsonify({'error': 'Not authenticated'}), 401
@@ -21,46 +35,101 @@ def get_entries():
     if not supabase:
         return jsonify({'error': 'Database connection not available'}), 500
     
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    cursor = request.args.get('cursor')
+    
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        for value in (date_from, date_to):
+            if value:
+                date.fromisoformat(value)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or date'}), 400
+    
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+    
+    # Read before the entries, so a save in between makes the ETag stale, never the body
+    version = data_versions.current(user_id)
+    if version:
+        etag = etag_for(user_id, version['tag'])
+        last_modified = datetime.fromtimestamp(version['modified'], timezone.utc)
+        unchanged = not_modified(etag, last_modified)
+        if unchanged:
+            return unchanged
+    
     try:
-        # Get all journal entries with their symptoms and factors
-        result = supabase.table('journal_entries') \
-            .select('*') \
-            .eq('user_id', user_id) \
-            .order('entry_date', desc=True) \
-            .execute()
+        # Entries, symptoms and factors come back in one embedded select
+        entries, next_cursor = entry_store.fetch_page(
+            user_id,
+            limit=limit,
+            cursor=cursor,
+            date_from=date_from,
+            date_to=date_to
+        )
         
-        # Manually fetch symptoms and factors for each entry
-        entries_with_details = []
-        for entry in result.data:
-            # Get symptoms for this entry
-            symptoms_result = supabase.table('entry_symptoms') \
-                .select('symptoms(id, symptom_key, label, icon)') \
-                .eq('entry_id', entry['id']) \
-                .execute()
-            
-            # Get factors for this entry
-            factors_result = supabase.table('entry_factors') \
-                .select('*') \
-                .eq('entry_id', entry['id']) \
-                .execute()
-            
-            entry_with_details = {
-                **entry,
-                'symptoms': [s['symptoms'] for s in symptoms_result.data] if symptoms_result.data else [],
-                'factors': factors_result.data[0] if factors_result.data else {}
-            }
-            entries_with_details.append(entry_with_details)
+        result = jsonify({'entries': entries, 'next_cursor': next_cursor}), 200
+        return with_validators(result, etag, last_modified) if version else result
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.exception("Error fetching entries for user %s", user_id)
+        return jsonify({'error': str(e)}), 500
+
+@entries_bp.route('/api/entries/changes', methods=['GET'])
+def get_entry_changes():
+    """
+    Delta sync: entries changed and entries deleted since a sync token.
+    Query params: since (the previous response's next_token; omit for a
+    full sync), limit
+    Returns {entries, deleted: [{id, entry_date}], next_token, more}. Keep
+    next_token and call again right away while `more` is true. A client
+    with nothing new gets the same next_token back, so repeating the call
+    with If-None-Match gets a 304 after one small query. The ETag comes from
+    the newest entry write and deletion in the database rather than the data
+    version, so entries changed or deleted outside the app are noticed too.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    if not supabase:
+        return jsonify({'error': 'Database connection not available'}), 500
+    
+    try:
+        limit = int(request.args.get('limit', DEFAULT_SYNC_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+    
+    try:
+        # Read before the changes, so a write in between makes the ETag stale, never the body
+        etag = etag_for(user_id, entry_store.sync_position(user_id))
+        unchanged = not_modified(etag)
+        if unchanged:
+            return unchanged
+        
+        entries, deleted, next_token, more = entry_store.fetch_changes(
+            user_id,
+            token=request.args.get('since'),
+            limit=limit
+        )
         
-        return jsonify(entries_with_details), 200
+        result = jsonify({'entries': entries, 'deleted': deleted, 'next_token': next_token, 'more': more}), 200
+        return with_validators(result, etag)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        print(f"Error fetching entries: {e}")
+        logger.exception("Error fetching entry changes for user %s", user_id)
         return jsonify({'error': str(e)}), 500
 
 @entries_bp.route('/api/entries', methods=['POST'])
 def save_entry():
     """Save or update a journal entry"""
     user_id = session.get('user_id')
-    print(f"Saving entry for user_id: {user_id}")
     
     if not user_id:
         return jsonify({'error': 'Not authenticated'}), 401
@@ -76,112 +145,130 @@ def save_entry():
     factors = data.get('factors', {})
     
     try:
-        # First, verify the user exists
-        user_check = supabase.table('users') \
-            .select('id') \
-            .eq('id', user_id) \
-            .execute()
-        
-        if not user_check.data:
-            print(f"User {user_id} not found in database")
-            return jsonify({'error': 'User not found'}), 401
+        # Upsert + symptom/factor replacement happen in one transaction
+        entry_id = entry_store.save_entry(
+            user_id,
+            entry_date,
+            text,
+            pain_level,
+            symptoms,
+            factors
+        )
+        logger.debug("Saved entry %s for user %s on %s", entry_id, user_id, entry_date)
         
-        # Check if entry exists for this date
-        existing = supabase.table('journal_entries') \
-            .select('id') \
-            .eq('user_id', user_id) \
-            .eq('entry_date', entry_date) \
-            .execute()
-        
-        print(f"Existing entry check: {existing.data}")
-        
-        if existing.data:
-            # Update existing entry
-            entry_id = existing.data[0]['id']
-            print(f"Updating existing entry: {entry_id}")
-            
-            # Update journal entry
-            update_result = supabase.table('journal_entries') \
-                .update({
-                    'text': text,
-                    'pain_level': pain_level,
-                    'updated_at': datetime.now().isoformat()
-                }) \
-                .eq('id', entry_id) \
-                .eq('user_id', user_id) \
-                .execute()
-            
-            print(f"Update result: {update_result}")
-            
-            # Delete existing symptoms and factors to replace them
-            supabase.table('entry_symptoms').delete().eq('entry_id', entry_id).execute()
-            supabase.table('entry_factors').delete().eq('entry_id', entry_id).execute()
-        else:
-            # Create new entry
-            print(f"Creating new entry for user {user_id} on date {entry_date}")
-            
-            entry_result = supabase.table('journal_entries') \
-                .insert({
-                    'user_id': user_id,
-                    'entry_date': entry_date,
-                    'text': text,
-                    'pain_level': pain_level
-                }) \
-                .execute()
-            
-            print(f"Insert result: {entry_result}")
-            
-            if not entry_result.data:
-                return jsonify({'error': 'Failed to create entry'}), 500
-                
-            entry_id = entry_result.data[0]['id']
-            print(f"Created entry with ID: {entry_id}")
-        
-        # Insert symptoms if any
-        if symptoms and len(symptoms) > 0:
-            print(f"Inserting symptoms: {symptoms}")
-            
-            # Get symptom IDs from keys
-            symptom_ids = supabase.table('symptoms') \
-                .select('id, symptom_key') \
-                .in_('symptom_key', symptoms) \
-                .execute()
-            
-            print(f"Found symptom IDs: {symptom_ids.data}")
-            
-            for symptom in symptom_ids.data:
-                symptom_insert = supabase.table('entry_symptoms') \
-                    .insert({
-                        'entry_id': entry_id,
-                        'symptom_id': symptom['id']
-                    }) \
-                    .execute()
-                print(f"Inserted symptom: {symptom_insert}")
-        
-        # Insert factors
-        factors_data = {
-            'entry_id': entry_id,
-            'period': factors.get('period', False),
-            'period_flow': factors.get('period_flow') if factors.get('period') else None,
-            'birth_control': factors.get('birth_control', False),
-            'birth_control_type': factors.get('birth_control_type') if factors.get('birth_control') else None,
-            'sick': factors.get('sick', False),
-            'sick_type': factors.get('sick_type') if factors.get('sick') else None,
-            'stress': factors.get('stress', 3)
-        }
-        
-        print(f"Inserting factors: {factors_data}")
-        
-        factors_insert = supabase.table('entry_factors') \
-            .insert(factors_data) \
-            .execute()
+        return jsonify({'success': True, 'entry_id': entry_id}), 200
         
-        print(f"Factors insert result: {factors_insert}")
+    except UserNotFound:
+        logger.info("Save for unknown user %s", user_id)
+        user_cache.invalidate(user_id)
+        return jsonify({'error': 'User not found'}), 401
+    except Exception as e:
+        logger.exception("Error saving entry for user %s", user_id)
+        return jsonify({'error': str(e)}), 500
+    finally:
+        # Even after an error, since the write may still have committed
+        data_versions.bump(user_id)
+
+@entries_bp.route('/api/entries/export', methods=['GET'])
+def export_entries():
+    """
+    Download the user's journal as NDJSON (default) or CSV, newest first.
+    Query params: format (ndjson|csv), from, to (YYYY-MM-DD)
+    The file is streamed one page of entries at a time.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    if not supabase:
+        return jsonify({'error': 'Database connection not available'}), 500
+    
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    try:
+        fmt = entry_transfer.detect_format(request.args.get('format', 'ndjson'))
+        for value in (date_from, date_to):
+            if value:
+                date.fromisoformat(value)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def generate():
+        if fmt == 'csv':
+            yield entry_transfer.csv_header()
+        line = entry_transfer.csv_line if fmt == 'csv' else entry_transfer.ndjson_line
+        try:
+            for entry in entry_store.iter_entries(user_id, date_from, date_to):
+                yield line(entry_transfer.export_record(entry))
+        except Exception:
+            # Headers are already sent; the client sees a truncated file
+            logger.exception("Export failed for user %s", user_id)
+            raise
+    
+    filename = f"advora-entries-{date.today().isoformat()}.{fmt}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=entry_transfer.FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+@entries_bp.route('/api/entries/import', methods=['POST'])
+def import_entries():
+    """
+    Bulk-import entries from NDJSON or CSV (the export format), as a
+    multipart 'file' upload or as the raw request body. Entries replace
+    any existing entry on the same day. The whole file is validated first:
+    if any line is invalid nothing is written and the bad lines are listed.
+    Query params: format (ndjson|csv; otherwise from the file name or content type)
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    if not supabase:
+        return jsonify({'error': 'Database connection not available'}), 500
+    
+    # Checked again while reading, for chunked uploads without a Content-Length
+    if request.content_length and request.content_length > config.IMPORT_MAX_BYTES:
+        return jsonify({'error': f'Import is larger than {config.IMPORT_MAX_BYTES} bytes'}), 413
+    
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('file')
+        if not upload:
+            return jsonify({'error': 'No file provided'}), 400
+        stream, filename, mimetype = upload.stream, upload.filename, upload.mimetype
+    else:
+        stream, filename, mimetype = request.stream, None, request.mimetype
+    
+    try:
+        fmt = entry_transfer.detect_format(request.args.get('format'), mimetype, filename)
+        entries = entry_transfer.parse_import(
+            stream,
+            fmt,
+            set(symptom_catalog.keys().values()),
+            config.IMPORT_MAX_ENTRIES,
+            config.IMPORT_MAX_BYTES
+        )
+    except ImportTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except InvalidImport as e:
+        return jsonify({'error': 'Invalid import', 'errors': e.errors, 'error_count': e.error_count}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        batches = entry_store.import_entries(user_id, entries, config.IMPORT_BATCH_SIZE)
+        logger.info("Imported %d entries in %d batches for user %s", len(entries), batches, user_id)
         
-        return jsonify({'success': True, 'entry_id': entry_id}), 200
+        return jsonify({'success': True, 'imported': len(entries), 'batches': batches}), 200
         
+    except UserNotFound:
+        logger.info("Import for unknown user %s", user_id)
+        user_cache.invalidate(user_id)
+        return jsonify({'error': 'User not found'}), 401
     except Exception as e:
-        print(f"Error saving entry: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        logger.exception("Error importing entries for user %s", user_id)
+        return jsonify({'error': str(e)}), 500
+    finally:
+        # Even after an error: batches before the failing one are written
+        data_versions.bump(user_id)
@@ -0,0 +1,277 @@
+from flask import Blueprint, Response, request, jsonify, session
+import logging
+from services.gemini_service import GeminiService, ANALYSIS_UNAVAILABLE
+from services.insights_cache import insights_cache, content_hash
+from services.data_version import data_versions
+from services.lazy import Lazy
+from services.summary_store import SummaryStore
+from routes.entries import supabase, entry_store
+from datetime import date, timedelta
+import json
+
+# Create blueprint FIRST
+insights_bp = Blueprint('insights', __name__)
+
+logger = logging.getLogger(__name__)
+
+# How far back pattern analysis looks by default
+DEFAULT_ANALYSIS_DAYS = 90
+MAX_ANALYSIS_DAYS = 730
+
+summary_store = SummaryStore(supabase)
+
+# Gemini client, created on first use
+gemini = Lazy('gemini', GeminiService)
+
+def _unavailable():
+    if not supabase:
+        return jsonify({'error': 'Database connection not available'}), 500
+    if not gemini:
+        return jsonify({'error': 'Insights service not available'}), 500
+    return None
+
+def _parse_days():
+    """Read ?days=. Returns (days, None) or (None, error response)."""
+    try:
+        days = int(request.args.get('days', DEFAULT_ANALYSIS_DAYS))
+    except ValueError:
+        return None, (jsonify({'error': 'Invalid days'}), 400)
+    if not 1 <= days <= MAX_ANALYSIS_DAYS:
+        return None, (jsonify({'error': f'days must be between 1 and {MAX_ANALYSIS_DAYS}'}), 400)
+    return days, None
+
+def _analytics_summary(entries):
+    """Precomputed statistics for the analysis prompt; the prompt works without them"""
+    try:
+        # numpy/pandas are slow to import, so only load them once insights are used
+        from services import analytics
+        frame = analytics.build_frame(analytics.records_from_entries(entries))
+        return analytics.summarize(analytics.analyze(frame))
+    except Exception:
+        logger.warning("Analytics summary failed", exc_info=True)
+        return None
+
+def _version_tag(user_id):
+    """
+    The user's data version tag, read before their entries so a write that
+    lands in between leaves the cached result stale; None if unavailable
+    """
+    version = data_versions.current(user_id)
+    return version['tag'] if version else None
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@insights_bp.route('/api/insights', methods=['GET'])
+def get_insights():
+    """
+    AI pattern analysis over the last `days` days of entries (default 90).
+    Cached per user until the analysed entries change.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    error = _unavailable()
+    if error:
+        return error
+
+    days, error = _parse_days()
+    if error:
+        return error
+
+    kind = f'patterns:{days}'
+    version = _version_tag(user_id)
+
+    # Recently verified results skip the database as well as the model
+    cached = insights_cache.get_recent(user_id, kind, version)
+    if cached:
+        return jsonify({**cached, 'cached': True}), 200
+
+    try:
+        since = (date.today() - timedelta(days=days)).isoformat()
+        entries = entry_store.fetch_entries(user_id, date_from=since)
+        digest = content_hash(entries)
+
+        cached = insights_cache.get(user_id, kind, digest, version)
+        if cached:
+            return jsonify({**cached, 'cached': True}), 200
+
+        if not entries:
+            return jsonify({'insights': None, 'entry_count': 0, 'cached': False}), 200
+
+        logger.info("Generating insights for user %s from %d entries", user_id, len(entries))
+        prompt, prompt_stats = gemini.build_analysis_prompt(entries, _analytics_summary(entries))
+        text = gemini.run_analysis(prompt)
+        result = {
+            'insights': text,
+            'entry_count': len(entries),
+            'days': days,
+            'prompt_stats': prompt_stats
+        }
+
+        # Don't cache the fallback message from a failed model call
+        if text != ANALYSIS_UNAVAILABLE:
+            insights_cache.put(user_id, kind, digest, result, version)
+
+        return jsonify({**result, 'cached': False}), 200
+    except Exception as e:
+        logger.exception("Error generating insights for user %s", user_id)
+        return jsonify({'error': str(e)}), 500
+
+@insights_bp.route('/api/insights/stream', methods=['GET'])
+def stream_insights():
+    """
+    Server-sent events version of /api/insights.
+    Emits 'meta' (prompt size), then 'chunk' events as the model writes,
+    then 'done'. Cached results arrive as a single 'chunk'.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    error = _unavailable()
+    if error:
+        return error
+
+    days, error = _parse_days()
+    if error:
+        return error
+
+    kind = f'patterns:{days}'
+    version = _version_tag(user_id)
+    cached = insights_cache.get_recent(user_id, kind, version)
+    digest = None
+    entries = []
+
+    if not cached:
+        try:
+            since = (date.today() - timedelta(days=days)).isoformat()
+            entries = entry_store.fetch_entries(user_id, date_from=since)
+        except Exception as e:
+            logger.exception("Error loading entries for insights stream")
+            return jsonify({'error': str(e)}), 500
+        digest = content_hash(entries)
+        cached = insights_cache.get(user_id, kind, digest, version)
+
+    def events():
+        if cached:
+            yield _sse('meta', {'cached': True, 'entry_count': cached['entry_count']})
+            yield _sse('chunk', {'text': cached['insights']})
+            yield _sse('done', {})
+            return
+
+        if not entries:
+            yield _sse('meta', {'cached': False, 'entry_count': 0})
+            yield _sse('done', {})
+            return
+
+        prompt, prompt_stats = gemini.build_analysis_prompt(entries, _analytics_summary(entries))
+        yield _sse('meta', {'cached': False, 'entry_count': len(entries), 'prompt_stats': prompt_stats})
+
+        # If the client goes away, the server closes this generator at the
+        # current yield, which closes the model stream and frees the worker
+        parts = []
+        try:
+            for text in gemini.stream_analysis(prompt):
+                parts.append(text)
+                yield _sse('chunk', {'text': text})
+        except Exception:
+            logger.exception("Gemini streaming error")
+            yield _sse('error', {'error': ANALYSIS_UNAVAILABLE})
+            return
+
+        insights_cache.put(user_id, kind, digest, {
+            'insights': ''.join(parts),
+            'entry_count': len(entries),
+            'days': days,
+            'prompt_stats': prompt_stats
+        }, version)
+        yield _sse('done', {})
+
+    return Response(
+        events(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@insights_bp.route('/api/insights/analytics', methods=['GET'])
+def get_analytics():
+    """
+    Deterministic statistics over the user's history, no model call:
+    pain vs stress, symptom co-occurrence, period-phase alignment and
+    lagged effects of sick/birth control days. ?days= limits the window;
+    without it the whole history is used.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    if not supabase:
+        return jsonify({'error': 'Database connection not available'}), 500
+
+    from services import analytics
+
+    since = None
+    if 'days' in request.args:
+        days, error = _parse_days()
+        if error:
+            return error
+        since = (date.today() - timedelta(days=days)).isoformat()
+
+    kind = f"analytics:{request.args.get('days', 'all')}"
+    version = _version_tag(user_id)
+    cached = insights_cache.get_recent(user_id, kind, version)
+    if cached:
+        return jsonify({**cached, 'cached': True}), 200
+
+    try:
+        records = entry_store.fetch_columns(user_id, date_from=since)
+        digest = content_hash(records)
+        cached = insights_cache.get(user_id, kind, digest, version)
+        if cached:
+            return jsonify({**cached, 'cached': True}), 200
+
+        result = analytics.analyze(analytics.build_frame(records))
+        insights_cache.put(user_id, kind, digest, result, version)
+        return jsonify({**result, 'cached': False}), 200
+    except Exception as e:
+        logger.exception("Error computing analytics for user %s", user_id)
+        return jsonify({'error': str(e)}), 500
+
+@insights_bp.route('/api/insights/daily/<entry_date>', methods=['GET'])
+def get_daily_summary(entry_date):
+    """
+    Short AI summary of one day's entry, as written by the batch worker
+    (python -m workers.daily_summaries). Never calls the model itself:
+    returns 202 with summary null until the worker has reached the entry.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    if not supabase:
+        return jsonify({'error': 'Database connection not available'}), 500
+
+    try:
+        date.fromisoformat(entry_date)
+    except ValueError:
+        return jsonify({'error': 'Invalid date'}), 400
+
+    try:
+        found = summary_store.get(user_id, entry_date)
+        if not found:
+            return jsonify({'error': 'No entry for that date'}), 404
+
+        result = {
+            'summary': found['summary'],
+            'entry_date': entry_date,
+            'generated_at': found['created_at'],
+            'stale': found['stale']
+        }
+        if found['summary'] is None:
+            return jsonify({**result, 'status': 'pending'}), 202
+        return jsonify(result), 200
+    except Exception as e:
+        logger.exception("Error loading daily summary for user %s", user_id)
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,65 @@
+from flask import Blueprint, Response, request, jsonify, g
+import logging
+from services.metrics import registry, request_calls, MetricsFiles, merge_snapshots, render_prometheus
+import time
+import config
+
+# Create blueprint FIRST
+metrics_bp = Blueprint('metrics', __name__)
+
+logger = logging.getLogger(__name__)
+
+# Under gunicorn every worker writes its metrics here so one scrape sees all
+# of them (gunicorn.conf.py sets METRICS_DIR); None for a single process
+metrics_files = MetricsFiles(registry, config.METRICS_DIR, config.METRICS_FLUSH_SECONDS) if config.METRICS_DIR else None
+
+def _route():
+    """The matched URL rule, not the raw path, so ids don't explode the label set"""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+@metrics_bp.before_app_request
+def start_timer():
+    if metrics_files:
+        metrics_files.start()
+    g.metrics_started = time.perf_counter()
+    g.metrics_calls = {}
+    g.metrics_token = request_calls.set(g.metrics_calls)
+
+@metrics_bp.after_app_request
+def record_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    calls = g.pop('metrics_calls')
+    request_calls.reset(g.pop('metrics_token'))
+
+    route = _route()
+    method = request.method
+    registry.observe('advora_http_request_duration_seconds', elapsed,
+                     method=method, route=route, status=str(response.status_code))
+    if request.content_length:
+        registry.observe('advora_http_request_bytes', request.content_length, method=method, route=route)
+    if not response.is_streamed:
+        registry.observe('advora_http_response_bytes', response.calculate_content_length() or 0,
+                         method=method, route=route)
+    for service, (count, _) in calls.items():
+        registry.observe('advora_http_downstream_calls', count, method=method, route=route, service=service)
+
+    if config.SLOW_REQUEST_MS and elapsed * 1000 >= config.SLOW_REQUEST_MS:
+        registry.inc('advora_http_slow_requests', method=method, route=route)
+        downstream = ', '.join(f"{service} {count}x {seconds * 1000:.0f}ms"
+                               for service, (count, seconds) in calls.items()) or 'no downstream calls'
+        logger.warning("Slow request: %s %s -> %s in %.0fms (%s)",
+                       method, request.path, response.status_code, elapsed * 1000, downstream)
+    return response
+
+@metrics_bp.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus scrape endpoint"""
+    if config.METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {config.METRICS_TOKEN}":
+        return jsonify({'error': 'Not authorized'}), 401
+
+    snapshots = metrics_files.collect() if metrics_files else [registry.snapshot()]
+    return Response(render_prometheus(merge_snapshots(snapshots)),
+                    mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,46 @@
+from flask import Blueprint, request, jsonify, session
+import logging
+from services.stats_store import StatsStore, BUCKETS
+from routes.entries import supabase
+from datetime import date
+
+# Create the blueprint FIRST
+stats_bp = Blueprint('stats', __name__)
+
+logger = logging.getLogger(__name__)
+
+stats_store = StatsStore(supabase)
+
+@stats_bp.route('/api/stats', methods=['GET'])
+def get_stats():
+    """
+    Pre-aggregated symptom statistics for the logged-in user.
+    Query params: bucket (day|week|month, default week), from, to (YYYY-MM-DD)
+    At most MAX_BUCKETS rows, the newest; `truncated` says older ones were left out.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    if not supabase:
+        return jsonify({'error': 'Database connection not available'}), 500
+    
+    bucket = request.args.get('bucket', 'week')
+    if bucket not in BUCKETS:
+        return jsonify({'error': f"bucket must be one of {', '.join(BUCKETS)}"}), 400
+    
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    try:
+        for value in (date_from, date_to):
+            if value:
+                date.fromisoformat(value)
+    except ValueError:
+        return jsonify({'error': 'Invalid date'}), 400
+    
+    try:
+        rows, truncated = stats_store.fetch(user_id, bucket, date_from=date_from, date_to=date_to)
+        return jsonify({'bucket': bucket, 'stats': rows, 'truncated': truncated}), 200
+    except Exception as e:
+        logger.exception("Error fetching stats for user %s", user_id)
+        return jsonify({'error': str(e)}), 500
@@ -1,16 +1,79 @@
-from flask import Blueprint, request, jsonify, session
-from services.elevenlabs_service import ElevenLabsService
+from flask import Blueprint, Response, request, jsonify, session, stream_with_context
+import logging
+from services.elevenlabs_service import ElevenLabsService, AudioTooLarge, UPLOAD_CHUNK_BYTES, SPOOL_MEMORY_BYTES
+from services.transcription_jobs import TranscriptionJobs, JobStore, QueueFull
+from services.lazy import Lazy
+from services.supabase_service import supabase_client as supabase
+from functools import partial
+import config
+import json
+import tempfile
+import time
+
+# Seconds between SSE keep-alive comments while a job is still running
+SSE_KEEPALIVE_SECONDS = 15
+
+# Content types that are treated as a raw audio body
+RAW_AUDIO_TYPES = ('audio/', 'application/octet-stream')
 
 # Create blueprint FIRST
 transcribe_bp = Blueprint('transcribe', __name__)
 
-# Initialize ElevenLabs service
-try:
-    elevenlabs = ElevenLabsService()
-    print("✅ ElevenLabs route handler initialized")
-except Exception as e:
-    print(f"⚠️  Warning: ElevenLabs service not initialized: {e}")
-    elevenlabs = None
+logger = logging.getLogger(__name__)
+
+# ElevenLabs client, created on first use
+elevenlabs = Lazy('elevenlabs', ElevenLabsService)
+
+# Pool threads only start when the first job is submitted
+transcription_jobs = TranscriptionJobs(
+    max_workers=config.TRANSCRIBE_MAX_WORKERS,
+    max_queue=config.TRANSCRIBE_MAX_QUEUE,
+    job_ttl=config.TRANSCRIBE_JOB_TTL,
+    max_job_seconds=config.TRANSCRIBE_JOB_MAX_SECONDS,
+    # Lets any server process answer polls for a job queued by another
+    store=JobStore(supabase)
+)
+
+def _uploaded_audio():
+    """
+    Find binary audio in the request: a multipart 'audio' file or a raw audio body.
+    Returns (stream, filename, content_type), or None for the JSON/base64 fallback.
+    """
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('audio')
+        if not upload:
+            return None
+        return upload.stream, upload.filename or 'audio.webm', upload.mimetype or 'audio/webm'
+    
+    if request.mimetype.startswith(RAW_AUDIO_TYPES):
+        return request.stream, 'audio.webm', request.mimetype
+    
+    return None
+
+def _too_large():
+    """Reject early when the declared body size is over the upload limit"""
+    length = request.content_length
+    return bool(elevenlabs and length and length > elevenlabs.max_upload_bytes)
+
+def _spool(stream):
+    """Copy an upload into a temp file so a background job can read it after the request ends"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    total = 0
+    while True:
+        chunk = stream.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > elevenlabs.max_upload_bytes:
+            spooled.close()
+            raise AudioTooLarge(f"Audio is larger than {elevenlabs.max_upload_bytes} bytes")
+        spooled.write(chunk)
+    spooled.seek(0)
+    return spooled
+
+def _transcribe_spooled(spooled, filename, content_type, user_id):
+    with spooled:
+        return elevenlabs.transcribe_stream(spooled, filename, content_type, scope=user_id)
 
 @transcribe_bp.route('/api/transcribe', methods=['POST'])
 def transcribe_audio():
@@ -19,45 +82,134 @@ def transcribe_audio():
     # Check if user is authenticated
     user_id = session.get('user_id')
     if not user_id:
-        print("❌ Transcription attempted without authentication")
         return jsonify({'error': 'Not authenticated'}), 401
     
     # Check if ElevenLabs is available
     if not elevenlabs:
-        print("❌ ElevenLabs service not available")
+        logger.error("Transcription failed: ElevenLabs service not available")
         return jsonify({'error': 'Transcription service not available'}), 500
     
-    # Get audio data from request
-    data = request.json
-    if not data:
-        print("❌ No JSON data in request")
-        return jsonify({'error': 'No data provided'}), 400
-        
-    audio_base64 = data.get('audio')
-    
-    if not audio_base64:
-        print("❌ No audio data in request")
-        return jsonify({'error': 'No audio data provided'}), 400
+    if _too_large():
+        return jsonify({'error': 'Audio file is too large'}), 413
     
     try:
-        print(f"📝 Processing transcription request for user {user_id}")
-        
-        # Transcribe the audio
-        transcript = elevenlabs.transcribe_audio(audio_base64)
+        # Binary uploads are streamed through; JSON/base64 is the fallback
+        upload = _uploaded_audio()
+        if upload:
+            transcript = elevenlabs.transcribe_stream(*upload, scope=user_id)
+        else:
+            data = request.get_json(silent=True)
+            if not data:
+                return jsonify({'error': 'No data provided'}), 400
+            
+            audio_base64 = data.get('audio')
+            if not audio_base64:
+                return jsonify({'error': 'No audio data provided'}), 400
+            
+            transcript = elevenlabs.transcribe_audio(audio_base64, scope=user_id)
         
         if transcript:
-            print(f"✅ Transcription successful: {transcript[:100]}")
+            logger.debug("Transcribed %d characters for user %s", len(transcript), user_id)
             return jsonify({'transcript': transcript}), 200
         else:
-            print("❌ Transcription failed - no transcript returned")
+            logger.warning("Transcription failed for user %s: no transcript returned", user_id)
             return jsonify({'error': 'Transcription failed'}), 500
             
+    except AudioTooLarge as e:
+        logger.info("Rejected upload from user %s: %s", user_id, e)
+        return jsonify({'error': 'Audio file is too large'}), 413
     except Exception as e:
-        print(f"❌ Error in transcribe endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in transcribe endpoint")
         return jsonify({'error': str(e)}), 500
 
+@transcribe_bp.route('/api/transcribe/jobs', methods=['POST'])
+def create_transcription_job():
+    """Queue audio for transcription and return a job id without waiting"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    if not elevenlabs:
+        return jsonify({'error': 'Transcription service not available'}), 500
+    
+    if _too_large():
+        return jsonify({'error': 'Audio file is too large'}), 413
+    
+    upload = _uploaded_audio()
+    if upload:
+        stream, filename, content_type = upload
+        try:
+            spooled = _spool(stream)
+        except AudioTooLarge:
+            return jsonify({'error': 'Audio file is too large'}), 413
+        transcribe = partial(_transcribe_spooled, spooled, filename, content_type, user_id)
+    else:
+        data = request.get_json(silent=True) or {}
+        audio_base64 = data.get('audio')
+        if not audio_base64:
+            return jsonify({'error': 'No audio data provided'}), 400
+        spooled = None
+        transcribe = partial(elevenlabs.transcribe_audio, audio_base64, scope=user_id)
+    
+    try:
+        job = transcription_jobs.submit(user_id, transcribe)
+    except QueueFull as e:
+        if spooled:
+            spooled.close()
+        logger.warning("Transcription queue full: %s", e)
+        return jsonify({'error': 'Transcription queue is full, try again shortly'}), 503
+    
+    logger.debug("Queued transcription job %s for user %s", job['id'], user_id)
+    return jsonify(job), 202
+
+@transcribe_bp.route('/api/transcribe/jobs/<job_id>', methods=['GET'])
+def get_transcription_job(job_id):
+    """Poll a transcription job"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    job = transcription_jobs.get(job_id, user_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job), 200
+
+@transcribe_bp.route('/api/transcribe/jobs/<job_id>/events', methods=['GET'])
+def stream_transcription_job(job_id):
+    """
+    Server-sent events: one 'status' event now, one 'result' event when the
+    job finishes. A job still unfinished TRANSCRIBE_JOB_MAX_SECONDS after it
+    was queued (its server process died) is marked failed and sent as the result.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    job = transcription_jobs.get(job_id, user_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def events():
+        yield f"event: status\ndata: {json.dumps(job)}\n\n"
+        deadline = job['created_at'] + transcription_jobs.max_job_seconds
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                result = transcription_jobs.expire(job_id, user_id)
+                break
+            if transcription_jobs.wait(job_id, min(SSE_KEEPALIVE_SECONDS, remaining), user_id):
+                result = transcription_jobs.get(job_id, user_id)
+                break
+            yield ": keep-alive\n\n"
+        yield f"event: result\ndata: {json.dumps(result)}\n\n"
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @transcribe_bp.route('/api/transcribe/test', methods=['GET'])
 def test_transcribe():
     """Test endpoint to check if ElevenLabs is configured"""
@@ -65,7 +217,10 @@ def test_transcribe():
         return jsonify({
             'status': 'ok',
             'message': 'ElevenLabs service is initialized',
-            'api_key_prefix': elevenlabs.api_key[:8] + '...' if elevenlabs.api_key else 'None'
+            'api_key_prefix': elevenlabs.api_key[:8] + '...' if elevenlabs.api_key else 'None',
+            'jobs': transcription_jobs.stats(),
+            'upstream': elevenlabs.latency_stats(),
+            'transcript_cache': elevenlabs.cache_stats()
         }), 200
     else:
         return jsonify({
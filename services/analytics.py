@@ -0,0 +1,249 @@
+"""
+Deterministic symptom analytics over a user's history.
+
+Entries are loaded as columns (one row per day, one boolean column per
+symptom) and every statistic is computed with vectorized NumPy/pandas
+operations, so a multi-year history costs milliseconds.
+"""
+import numpy as np
+import pandas as pd
+
+FACTOR_COLUMNS = ['period', 'birth_control', 'sick']
+
+# Days after a factor day that lagged effects are measured for
+DEFAULT_MAX_LAG = 3
+
+# Cycle-day ranges (1-based) for period-phase alignment
+CYCLE_PHASES = [
+    ('menstrual', 1, 5),
+    ('follicular', 6, 13),
+    ('ovulatory', 14, 16),
+    ('luteal', 17, 45),
+]
+
+# Minimum paired observations before a correlation is reported
+MIN_OBSERVATIONS = 5
+
+
+def records_from_entries(entries):
+    """Columnar records from EntryStore entries ({**entry, symptoms, factors})"""
+    records = []
+    for entry in entries:
+        factors = entry.get('factors') or {}
+        records.append({
+            'entry_date': entry['entry_date'],
+            'pain_level': entry.get('pain_level'),
+            'stress': factors.get('stress'),
+            'period': bool(factors.get('period')),
+            'birth_control': bool(factors.get('birth_control')),
+            'sick': bool(factors.get('sick')),
+            'symptoms': [s['symptom_key'] if isinstance(s, dict) else s for s in entry.get('symptoms') or []],
+        })
+    return records
+
+
+def build_frame(records):
+    """
+    Daily DataFrame indexed by date: pain, stress, factor flags and one
+    boolean column per symptom (prefixed 'sym_'). Days without an entry
+    are not included.
+    """
+    if not records:
+        return pd.DataFrame()
+
+    by_date = {str(record['entry_date'])[:10]: record for record in records}
+    ordered = [by_date[day] for day in sorted(by_date)]
+
+    index = pd.DatetimeIndex(np.array(sorted(by_date), dtype='datetime64[D]'), name='entry_date')
+    columns = {
+        'pain': np.array([r.get('pain_level') for r in ordered], dtype=float),
+        'stress': np.array([r.get('stress') for r in ordered], dtype=float),
+    }
+    for factor in FACTOR_COLUMNS:
+        columns[factor] = np.array([bool(r.get(factor)) for r in ordered])
+
+    # One-hot symptoms from (row, column) coordinates in a single assignment
+    keys = sorted({key for r in ordered for key in r.get('symptoms') or []})
+    position = {key: i for i, key in enumerate(keys)}
+    rows, cols = [], []
+    for row, record in enumerate(ordered):
+        for key in record.get('symptoms') or []:
+            rows.append(row)
+            cols.append(position[key])
+    flags = np.zeros((len(ordered), len(keys)), dtype=bool)
+    flags[rows, cols] = True
+    for i, key in enumerate(keys):
+        columns[f'sym_{key}'] = flags[:, i]
+
+    return pd.DataFrame(columns, index=index)
+
+
+def _symptom_columns(frame):
+    return [column for column in frame.columns if column.startswith('sym_')]
+
+
+def _day_offsets(frame):
+    """Days since the first entry, for placing rows on a dense calendar grid"""
+    days = frame.index.to_numpy(dtype='datetime64[D]')
+    return (days - days[0]).astype(np.int64)
+
+
+def _on_grid(values, offsets, fill):
+    """Spread per-entry values onto one slot per calendar day"""
+    grid = np.full(offsets[-1] + 1, fill, dtype=np.result_type(values, fill))
+    grid[offsets] = values
+    return grid
+
+
+def _mean(values):
+    values = values[~np.isnan(values)]
+    return round(float(values.mean()), 2) if values.size else None
+
+
+def _correlation(x, y):
+    mask = ~(np.isnan(x) | np.isnan(y))
+    if mask.sum() < MIN_OBSERVATIONS or np.std(x[mask]) == 0 or np.std(y[mask]) == 0:
+        return None
+    return round(float(np.corrcoef(x[mask], y[mask])[0, 1]), 3)
+
+
+def pain_vs_stress(frame):
+    pain = frame['pain'].to_numpy(dtype=float)
+    stress = frame['stress'].to_numpy(dtype=float)
+
+    mask = ~(np.isnan(pain) | np.isnan(stress))
+    levels = stress[mask].astype(np.int64)
+    totals = np.bincount(levels, weights=pain[mask])
+    counts = np.bincount(levels)
+    return {
+        'pearson_r': _correlation(pain, stress),
+        'mean_pain_by_stress': {
+            int(level): round(float(totals[level] / counts[level]), 2)
+            for level in np.flatnonzero(counts)
+        },
+    }
+
+
+def symptom_cooccurrence(frame):
+    """Counts of days where each pair of symptoms was logged together"""
+    columns = _symptom_columns(frame)
+    if not columns:
+        return {'symptoms': [], 'matrix': [], 'top_pairs': []}
+
+    matrix = frame[columns].to_numpy(dtype=np.int32)
+    counts = matrix.T @ matrix
+    keys = [column[4:] for column in columns]
+
+    upper = np.triu_indices(len(keys), k=1)
+    pair_counts = counts[upper]
+    order = np.argsort(pair_counts, kind='stable')[::-1][:5]
+    top_pairs = [
+        {'pair': [keys[upper[0][i]], keys[upper[1][i]]], 'days': int(pair_counts[i])}
+        for i in order if pair_counts[i] > 0
+    ]
+    return {'symptoms': keys, 'matrix': counts.tolist(), 'top_pairs': top_pairs}
+
+
+def cycle_days(frame):
+    """
+    Day of cycle for each logged date, counting from the most recent period
+    start (a period day whose previous calendar day was not a period day).
+    NaN before the first recorded period.
+    """
+    offsets = _day_offsets(frame)
+    period = _on_grid(frame['period'].to_numpy(), offsets, False)
+    starts = period & ~np.concatenate([[False], period[:-1]])
+
+    grid = np.arange(period.size)
+    last_start = np.maximum.accumulate(np.where(starts, grid, -1))
+    days = np.where(last_start >= 0, grid - last_start + 1, np.nan)
+    return pd.Series(days[offsets], index=frame.index)
+
+
+def period_phase_alignment(frame):
+    cycle_day = cycle_days(frame).to_numpy()
+    pain = frame['pain'].to_numpy(dtype=float)
+    columns = _symptom_columns(frame)
+    symptoms = frame[columns].to_numpy(dtype=float)
+
+    result = {}
+    for name, first, last in CYCLE_PHASES:
+        mask = (cycle_day >= first) & (cycle_day <= last)
+        if not mask.any():
+            continue
+        rates = symptoms[mask].mean(axis=0) if columns else []
+        result[name] = {
+            'days': int(mask.sum()),
+            'mean_pain': _mean(pain[mask]),
+            'symptom_rates': {
+                column[4:]: round(float(rate), 3)
+                for column, rate in zip(columns, rates) if rate > 0
+            },
+        }
+    return result
+
+
+def lagged_effects(frame, factors=('sick', 'birth_control'), max_lag=DEFAULT_MAX_LAG):
+    """
+    Mean pain `lag` days after a factor day, against the mean pain on days
+    with no factor day in the preceding window. Missing days are gaps, not zeros.
+    """
+    offsets = _day_offsets(frame)
+    pain = _on_grid(frame['pain'].to_numpy(dtype=float), offsets, np.nan)
+
+    result = {}
+    for factor in factors:
+        flag = _on_grid(frame[factor].to_numpy(), offsets, False)
+
+        # Days with a factor day somewhere in the last max_lag + 1 days
+        recent = np.convolve(flag, np.ones(max_lag + 1, dtype=np.int64))[:flag.size] > 0
+        by_lag = {}
+        for lag in range(max_lag + 1):
+            shifted = np.zeros_like(flag)
+            shifted[lag:] = flag[:flag.size - lag]
+            by_lag[lag] = _mean(pain[shifted])
+        result[factor] = {
+            'factor_days': int(flag.sum()),
+            'baseline_pain': _mean(pain[~recent]),
+            'mean_pain_by_lag': by_lag,
+        }
+    return result
+
+
+def analyze(frame):
+    """Every analytic for one user's frame"""
+    if frame.empty:
+        return {'days': 0}
+    return {
+        'days': int(len(frame)),
+        'first_date': frame.index.min().date().isoformat(),
+        'last_date': frame.index.max().date().isoformat(),
+        'pain_vs_stress': pain_vs_stress(frame),
+        'cooccurrence': symptom_cooccurrence(frame),
+        'period_phase': period_phase_alignment(frame),
+        'lagged_effects': lagged_effects(frame),
+    }
+
+
+def summarize(result):
+    """A few plain lines of precomputed findings to put in a Gemini prompt"""
+    if not result.get('days'):
+        return ''
+
+    lines = [f"Precomputed statistics over {result['days']} logged days:"]
+    r = result['pain_vs_stress']['pearson_r']
+    if r is not None:
+        lines.append(f"- Pain vs stress correlation r={r}")
+    pairs = result['cooccurrence']['top_pairs'][:3]
+    if pairs:
+        lines.append("- Most frequent symptom pairs: " + ', '.join(
+            f"{a}+{b} ({p['days']}d)" for p in pairs for a, b in [p['pair']]
+        ))
+    phases = {name: data['mean_pain'] for name, data in result['period_phase'].items() if data['mean_pain'] is not None}
+    if phases:
+        lines.append("- Mean pain by cycle phase: " + ', '.join(f"{k} {v}" for k, v in phases.items()))
+    for factor, data in result['lagged_effects'].items():
+        if data['factor_days']:
+            lags = ', '.join(f"+{lag}d {value}" for lag, value in data['mean_pain_by_lag'].items() if value is not None)
+            lines.append(f"- Pain after {factor} days (baseline {data['baseline_pain']}): {lags}")
+    return '\n'.join(lines)
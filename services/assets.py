@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+from werkzeug.security import safe_join
+
+# Where build_assets.py writes fingerprinted bundles, relative to the static folder
+DIST_DIR = 'dist'
+SOURCE_DIR = 'src'
+MANIFEST_NAME = 'manifest.json'
+
+# Fingerprinted files never change, so browsers and CDNs may keep them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Suffixes of the compressed copies build_assets.py writes next to each
+# bundle, by content coding, most preferred first
+PRECOMPRESSED = {'br': '.br', 'gzip': '.gz'}
+
+logger = logging.getLogger(__name__)
+
+
+class AssetManifest:
+    """
+    Maps source asset names (app.js) to their built, content-hashed paths
+    under the static folder (dist/app.3f2a9c1b7d4e.js), as recorded in
+    dist/manifest.json by build_assets.py.
+
+    Without a build (a fresh checkout on the dev server), names map to the
+    unminified sources in static/src instead. The manifest is re-read
+    when its file changes, so a rebuild needs no restart.
+    """
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self.path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+        self._mtime = None
+        self._files = {}
+        self._warned = False
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            if not self._warned:
+                logger.warning("No asset manifest at %s, serving unbuilt sources (run build_assets.py)", self.path)
+                self._warned = True
+            self._mtime, self._files = None, {}
+            return self._files
+        if mtime != self._mtime:
+            with open(self.path) as f:
+                self._files = json.load(f)['files']
+            self._mtime = mtime
+        return self._files
+
+    def resolve(self, name):
+        """Path of asset `name` relative to the static folder"""
+        built = self._load().get(name)
+        if built:
+            return f"{DIST_DIR}/{built}"
+        return f"{SOURCE_DIR}/{name}"
+
+    def is_fingerprinted(self, path):
+        """Whether a static path is a content-hashed build output"""
+        return path.startswith(f"{DIST_DIR}/") and not path.endswith(MANIFEST_NAME)
+
+    def precompressed(self, path, accept_encodings):
+        """
+        (path, coding) of the built compressed copy of bundle `path` best
+        suited to the client's Accept-Encoding, or None to send it as is
+        """
+        if not self.is_fingerprinted(path):
+            return None
+        available = []
+        for encoding, suffix in PRECOMPRESSED.items():
+            full_path = safe_join(self.static_folder, path + suffix)
+            if full_path and os.path.isfile(full_path):
+                available.append(encoding)
+        encoding = accept_encodings.best_match(available)
+        if not encoding:
+            return None
+        return path + PRECOMPRESSED[encoding], encoding
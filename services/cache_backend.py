@@ -0,0 +1,88 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 10000
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """
+    In-process key/value store with LRU eviction and per-key TTL.
+    Each server process has its own copy.
+    """
+
+    shared = False
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if not item:
+                return None
+            value, expires_at = item
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._items[key] = (value, expires_at)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+
+class RedisBackend:
+    """
+    Key/value store in Redis (or anything that speaks its protocol), shared
+    by every server process. Values are stored as JSON. Needs the optional
+    `redis` package.
+    """
+
+    shared = True
+
+    def __init__(self, url, prefix='advora:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("REDIS_URL is set but the 'redis' package is not installed (pip install redis)")
+        # Connects lazily and re-opens its pool after a fork
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+def make_backend(redis_url=None, max_entries=DEFAULT_MAX_ENTRIES):
+    """RedisBackend when a URL is configured and usable, MemoryBackend otherwise"""
+    if redis_url:
+        try:
+            backend = RedisBackend(redis_url)
+            logger.info("Cache backend: Redis at %s", redis_url.split('@')[-1])
+            return backend
+        except Exception as e:
+            logger.warning("Falling back to in-process cache: %s", e)
+    return MemoryBackend(max_entries)
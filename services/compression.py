@@ -0,0 +1,63 @@
+import gzip
+import config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Text formats worth compressing; images, audio and archives already are
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/javascript',
+    'text/plain',
+}
+
+
+def available_encodings():
+    """Content codings this process can produce, most preferred first"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        # Low qualities are nearly as small as gzip -6 and much faster; the
+        # top ones are meant for files built once, not per response
+        return brotli.compress(data, quality=config.COMPRESS_BROTLI_QUALITY, mode=brotli.MODE_TEXT)
+    # mtime=0 so the same body always compresses to the same bytes
+    return gzip.compress(data, compresslevel=config.COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response, accept_encodings):
+    """
+    Compress a buffered text response in place with the best coding the
+    client accepts (brotli, then gzip). Streams (SSE, export), files sent
+    by send_file, error and 304 responses, and bodies under
+    COMPRESS_MIN_BYTES are left as they are.
+    """
+    if not config.COMPRESS_MIN_BYTES or response.status_code != 200 \
+            or response.is_streamed or response.direct_passthrough \
+            or 'Content-Encoding' in response.headers \
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    # Varies whether or not this particular body ends up compressed
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < config.COMPRESS_MIN_BYTES:
+        return response
+    encoding = accept_encodings.best_match(available_encodings())
+    if not encoding:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # The compressed bytes differ from the ones a strong ETag names; a weak
+    # one still matches If-None-Match, which uses the weak comparison
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,104 @@
+import logging
+import os
+import tempfile
+import time
+import uuid
+import config
+from services.user_cache import cache_backend
+
+logger = logging.getLogger(__name__)
+
+
+class FileVersions:
+    """
+    Versions as one small file per user in `directory`, so every server
+    process on the host sees each other's bumps without a shared cache.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, user_id):
+        return os.path.join(self.directory, str(user_id))
+
+    def get(self, user_id):
+        try:
+            with open(self._path(user_id)) as f:
+                tag, modified = f.read().split()
+        except (FileNotFoundError, ValueError):
+            return None
+        return {'tag': tag, 'modified': float(modified)}
+
+    def set(self, user_id, version):
+        # Made here, not at import: gunicorn empties it after loading the app
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename, so readers never see half a file
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'w') as f:
+            f.write(f"{version['tag']} {version['modified']}")
+        os.replace(tmp, self._path(user_id))
+
+
+class BackendVersions:
+    """Versions in a cache backend (see cache_backend.make_backend)"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def get(self, user_id):
+        return self.backend.get(f"data_version:{user_id}")
+
+    def set(self, user_id, version):
+        self.backend.set(f"data_version:{user_id}", version)
+
+
+class DataVersions:
+    """
+    A version of each user's journal, replaced by bump() whenever an entry
+    is written. GET endpoints build their ETag and Last-Modified from it
+    and answer If-None-Match with 304 without reading the journal.
+
+    Every server process must see every bump, or one that missed it would
+    confirm a stale copy. Versions therefore live in Redis when REDIS_URL is
+    set, otherwise in DATA_VERSION_DIR (gunicorn.conf.py sets one up), and
+    only in process memory when the server is a single process. A version
+    is a random token, not a counter, so one that is lost (Redis restart,
+    eviction) can never come back and match an old ETag.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def current(self, user_id):
+        """{'tag', 'modified'} for the user's journal, or None if the store is down"""
+        try:
+            version = self.store.get(user_id)
+            if version is None:
+                version = self._new()
+                self.store.set(user_id, version)
+            return version
+        except Exception as e:
+            logger.warning("Data version read failed: %s", e)
+            return None
+
+    def bump(self, user_id):
+        """Call after the user's entries changed; earlier ETags stop matching"""
+        try:
+            self.store.set(user_id, self._new())
+        except Exception as e:
+            logger.error("Data version bump failed for user %s, clients may see stale entries: %s", user_id, e)
+
+    def _new(self):
+        return {'tag': uuid.uuid4().hex, 'modified': time.time()}
+
+
+def make_store():
+    if cache_backend.shared:
+        return BackendVersions(cache_backend)
+    if config.DATA_VERSION_DIR:
+        return FileVersions(config.DATA_VERSION_DIR)
+    return BackendVersions(cache_backend)
+
+
+# Create a singleton instance
+data_versions = DataVersions(make_store())
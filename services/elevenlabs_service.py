@@ -1,75 +1,288 @@
-import os
+import logging
+import uuid
+import time
+import random
+import threading
 import requests
 import base64
-from dotenv import load_dotenv
+import tempfile
+from requests.adapters import HTTPAdapter
+import config
+from services import metrics
+from services.metrics import LatencyHistogram
+from services.transcript_cache import TranscriptCache, audio_digest
 
-load_dotenv()
+# Read size when streaming an upload through to ElevenLabs
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# Uploads copied aside stay in memory up to this size, then spill to a temp file
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+MODEL_ID = 'scribe_v1'
+
+# Responses worth another attempt after a backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+
+logger = logging.getLogger(__name__)
+
+class AudioTooLarge(Exception):
+    pass
 
 class ElevenLabsService:
     def __init__(self):
-        self.api_key = os.getenv("ELEVENLABS_API_KEY")
+        self.api_key = config.ELEVENLABS_API_KEY
         if not self.api_key:
             raise ValueError("Missing ElevenLabs API key")
-        self.base_url = "https://api.elevenlabs.io/v1"
-        print(f"✅ ElevenLabs service initialized with key starting: {self.api_key[:8]}...")
-    
-    def transcribe_audio(self, audio_base64):
+        self.base_url = config.ELEVENLABS_BASE_URL
+        self.connect_timeout = config.ELEVENLABS_CONNECT_TIMEOUT
+        self.timeout = config.ELEVENLABS_TIMEOUT
+        self.max_retries = config.ELEVENLABS_MAX_RETRIES
+        self.max_upload_bytes = config.TRANSCRIBE_MAX_UPLOAD_BYTES
+
+        # One keep-alive pool for every call, so back-to-back recordings skip the TCP+TLS handshake
+        pool_size = config.ELEVENLABS_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"xi-api-key": self.api_key})
+
+        # Whole-call latency (including retries) and per-attempt latency
+        self.call_latency = LatencyHistogram()
+        self.attempt_latency = LatencyHistogram()
+        self._counters_lock = threading.Lock()
+        self.counters = {'calls': 0, 'attempts': 0, 'retries': 0, 'failures': 0}
+
+        # Retried uploads of the same audio are answered from here
+        self.transcript_cache = None
+        if config.TRANSCRIPT_CACHE_MAX > 0:
+            self.transcript_cache = TranscriptCache(config.TRANSCRIPT_CACHE_MAX, config.TRANSCRIPT_CACHE_TTL,
+                                                    config.TRANSCRIPT_CACHE_DIR)
+        logger.info("ElevenLabs service initialized")
+
+    def transcribe_audio(self, audio_base64, scope=None):
         """
         Convert speech to text using ElevenLabs Speech-to-Text
         Sends audio as a file upload (multipart/form-data)
+        A repeat of audio already transcribed for the same `scope` (user) is
+        answered from the transcript cache.
         """
         if not audio_base64:
-            print("❌ No audio data provided")
+            logger.info("No audio data provided")
             return None
-        
+
         # Decode base64 to bytes
         try:
             audio_bytes = base64.b64decode(audio_base64)
-            print(f"✅ Audio decoded: {len(audio_bytes)} bytes")
         except Exception as e:
-            print(f"❌ Failed to decode audio: {e}")
+            logger.info("Failed to decode audio: %s", e)
             return None
-        
-        # Prepare headers
-        headers = {
-            "xi-api-key": self.api_key
-        }
-        
-        # Prepare the audio file for upload
-        files = {
-            'file': ('audio.webm', audio_bytes, 'audio/webm')
-        }
-        
-        # Optional parameters
-        data = {
-            'model_id': 'scribe_v1'
-        }
-        
+
+        if len(audio_bytes) > self.max_upload_bytes:
+            raise AudioTooLarge(f"Audio is larger than {self.max_upload_bytes} bytes")
+
+        def build_request():
+            # Prepare the audio file for upload
+            files = {
+                'file': ('audio.webm', audio_bytes, 'audio/webm')
+            }
+
+            # Optional parameters
+            data = {
+                'model_id': MODEL_ID
+            }
+            return {'files': files, 'data': data}
+
+        def upload():
+            metrics.track_payload('elevenlabs', 'speech_to_text', 'sent', len(audio_bytes))
+            return self._speech_to_text(build_request)
+
+        if not self.transcript_cache:
+            return upload()
+        return self.transcript_cache.transcribe(audio_digest([audio_bytes], scope, MODEL_ID), upload)
+
+    def transcribe_stream(self, stream, filename='audio.webm', content_type='audio/webm', scope=None):
+        """
+        Convert speech to text from a file-like object.
+        The audio is read in chunks and streamed straight into the multipart
+        upload, so it is never held in memory as a whole. Seekable streams
+        are rewound and re-sent on retry; others get a single attempt.
+
+        With the transcript cache on, the audio is hashed before anything is
+        sent, and a repeat for the same `scope` (user) is answered from the
+        cache. A stream that can't be rewound after hashing is copied into a
+        temp file on the way, which also lets its upload be retried.
+        """
+        if not self.transcript_cache:
+            return self._upload_stream(stream, filename, content_type)
+
+        spooled = None if self._seekable(stream) else tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+        audio = spooled or stream
         try:
-            print("📤 Sending request to ElevenLabs STT...")
-            response = requests.post(
-                f"{self.base_url}/speech-to-text",
-                headers=headers,
-                files=files,
-                data=data,
-                timeout=30
-            )
-            
-            print(f"📥 Response status: {response.status_code}")
-            
-            if response.status_code == 200:
-                result = response.json()
-                transcript = result.get("text", "")
-                print(f"✅ Transcription successful: {transcript[:50]}...")
-                return transcript
-            else:
-                print(f"❌ ElevenLabs API error: {response.status_code}")
-                print(f"Response body: {response.text}")
-                return None
-                
-        except requests.exceptions.Timeout:
-            print("❌ Request timed out")
+            start_position = audio.tell()
+            digest = audio_digest(self._read_chunks(stream, spooled), scope, MODEL_ID)
+            audio.seek(start_position)
+            return self.transcript_cache.transcribe(
+                digest, lambda: self._upload_stream(audio, filename, content_type))
+        finally:
+            if spooled:
+                spooled.close()
+
+    def _read_chunks(self, stream, copy_to=None):
+        """Yield the rest of `stream` in chunks (also written to `copy_to`), enforcing the upload limit"""
+        total = 0
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                return
+            total += len(chunk)
+            if total > self.max_upload_bytes:
+                raise AudioTooLarge(f"Audio is larger than {self.max_upload_bytes} bytes")
+            if copy_to:
+                copy_to.write(chunk)
+            yield chunk
+
+    def _upload_stream(self, stream, filename, content_type):
+        """Stream the audio to ElevenLabs; see transcribe_stream"""
+        start_position = stream.tell() if self._seekable(stream) else None
+        first_chunk = stream.read(UPLOAD_CHUNK_BYTES)
+        if not first_chunk:
+            logger.info("No audio data provided")
             return None
-        except Exception as e:
-            print(f"❌ Error calling ElevenLabs: {e}")
-            return None
\ No newline at end of file
+
+        chunks = {'first': first_chunk}
+
+        def build_request():
+            first = chunks.pop('first', None)
+            if first is None:
+                stream.seek(start_position)
+                first = stream.read(UPLOAD_CHUNK_BYTES)
+            boundary = uuid.uuid4().hex
+            return {
+                'data': self._multipart_body(stream, first, boundary, filename, content_type),
+                'headers': {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+            }
+
+        return self._speech_to_text(build_request, retryable=start_position is not None)
+
+    def _multipart_body(self, stream, first_chunk, boundary, filename, content_type):
+        """Yield a multipart/form-data body with model_id and the streamed file"""
+        yield (
+            f'--{boundary}\r\n'
+            'Content-Disposition: form-data; name="model_id"\r\n\r\n'
+            f'{MODEL_ID}\r\n'
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode()
+
+        chunk = first_chunk
+        total = 0
+        while chunk:
+            total += len(chunk)
+            if total > self.max_upload_bytes:
+                raise AudioTooLarge(f"Audio is larger than {self.max_upload_bytes} bytes")
+            yield chunk
+            chunk = stream.read(UPLOAD_CHUNK_BYTES)
+
+        logger.debug("Audio streamed: %d bytes", total)
+        metrics.track_payload('elevenlabs', 'speech_to_text', 'sent', total)
+        yield f'\r\n--{boundary}--\r\n'.encode()
+
+    def _speech_to_text(self, build_request, retryable=True):
+        """
+        POST to the speech-to-text endpoint and return the transcript, or None.
+        `build_request` returns fresh requests kwargs for each attempt.
+        Connection failures, 429 and 5xx are retried with exponential backoff
+        and full jitter; read timeouts are not, since the audio was delivered.
+        """
+        attempts = 1 + (self.max_retries if retryable else 0)
+        call_start = time.perf_counter()
+        self._count('calls')
+
+        try:
+            for attempt in range(attempts):
+                if attempt:
+                    self._count('retries')
+                    self._backoff(attempt, retry_after)
+                retry_after = None
+
+                self._count('attempts')
+                attempt_start = time.perf_counter()
+                response = None
+                try:
+                    response = self.session.post(
+                        f"{self.base_url}/speech-to-text",
+                        timeout=(self.connect_timeout, self.timeout),
+                        **build_request()
+                    )
+                except AudioTooLarge:
+                    raise
+                except requests.exceptions.ConnectionError as e:
+                    # Includes connect timeouts: nothing reached ElevenLabs, safe to retry
+                    logger.warning("Could not reach ElevenLabs (attempt %d/%d): %s", attempt + 1, attempts, e)
+                    continue
+                except requests.exceptions.Timeout:
+                    logger.warning("ElevenLabs request timed out")
+                    break
+                except Exception:
+                    logger.exception("Error calling ElevenLabs")
+                    break
+                finally:
+                    attempt_seconds = time.perf_counter() - attempt_start
+                    self.attempt_latency.observe(attempt_seconds * 1000)
+                    metrics.track('elevenlabs', 'speech_to_text', 'speech-to-text', attempt_seconds,
+                                  ok=response is not None and response.status_code == 200)
+
+                metrics.track_payload('elevenlabs', 'speech_to_text', 'received', len(response.content))
+
+                if response.status_code == 200:
+                    result = response.json()
+                    transcript = result.get("text", "")
+                    return transcript
+
+                logger.warning("ElevenLabs API error %s: %.500s", response.status_code, response.text)
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                retry_after = response.headers.get('Retry-After')
+
+            self._count('failures')
+            return None
+        finally:
+            self.call_latency.observe((time.perf_counter() - call_start) * 1000)
+
+    def latency_stats(self):
+        """Call counters and latency histograms, for the status endpoint"""
+        with self._counters_lock:
+            counters = dict(self.counters)
+        return {
+            **counters,
+            'call_latency_ms': self.call_latency.snapshot(),
+            'attempt_latency_ms': self.attempt_latency.snapshot()
+        }
+
+    def cache_stats(self):
+        """Transcript cache hit rate and upstream calls saved, or None when the cache is off"""
+        return self.transcript_cache.stats() if self.transcript_cache else None
+
+    def _count(self, name):
+        with self._counters_lock:
+            self.counters[name] += 1
+
+    @staticmethod
+    def _backoff(attempt, retry_after=None):
+        """Sleep before retry `attempt`: Retry-After if the server sent one, else full jitter"""
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = random.uniform(0, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+        time.sleep(min(delay, BACKOFF_MAX_SECONDS))
+
+    @staticmethod
+    def _seekable(stream):
+        try:
+            return stream.seekable()
+        except Exception:
+            return False
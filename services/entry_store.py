@@ -0,0 +1,334 @@
+import base64
+import json
+from datetime import date
+
+from services.symptom_catalog import SymptomCatalog
+
+# Symptom details are hydrated from the SymptomCatalog, so only the ids are embedded
+ENTRY_SELECT = (
+    '*, '
+    'entry_symptoms(symptom_id), '
+    'entry_factors(*)'
+)
+
+# Just the columns the analytics engine needs, without journal text
+ANALYTICS_SELECT = (
+    'entry_date, pain_level, '
+    'entry_symptoms(symptom_id), '
+    'entry_factors(period, birth_control, sick, stress)'
+)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Entries per import_journal_entries call
+DEFAULT_IMPORT_BATCH_SIZE = 500
+
+# Changed entries (and, separately, deletions) per delta sync response
+DEFAULT_SYNC_LIMIT = 500
+
+# Raised by save_journal_entry when the user row is missing
+USER_NOT_FOUND_CODE = 'P0002'
+
+
+class UserNotFound(Exception):
+    pass
+
+
+def normalize_factors(factors):
+    """Factor columns as stored; the *_type/flow fields only apply when their flag is set"""
+    return {
+        'period': factors.get('period', False),
+        'period_flow': factors.get('period_flow') if factors.get('period') else None,
+        'birth_control': factors.get('birth_control', False),
+        'birth_control_type': factors.get('birth_control_type') if factors.get('birth_control') else None,
+        'sick': factors.get('sick', False),
+        'sick_type': factors.get('sick_type') if factors.get('sick') else None,
+        'stress': factors.get('stress', 3)
+    }
+
+
+def encode_cursor(entry):
+    """Opaque cursor pointing just past `entry` in (entry_date, id) desc order"""
+    raw = json.dumps([entry['entry_date'], entry['id']]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor. Raises ValueError on anything malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        entry_date, entry_id = json.loads(base64.urlsafe_b64decode(padded))
+        date.fromisoformat(entry_date)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return entry_date, entry_id
+
+
+def encode_sync_token(entry_key, deleted_key):
+    """Opaque delta sync position: the last (updated_at, id) and (deleted_at, entry_id) sent"""
+    raw = json.dumps([entry_key, deleted_key]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_sync_token(token):
+    """Inverse of encode_sync_token. Raises ValueError on anything malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        entry_key, deleted_key = json.loads(base64.urlsafe_b64decode(padded))
+        for key in (entry_key, deleted_key):
+            if key is not None:
+                timestamp, row_id = key
+                if not isinstance(timestamp, str) or not isinstance(row_id, int):
+                    raise ValueError
+    except Exception:
+        raise ValueError("Invalid sync token")
+    return entry_key, deleted_key
+
+
+def _after(column, id_column, key):
+    """PostgREST filter for rows after `key` in (column, id_column) order"""
+    timestamp, row_id = key
+    # Quoted: timestamps contain PostgREST's reserved '.' and ':'
+    return f'{column}.gt."{timestamp}",and({column}.eq."{timestamp}",{id_column}.gt.{row_id})'
+
+
+class EntryStore:
+    """Data access for journal entries and their symptoms/factors"""
+
+    def __init__(self, client, catalog=None):
+        self.client = client
+        self.catalog = catalog or SymptomCatalog(client)
+
+    def fetch_entries(self, user_id, date_from=None, date_to=None):
+        """
+        Get all entries for a user with symptoms and factors attached,
+        optionally limited to a date range.
+        Uses a single embedded PostgREST select, so the number of round-trips
+        does not grow with the number of entries.
+        """
+        query = self.client.table('journal_entries') \
+            .select(ENTRY_SELECT) \
+            .eq('user_id', user_id)
+
+        if date_from:
+            query = query.gte('entry_date', date_from)
+        if date_to:
+            query = query.lte('entry_date', date_to)
+
+        result = query \
+            .order('entry_date', desc=True) \
+            .execute()
+
+        return [self._flatten(row) for row in result.data or []]
+
+    def fetch_page(self, user_id, limit=DEFAULT_PAGE_SIZE, cursor=None, date_from=None, date_to=None):
+        """
+        Get one page of entries, newest first, using keyset pagination on
+        (entry_date, id). Returns (entries, next_cursor); next_cursor is None
+        on the last page.
+        """
+        query = self.client.table('journal_entries') \
+            .select(ENTRY_SELECT) \
+            .eq('user_id', user_id)
+
+        if date_from:
+            query = query.gte('entry_date', date_from)
+        if date_to:
+            query = query.lte('entry_date', date_to)
+        if cursor:
+            entry_date, entry_id = decode_cursor(cursor)
+            query = query.or_(
+                f'entry_date.lt.{entry_date},'
+                f'and(entry_date.eq.{entry_date},id.lt.{entry_id})'
+            )
+
+        # Ask for one extra row to find out whether there is a next page
+        result = query \
+            .order('entry_date', desc=True) \
+            .order('id', desc=True) \
+            .limit(limit + 1) \
+            .execute()
+
+        rows = result.data or []
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return [self._flatten(row) for row in rows[:limit]], next_cursor
+
+    def iter_entries(self, user_id, date_from=None, date_to=None, page_size=MAX_PAGE_SIZE):
+        """
+        Every entry in the range, newest first, read page by page so only one
+        page is in memory at a time (for streaming exports).
+        """
+        cursor = None
+        while True:
+            entries, cursor = self.fetch_page(user_id, page_size, cursor, date_from, date_to)
+            yield from entries
+            if not cursor:
+                return
+
+    def fetch_changes(self, user_id, token=None, limit=DEFAULT_SYNC_LIMIT):
+        """
+        Entries changed and entries deleted since a delta sync token, oldest
+        change first, in two round-trips. With no token, every entry.
+        Returns (entries, deleted, next_token, more); `deleted` holds
+        {id, entry_date} of removed entries, and `more` means the caller
+        should ask again with next_token straight away.
+        """
+        entry_key, deleted_key = decode_sync_token(token) if token else (None, None)
+
+        # Deletions first: one landing between the two reads is then sent
+        # next time, rather than its entry being sent now and never removed
+        query = self.client.table('entry_tombstones') \
+            .select('entry_id, entry_date, deleted_at') \
+            .eq('user_id', user_id)
+        if not token:
+            # A new client has nothing to delete, it only needs the position
+            query = query.order('deleted_at', desc=True).order('entry_id', desc=True).limit(1)
+        else:
+            if deleted_key:
+                query = query.or_(_after('deleted_at', 'entry_id', deleted_key))
+            query = query.order('deleted_at').order('entry_id').limit(limit + 1)
+        tombstones = query.execute().data or []
+        if not token and tombstones:
+            deleted_key = [tombstones[0]['deleted_at'], tombstones[0]['entry_id']]
+            tombstones = []
+
+        query = self.client.table('journal_entries') \
+            .select(ENTRY_SELECT) \
+            .eq('user_id', user_id)
+        if entry_key:
+            query = query.or_(_after('updated_at', 'id', entry_key))
+        rows = query \
+            .order('updated_at') \
+            .order('id') \
+            .limit(limit + 1) \
+            .execute().data or []
+
+        more = len(rows) > limit or len(tombstones) > limit
+        rows, tombstones = rows[:limit], tombstones[:limit]
+        if rows:
+            entry_key = [rows[-1]['updated_at'], rows[-1]['id']]
+        if tombstones:
+            deleted_key = [tombstones[-1]['deleted_at'], tombstones[-1]['entry_id']]
+
+        entries = [self._flatten(row) for row in rows]
+        deleted = [{'id': row['entry_id'], 'entry_date': row['entry_date']} for row in tombstones]
+        return entries, deleted, encode_sync_token(entry_key, deleted_key), more
+
+    def sync_position(self, user_id):
+        """
+        {updated_at, deleted_at}: the user's newest entry write and newest
+        deletion, which any change to their entries moves, in one small
+        round-trip
+        """
+        return self.client.rpc('journal_sync_position', {'p_user_id': user_id}).execute().data
+
+    def fetch_by_ids(self, entry_ids):
+        """Entries with symptoms and factors attached, in id order, in one round-trip"""
+        if not entry_ids:
+            return []
+        result = self.client.table('journal_entries') \
+            .select(ENTRY_SELECT) \
+            .in_('id', list(entry_ids)) \
+            .order('id') \
+            .execute()
+        return [self._flatten(row) for row in result.data or []]
+
+    def fetch_columns(self, user_id, date_from=None, date_to=None):
+        """
+        Lightweight load for analytics: one flat record per entry with
+        entry_date, pain_level, stress, the period/birth_control/sick flags
+        and a list of symptom keys. Same single round-trip as fetch_entries,
+        but skips the journal text and the symptom labels/icons.
+        """
+        query = self.client.table('journal_entries') \
+            .select(ANALYTICS_SELECT) \
+            .eq('user_id', user_id)
+
+        if date_from:
+            query = query.gte('entry_date', date_from)
+        if date_to:
+            query = query.lte('entry_date', date_to)
+
+        result = query \
+            .order('entry_date') \
+            .execute()
+
+        keys = self.catalog.keys()
+        records = []
+        for row in result.data or []:
+            factors = row.get('entry_factors')
+            if isinstance(factors, list):
+                factors = factors[0] if factors else None
+            factors = factors or {}
+            records.append({
+                'entry_date': row['entry_date'],
+                'pain_level': row.get('pain_level'),
+                'stress': factors.get('stress'),
+                'period': bool(factors.get('period')),
+                'birth_control': bool(factors.get('birth_control')),
+                'sick': bool(factors.get('sick')),
+                'symptoms': [
+                    keys[link['symptom_id']]
+                    for link in row.get('entry_symptoms') or []
+                    if link['symptom_id'] in keys
+                ],
+            })
+        return records
+
+    def save_entry(self, user_id, entry_date, text, pain_level, symptom_keys, factors):
+        """
+        Upsert the entry for (user_id, entry_date) and replace its symptoms and
+        factors in one transaction via the save_journal_entry RPC.
+        Returns the entry id.
+        """
+        try:
+            result = self.client.rpc('save_journal_entry', {
+                'p_user_id': user_id,
+                'p_entry_date': entry_date,
+                'p_text': text,
+                'p_pain_level': pain_level,
+                'p_symptom_keys': list(symptom_keys or []),
+                'p_factors': normalize_factors(factors or {})
+            }).execute()
+        except Exception as e:
+            if getattr(e, 'code', None) == USER_NOT_FOUND_CODE:
+                raise UserNotFound(user_id) from e
+            raise
+
+        return result.data
+
+    def import_entries(self, user_id, entries, batch_size=DEFAULT_IMPORT_BATCH_SIZE):
+        """
+        Upsert validated entries (see entry_transfer.validate_record) with
+        one import_journal_entries call per batch; each batch is its own
+        transaction and re-running an import is safe. Returns the number of
+        batches written.
+        """
+        batches = 0
+        for start in range(0, len(entries), batch_size):
+            try:
+                self.client.rpc('import_journal_entries', {
+                    'p_user_id': user_id,
+                    'p_entries': entries[start:start + batch_size]
+                }).execute()
+            except Exception as e:
+                if getattr(e, 'code', None) == USER_NOT_FOUND_CODE:
+                    raise UserNotFound(user_id) from e
+                raise
+            batches += 1
+        return batches
+
+    def _flatten(self, row):
+        """Reshape an embedded row into the {**entry, symptoms, factors} format"""
+        entry = dict(row)
+        links = entry.pop('entry_symptoms', None) or []
+        factors = entry.pop('entry_factors', None)
+
+        # entry_factors comes back as a list, or as an object when entry_id is unique
+        if isinstance(factors, list):
+            factors = factors[0] if factors else None
+
+        entry['symptoms'] = self.catalog.get_many([link['symptom_id'] for link in links])
+        entry['factors'] = factors or {}
+        return entry
@@ -0,0 +1,290 @@
+"""
+Portable journal format for bulk export and import.
+
+One entry is
+
+    {"entry_date": "2024-03-01", "text": "...", "pain_level": 4,
+     "symptoms": ["cramps", "fatigue"],
+     "factors": {"period": true, "period_flow": "medium", "birth_control": false,
+                 "birth_control_type": null, "sick": false, "sick_type": null, "stress": 3}}
+
+written as one JSON object per line (NDJSON), or as a CSV row with
+CSV_COLUMNS, where symptoms are separated by ';' and the flags are
+true/false. Both formats round-trip through export and import.
+"""
+import csv
+import io
+import json
+from datetime import date
+
+from services.entry_store import normalize_factors
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+CSV_COLUMNS = [
+    'entry_date', 'pain_level', 'text', 'symptoms',
+    'period', 'period_flow', 'birth_control', 'birth_control_type',
+    'sick', 'sick_type', 'stress'
+]
+
+FACTOR_FLAGS = ('period', 'birth_control', 'sick')
+FACTOR_TEXT = ('period_flow', 'birth_control_type', 'sick_type')
+
+MAX_TEXT_CHARS = 20000
+
+# Errors listed in a rejected import; the rest are only counted
+MAX_REPORTED_ERRORS = 50
+
+
+class InvalidImport(Exception):
+    """The upload had invalid lines; nothing was written"""
+
+    def __init__(self, errors, error_count):
+        super().__init__(f"{error_count} invalid lines")
+        self.errors = errors
+        self.error_count = error_count
+
+
+class ImportTooLarge(Exception):
+    """The upload went past the byte limit while it was being read"""
+
+    def __init__(self, max_bytes):
+        super().__init__(f"Import is larger than {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class _LimitedReader(io.RawIOBase):
+    """
+    Reads a binary stream, raising ImportTooLarge once more than
+    `max_bytes` came out of it; a chunked upload has no Content-Length to
+    check up front
+    """
+
+    def __init__(self, stream, max_bytes):
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        self.bytes_read += len(data)
+        if self.bytes_read > self.max_bytes:
+            raise ImportTooLarge(self.max_bytes)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def detect_format(requested=None, mimetype=None, filename=None):
+    """'ndjson' or 'csv' from an explicit choice, the upload's file name or its content type"""
+    if requested:
+        if requested not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        return requested
+    if (filename or '').lower().endswith('.csv') or mimetype == 'text/csv':
+        return 'csv'
+    return 'ndjson'
+
+
+# ----- export -----
+
+def export_record(entry):
+    """The portable form of an entry as returned by EntryStore"""
+    factors = normalize_factors(entry.get('factors') or {})
+    return {
+        'entry_date': entry['entry_date'],
+        'text': entry.get('text') or '',
+        'pain_level': entry.get('pain_level'),
+        'symptoms': [symptom['symptom_key'] for symptom in entry.get('symptoms') or []],
+        'factors': factors
+    }
+
+
+def ndjson_line(record):
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _csv_text(values):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerow(values)
+    return buffer.getvalue()
+
+
+def csv_header():
+    return _csv_text(CSV_COLUMNS)
+
+
+def csv_line(record):
+    factors = record['factors']
+    values = {
+        'entry_date': record['entry_date'],
+        'pain_level': record['pain_level'],
+        'text': record['text'],
+        'symptoms': ';'.join(record['symptoms']),
+        **{flag: 'true' if factors.get(flag) else 'false' for flag in FACTOR_FLAGS},
+        **{field: factors.get(field) or '' for field in FACTOR_TEXT},
+        'stress': factors.get('stress')
+    }
+    return _csv_text([values[column] for column in CSV_COLUMNS])
+
+
+# ----- import -----
+
+def _ndjson_records(text_stream):
+    for line_number, line in enumerate(text_stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "expected a JSON object"
+            continue
+        yield line_number, record, None
+
+
+def _csv_flag(value):
+    value = (value or '').strip().lower()
+    if value in ('', 'false', '0', 'no'):
+        return False
+    if value in ('true', '1', 'yes'):
+        return True
+    raise ValueError(f"not a true/false value: {value!r}")
+
+
+def _csv_records(text_stream):
+    reader = csv.DictReader(text_stream)
+    if 'entry_date' not in (reader.fieldnames or []):
+        yield 1, None, "missing entry_date column"
+        return
+    for row in reader:
+        # Line of the row's end; a quoted text field can span several lines
+        line_number = reader.line_num
+        try:
+            record = {
+                'entry_date': row.get('entry_date'),
+                'text': row.get('text') or '',
+                'symptoms': [key.strip() for key in (row.get('symptoms') or '').split(';') if key.strip()],
+                'factors': {
+                    **{flag: _csv_flag(row.get(flag)) for flag in FACTOR_FLAGS},
+                    **{field: row.get(field) or None for field in FACTOR_TEXT}
+                }
+            }
+            if (row.get('pain_level') or '').strip():
+                record['pain_level'] = int(row['pain_level'])
+            if (row.get('stress') or '').strip():
+                record['factors']['stress'] = int(row['stress'])
+        except ValueError as e:
+            yield line_number, None, str(e)
+            continue
+        yield line_number, record, None
+
+
+def _int_in_range(value, name, low, high):
+    if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+        raise ValueError(f"{name} must be an integer from {low} to {high}")
+    return value
+
+
+def validate_record(record, known_symptoms):
+    """
+    The entry to write for one portable record, in the shape the
+    import_journal_entries RPC takes. Raises ValueError with the reason.
+    """
+    entry_date = record.get('entry_date')
+    try:
+        date.fromisoformat(entry_date)
+    except (TypeError, ValueError):
+        raise ValueError("entry_date must be a YYYY-MM-DD date")
+
+    text = record.get('text') or ''
+    if not isinstance(text, str) or len(text) > MAX_TEXT_CHARS:
+        raise ValueError(f"text must be a string of at most {MAX_TEXT_CHARS} characters")
+
+    symptoms = record.get('symptoms') or []
+    if not isinstance(symptoms, list) or not all(isinstance(key, str) for key in symptoms):
+        raise ValueError("symptoms must be a list of symptom keys")
+    unknown = [key for key in symptoms if key not in known_symptoms]
+    if unknown:
+        raise ValueError(f"unknown symptom(s): {', '.join(unknown)}")
+
+    factors = record.get('factors') or {}
+    if not isinstance(factors, dict):
+        raise ValueError("factors must be an object")
+    for flag in FACTOR_FLAGS:
+        if not isinstance(factors.get(flag, False), bool):
+            raise ValueError(f"factors.{flag} must be true or false")
+    for field in FACTOR_TEXT:
+        if factors.get(field) is not None and not isinstance(factors[field], str):
+            raise ValueError(f"factors.{field} must be a string")
+    if factors.get('stress') is not None:
+        _int_in_range(factors['stress'], 'factors.stress', 1, 5)
+    # Every journal entry records a pain level; an import must not invent one
+    if record.get('pain_level') is None:
+        raise ValueError("pain_level is required")
+
+    return {
+        'entry_date': entry_date,
+        'text': text,
+        'pain_level': _int_in_range(record['pain_level'], 'pain_level', 0, 10),
+        'symptom_keys': list(dict.fromkeys(symptoms)),
+        # A missing stress level stays missing (null), rather than a made-up 3
+        'factors': {**normalize_factors(factors), 'stress': factors.get('stress')}
+    }
+
+
+def parse_import(binary_stream, fmt, known_symptoms, max_entries, max_bytes=None):
+    """
+    Read and validate a whole upload. Returns the entries to write, or
+    raises InvalidImport listing the bad lines, so a bad file writes nothing.
+    With `max_bytes`, raises ImportTooLarge as soon as more has been read.
+    """
+    if max_bytes is not None:
+        binary_stream = io.BufferedReader(_LimitedReader(binary_stream, max_bytes))
+    text_stream = io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+    records = _csv_records(text_stream) if fmt == 'csv' else _ndjson_records(text_stream)
+
+    entries = []
+    seen_dates = {}
+    errors = []
+    error_count = 0
+
+    def fail(line_number, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'line': line_number, 'error': message})
+
+    try:
+        for line_number, record, error in records:
+            if error:
+                fail(line_number, error)
+                continue
+            try:
+                entry = validate_record(record, known_symptoms)
+            except ValueError as e:
+                fail(line_number, str(e))
+                continue
+            if entry['entry_date'] in seen_dates:
+                fail(line_number, f"duplicate entry_date {entry['entry_date']} (first on line {seen_dates[entry['entry_date']]})")
+                continue
+            seen_dates[entry['entry_date']] = line_number
+            entries.append(entry)
+            if len(entries) > max_entries:
+                fail(line_number, f"more than {max_entries} entries in one import")
+                break
+    except UnicodeDecodeError:
+        fail(None, "file is not UTF-8 text")
+    finally:
+        text_stream.detach()
+
+    if error_count:
+        raise InvalidImport(errors, error_count)
+    return entries
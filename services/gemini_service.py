@@ -1,61 +1,132 @@
-import os
-from google import genai
-from dotenv import load_dotenv
+import logging
+import time
+import config
+from services import metrics
+from services.prompt_builder import build_entries_digest, entry_row, estimate_tokens
 
-load_dotenv()
+# Returned instead of model output when the API call fails
+ANALYSIS_UNAVAILABLE = "⚠️ Unable to generate insights at this moment. Please try again later."
+SUMMARY_UNAVAILABLE = "Summary unavailable at this time."
+
+ANALYSIS_PROMPT = """
+Analyze these symptom entries and provide insights:
+
+{digest}
+{summary}
+Please provide:
+1. Key patterns observed
+2. Correlations with period/stress
+3. Red flags if any
+4. Summary for doctor discussion
+"""
+
+DAILY_SUMMARY_PROMPT = """
+Provide a brief, empathetic summary of this symptom entry:
+
+{row}
+Notes: {text}
+"""
+
+# Journal text beyond this is cut from the daily summary prompt
+MAX_DAILY_TEXT_CHARS = 2000
+
+logger = logging.getLogger(__name__)
 
 class GeminiService:
-    def __init__(self):
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
+    def __init__(self, client=None):
+        """`client` replaces the genai.Client, e.g. with a stub in tests"""
+        self.api_key = config.GEMINI_API_KEY
+        if not self.api_key and client is None:
             raise ValueError("Missing Gemini API key")
         
-        # Initialize the new client
-        self.client = genai.Client(api_key=self.api_key)
+        # Initialize the new client (the SDK is imported here because it is slow to import)
+        if client is None:
+            from google import genai
+            client = genai.Client(api_key=self.api_key)
+        self.client = client
         # Use the latest model name
         self.model_name = "gemini-2.5-flash-lite"  # or "gemini-1.5-pro" for more complex tasks
-        print(f"✅ Gemini client initialized with model: {self.model_name}")
+        self.prompt_token_budget = config.GEMINI_PROMPT_TOKEN_BUDGET
+        logger.info("Gemini client initialized with model %s", self.model_name)
     
-    def analyze_patterns(self, entries):
-        """Analyze symptom patterns from entries"""
-        try:
-            prompt = f"""
-            Analyze these symptom entries and provide insights:
-            
-            {entries}
-            
-            Please provide:
-            1. Key patterns observed
-            2. Correlations with period/stress
-            3. Red flags if any
-            4. Summary for doctor discussion
-            """
-            
+    def build_analysis_prompt(self, entries, summary=None):
+        """
+        Compact, token-budgeted prompt for analyze_patterns.
+        `summary` is optional precomputed statistics (services.analytics.summarize)
+        added after the digest so the model interprets them rather than
+        re-deriving them. Returns (prompt, stats) where stats describes the
+        prompt size.
+        """
+        digest = build_entries_digest(entries, self.prompt_token_budget)
+        prompt = ANALYSIS_PROMPT.format(digest=digest.text, summary=f"\n{summary}\n" if summary else '')
+        stats = {**digest.stats, 'prompt_tokens_est': estimate_tokens(prompt)}
+        logger.debug("Analysis prompt: %s tokens (est) for %s entries", stats['prompt_tokens_est'], stats['entries'])
+        return prompt, stats
+    
+    def complete(self, prompt):
+        """One model call. Raises on API errors, unlike the wrappers below."""
+        metrics.track_payload('gemini', 'generate_content', 'sent', len(prompt.encode()))
+        with metrics.timed('gemini', 'generate_content', self.model_name):
             response = self.client.models.generate_content(
                 model=self.model_name,
                 contents=prompt
             )
-            return response.text
-            
+        metrics.track_payload('gemini', 'generate_content', 'received', len((response.text or '').encode()))
+        return response.text
+    
+    def run_analysis(self, prompt):
+        """Send a prompt from build_analysis_prompt to the model"""
+        try:
+            return self.complete(prompt)
         except Exception as e:
-            print(f"Gemini API Error: {e}")
-            return "⚠️ Unable to generate insights at this moment. Please try again later."
+            logger.exception("Gemini API error")
+            return ANALYSIS_UNAVAILABLE
     
-    def generate_daily_summary(self, entry):
-        """Generate summary for a single entry"""
+    def stream_analysis(self, prompt):
+        """
+        Stream model output for a prompt from build_analysis_prompt, yielding
+        text chunks as they arrive. Closing the generator (e.g. when the
+        client disconnects) closes the underlying stream.
+        """
+        metrics.track_payload('gemini', 'generate_content_stream', 'sent', len(prompt.encode()))
+        received = 0
+        started = time.perf_counter()
+        ok = False
+        stream = None
         try:
-            prompt = f"""
-            Provide a brief, empathetic summary of this symptom entry:
-            
-            {entry}
-            """
-            
-            response = self.client.models.generate_content(
+            stream = self.client.models.generate_content_stream(
                 model=self.model_name,
                 contents=prompt
             )
-            return response.text
-            
+            for chunk in stream:
+                if chunk.text:
+                    received += len(chunk.text.encode())
+                    yield chunk.text
+            ok = True
+        finally:
+            # The whole stream counts as one call, from request to last chunk
+            metrics.track('gemini', 'generate_content_stream', self.model_name, time.perf_counter() - started, ok)
+            metrics.track_payload('gemini', 'generate_content_stream', 'received', received)
+            close = getattr(stream, 'close', None)
+            if close:
+                close()
+    
+    def analyze_patterns(self, entries, summary=None):
+        """Analyze symptom patterns from entries"""
+        prompt, _ = self.build_analysis_prompt(entries, summary)
+        return self.run_analysis(prompt)
+    
+    def build_daily_prompt(self, entry):
+        """Prompt for a single entry's summary: compact row plus the (trimmed) journal text"""
+        return DAILY_SUMMARY_PROMPT.format(
+            row=entry_row(entry),
+            text=(entry.get('text') or '-')[:MAX_DAILY_TEXT_CHARS]
+        )
+    
+    def generate_daily_summary(self, entry):
+        """Generate summary for a single entry"""
+        try:
+            return self.complete(self.build_daily_prompt(entry))
         except Exception as e:
-            print(f"Gemini API Error: {e}")
-            return "Summary unavailable at this time."
\ No newline at end of file
+            logger.exception("Gemini API error")
+            return SUMMARY_UNAVAILABLE
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import logging
+import time
+import config
+from services.user_cache import cache_backend
+
+# How long a result is kept after it was last written or verified
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+# How long a cached result is served without re-reading the user's entries
+DEFAULT_VERIFY_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(entries):
+    """Stable hash of the entries an insight was generated from"""
+    payload = json.dumps(entries, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class InsightsCache:
+    """
+    Model output per user, keyed on (user_id, kind) and tagged with the
+    content hash of the entries that produced it and the user's data version
+    (services.data_version) read before those entries were.
+
+    Items live in the shared cache backend (Redis when REDIS_URL is set), so
+    every server process answers from one result instead of each calling the
+    model for the same entries. A result is served without reading the
+    entries for `verify_seconds` after it was last checked, as long as the
+    caller's current data version is the one it was stored with; a write
+    through any process bumps the version. Otherwise the caller re-reads the
+    entries and the result is reused only if their hash still matches.
+    Backend failures are logged and count as misses.
+    """
+
+    def __init__(self, backend, ttl=DEFAULT_TTL_SECONDS, verify_seconds=DEFAULT_VERIFY_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self.verify_seconds = verify_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, user_id, kind):
+        return f"insights:{user_id}:{kind}"
+
+    def _load(self, user_id, kind):
+        try:
+            return self.backend.get(self._key(user_id, kind))
+        except Exception as e:
+            logger.warning("Insights cache read failed: %s", e)
+            return None
+
+    def _store(self, user_id, kind, item):
+        try:
+            self.backend.set(self._key(user_id, kind), item, self.ttl)
+        except Exception as e:
+            logger.warning("Insights cache write failed: %s", e)
+
+    def get_recent(self, user_id, kind, version):
+        """
+        The cached result if it was verified recently under this data version
+        tag, without needing the entries. None when `version` is None.
+        """
+        if version is None:
+            return None
+        item = self._load(user_id, kind)
+        if not item or item['version'] != version \
+                or time.time() - item['verified_at'] > self.verify_seconds:
+            return None
+        self.hits += 1
+        return item['result']
+
+    def get(self, user_id, kind, digest, version=None):
+        """
+        The cached result if it was generated from entries with this hash;
+        `version` is the data version tag read before those entries.
+        """
+        item = self._load(user_id, kind)
+        if not item or item['hash'] != digest:
+            self.misses += 1
+            return None
+        self._store(user_id, kind, {**item, 'version': version, 'verified_at': time.time()})
+        self.hits += 1
+        return item['result']
+
+    def put(self, user_id, kind, digest, result, version=None):
+        self._store(user_id, kind, {
+            'hash': digest,
+            'version': version,
+            'result': result,
+            'verified_at': time.time()
+        })
+
+    def stats(self):
+        return {
+            'backend': type(self.backend).__name__,
+            'shared': self.backend.shared,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+# Create a singleton instance
+insights_cache = InsightsCache(cache_backend, config.INSIGHTS_CACHE_TTL)
@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+
+# After a failed build, wait this long before trying again
+RETRY_SECONDS = 30
+
+# Every Lazy ever created, by name, for readiness reporting
+registry = {}
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class Lazy:
+    """
+    Stand-in for a service object that is built on first use.
+
+    The factory runs once, under a lock, the first time the service is
+    needed; attribute access is then forwarded to the built object. A
+    Lazy is falsy while the service can't be built (e.g. a missing API key),
+    so `if not service:` checks keep working, and the error is kept for
+    /api/health. A failed build is retried after RETRY_SECONDS.
+    """
+
+    def __init__(self, name, factory, retry_seconds=RETRY_SECONDS):
+        self._name = name
+        self._factory = factory
+        self._retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._instance = None
+        self._error = None
+        self._failed_at = None
+        self._init_ms = None
+        registry[name] = self
+
+    def get(self):
+        """The built service, or None if it can't be built right now"""
+        instance = self._instance
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if self._instance is not None:
+                return self._instance
+            if self._failed_at is not None and time.monotonic() - self._failed_at < self._retry_seconds:
+                return None
+
+            started = time.perf_counter()
+            try:
+                self._instance = self._factory()
+            except Exception as e:
+                self._error = str(e)
+                self._failed_at = time.monotonic()
+                logger.warning("%s not available: %s", self._name, e)
+                return None
+            self._init_ms = round((time.perf_counter() - started) * 1000)
+            self._error = None
+            self._failed_at = None
+            return self._instance
+
+    def reset(self):
+        """Forget the built service (or the failure) so the next use builds it again"""
+        with self._lock:
+            self._instance = None
+            self._error = None
+            self._failed_at = None
+
+    def status(self):
+        return {
+            'ready': self._instance is not None,
+            'error': self._error,
+            'init_ms': self._init_ms
+        }
+
+    def __bool__(self):
+        return self.get() is not None
+
+    def __getattr__(self, name):
+        instance = self.get()
+        if instance is None:
+            raise ServiceUnavailable(f"{self._name} is not available: {self._error}")
+        return getattr(instance, name)
+
+    def __repr__(self):
+        state = 'ready' if self._instance is not None else 'not built'
+        return f"<Lazy {self._name} ({state})>"
+
+
+def readiness(names=None):
+    """
+    Build (if needed) and report on the named services, or all of them.
+    Returns {name: {ready, error, init_ms}}.
+    """
+    report = {}
+    for name, service in registry.items():
+        if names is None or name in names:
+            service.get()
+            report[name] = service.status()
+    return report
@@ -0,0 +1,99 @@
+"""
+Logging for the app and the workers.
+
+Modules log through `logging.getLogger(__name__)` with %-style arguments,
+so a message below the configured level costs one level check and is never
+formatted. Records at or above it are put on an in-memory queue and written
+to stderr by a listener thread: a request never waits on a slow pipe, and
+formatting happens in the listener, so pass values rather than objects that
+change after the call.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, extras, exception"""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queues the record as is; the listener formats it. Only a traceback is
+    rendered here, since the exception's frames can't be kept around.
+    """
+
+    def prepare(self, record):
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _start_listener(handler):
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    return log_queue
+
+
+def _restart_after_fork():
+    """The listener thread doesn't survive fork() (gunicorn preload); start a new one"""
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    handler = _listener.handlers[0]
+    for queued in [h for h in root.handlers if isinstance(h, DeferredQueueHandler)]:
+        queued.queue = _start_listener(handler)
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def configure_logging(level='INFO', fmt='json'):
+    """Route the root logger through the queue to stderr. Safe to call more than once."""
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(DeferredQueueHandler(_start_listener(handler)))
+
+    # Flush what's queued on exit
+    atexit.register(_stop_listener)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_restart_after_fork)
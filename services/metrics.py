@@ -0,0 +1,319 @@
+import bisect
+import contextlib
+import contextvars
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+
+# Upper bounds in milliseconds; anything slower lands in the +Inf bucket
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """Thread-safe cumulative latency histogram (Prometheus-style buckets)"""
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._sum_ms = 0.0
+        self._count = 0
+
+    def observe(self, elapsed_ms):
+        index = bisect.bisect_left(self.buckets_ms, elapsed_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum_ms += elapsed_ms
+            self._count += 1
+
+    def snapshot(self):
+        """Cumulative counts per upper bound, plus count and sum"""
+        with self._lock:
+            counts = list(self._counts)
+            total, sum_ms = self._count, self._sum_ms
+
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets_ms + ('+Inf',), counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {'buckets': buckets, 'count': total, 'sum_ms': round(sum_ms, 1)}
+
+
+# Bucket bounds for the Prometheus metrics below
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+CALLS_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+ROWS_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+
+logger = logging.getLogger(__name__)
+
+
+class Registry:
+    """
+    Labelled counters and histograms rendered in the Prometheus text format.
+
+    Metrics are declared once with counter()/histogram(); inc()/observe()
+    take the label values as keyword arguments. snapshot() returns plain
+    JSON-able data so several processes' metrics can be merged (see
+    MetricsFiles).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def counter(self, name, help_text):
+        self._metrics[name] = {'type': 'counter', 'help': help_text, 'series': {}}
+
+    def histogram(self, name, help_text, buckets=SECONDS_BUCKETS):
+        self._metrics[name] = {'type': 'histogram', 'help': help_text, 'buckets': tuple(buckets), 'series': {}}
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        metric = self._metrics[name]
+        with self._lock:
+            metric['series'][key] = metric['series'].get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        metric = self._metrics[name]
+        index = bisect.bisect_left(metric['buckets'], value)
+        with self._lock:
+            series = metric['series'].get(key)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), then sum
+                series = metric['series'][key] = [0] * (len(metric['buckets']) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    **{field: value for field, value in metric.items() if field != 'series'},
+                    'series': [[dict(key), value if metric['type'] == 'counter' else list(value)]
+                               for key, value in metric['series'].items()]
+                }
+                for name, metric in self._metrics.items()
+            }
+
+
+def merge_snapshots(snapshots):
+    """Add up the series of several Registry.snapshot() results"""
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, 'series': {}})
+            for labels, value in metric['series']:
+                key = tuple(sorted(labels.items()))
+                if metric['type'] == 'counter':
+                    target['series'][key] = target['series'].get(key, 0) + value
+                else:
+                    current = target['series'].get(key)
+                    target['series'][key] = value if current is None else [a + b for a, b in zip(current, value)]
+    return merged
+
+
+def _label_text(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def render_prometheus(merged):
+    """Prometheus text exposition for the output of merge_snapshots()"""
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for key in sorted(metric['series']):
+            value = metric['series'][key]
+            if metric['type'] == 'counter':
+                lines.append(f"{name}_total{_label_text(key)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(tuple(metric['buckets']) + ('+Inf',), value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_label_text(key, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(key)} {round(value[-1], 6)}")
+            lines.append(f"{name}_count{_label_text(key)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsFiles:
+    """
+    Lets every gunicorn worker's metrics be served from any one of them.
+
+    Each process writes its snapshot to `<directory>/<pid>.json` every
+    `flush_seconds` (from a daemon thread); a scrape merges the live
+    registry with the other processes' files. An exiting worker folds its
+    snapshot into `dead.json` and removes its own file, so counters never go
+    backwards and a new worker that gets the same pid can't overwrite them.
+    A file left by a worker that was killed is folded in by the next process
+    with its pid.
+    """
+
+    DEAD = 'dead.json'
+
+    def __init__(self, registry, directory, flush_seconds):
+        self.registry = registry
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._pid = None
+        self._retired = False
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f"{pid}.json")
+
+    @contextlib.contextmanager
+    def _files_locked(self, mode):
+        """flock on the directory's lock file: LOCK_EX to change dead.json, LOCK_SH to read"""
+        with open(os.path.join(self.directory, '.lock'), 'a') as lock:
+            fcntl.flock(lock, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def start(self):
+        """Start the flush thread for this process (no-op if running)"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        os.makedirs(self.directory, exist_ok=True)
+        # A previous process with this pid died without retiring
+        self._fold(self._path(os.getpid()), None)
+        threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def flush(self):
+        path = self._path(os.getpid())
+        # Held while writing, so a flush can't land after retire() removed the file
+        with self._lock:
+            if self._retired:
+                return
+            try:
+                with open(path + '.tmp', 'w') as f:
+                    json.dump(self.registry.snapshot(), f)
+                os.replace(path + '.tmp', path)
+            except OSError as e:
+                logger.warning("Could not write metrics to %s: %s", path, e)
+
+    def retire(self):
+        """Fold this process's metrics into dead.json and remove its file (worker exit)"""
+        with self._lock:
+            self._retired = True
+        self._fold(self._path(os.getpid()), self.registry.snapshot())
+
+    def _fold(self, path, snapshot):
+        """Add `snapshot` (default: the one in `path`) to dead.json, then remove `path`"""
+        dead = os.path.join(self.directory, self.DEAD)
+        try:
+            with self._files_locked(fcntl.LOCK_EX):
+                if snapshot is None:
+                    try:
+                        with open(path) as f:
+                            snapshot = json.load(f)
+                    except FileNotFoundError:
+                        return
+                    except ValueError:
+                        snapshot = {}
+                try:
+                    with open(dead) as f:
+                        snapshots = [json.load(f), snapshot]
+                except (FileNotFoundError, ValueError):
+                    snapshots = [snapshot]
+                with open(dead + '.tmp', 'w') as f:
+                    json.dump(_as_snapshot(merge_snapshots(snapshots)), f)
+                os.replace(dead + '.tmp', dead)
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+        except OSError as e:
+            logger.warning("Could not fold metrics from %s into %s: %s", path, dead, e)
+
+    def collect(self):
+        """Snapshots of this process (live), every other process and exited workers (from disk)"""
+        snapshots = [self.registry.snapshot()]
+        own = f"{os.getpid()}.json"
+        try:
+            # Shared lock: a worker retiring mid-scrape is counted once, not twice or never
+            with self._files_locked(fcntl.LOCK_SH):
+                for name in os.listdir(self.directory):
+                    if not name.endswith('.json') or name == own:
+                        continue
+                    try:
+                        with open(os.path.join(self.directory, name)) as f:
+                            snapshots.append(json.load(f))
+                    except (OSError, ValueError):
+                        continue
+        except OSError:
+            pass
+        return snapshots
+
+
+def _as_snapshot(merged):
+    """merge_snapshots() output back in Registry.snapshot() form"""
+    return {
+        name: {**{field: value for field, value in metric.items() if field != 'series'},
+               'series': [[dict(key), value] for key, value in metric['series'].items()]}
+        for name, metric in merged.items()
+    }
+
+registry = Registry()
+registry.histogram('advora_http_request_duration_seconds',
+                   'Time to produce a response (streamed bodies: until the first byte), by route')
+registry.histogram('advora_http_request_bytes', 'Request body size, by route', BYTES_BUCKETS)
+registry.histogram('advora_http_response_bytes', 'Response body size (unstreamed responses), by route', BYTES_BUCKETS)
+registry.histogram('advora_http_downstream_calls', 'Calls to each downstream service made while handling one request', CALLS_BUCKETS)
+registry.counter('advora_http_slow_requests', 'Requests slower than SLOW_REQUEST_MS, by route')
+registry.histogram('advora_downstream_duration_seconds',
+                   'Calls to Supabase, Gemini and ElevenLabs, by operation and table/endpoint')
+registry.histogram('advora_downstream_payload_bytes',
+                   'Bytes sent to / received from Gemini and ElevenLabs', BYTES_BUCKETS)
+registry.histogram('advora_supabase_rows', 'Rows returned by a Supabase query', ROWS_BUCKETS)
+registry.counter('advora_transcript_cache_requests',
+                 'Transcriptions by cache outcome: hits, disk_hits, coalesced (shared an upstream call) or misses')
+
+# Per-request tally of downstream calls: {service: [calls, seconds]}, set by
+# the request hooks in routes/metrics.py. None outside a request.
+request_calls = contextvars.ContextVar('request_calls', default=None)
+
+
+def track(service, operation, target, seconds, ok=True):
+    """Record one downstream call, and add it to the current request's tally"""
+    registry.observe('advora_downstream_duration_seconds', seconds,
+                     service=service, operation=operation, target=target, outcome='ok' if ok else 'error')
+    calls = request_calls.get()
+    if calls is not None:
+        tally = calls.setdefault(service, [0, 0.0])
+        tally[0] += 1
+        tally[1] += seconds
+
+
+def track_payload(service, operation, direction, size):
+    registry.observe('advora_downstream_payload_bytes', size,
+                     service=service, operation=operation, direction=direction)
+
+
+@contextlib.contextmanager
+def timed(service, operation, target):
+    """Time the block as one downstream call; an exception marks it failed"""
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        track(service, operation, target, time.perf_counter() - started, ok)
@@ -0,0 +1,156 @@
+import math
+from collections import Counter, namedtuple
+from datetime import date
+
+DEFAULT_TOKEN_BUDGET = 4000
+
+# Rough size of a Gemini token for English/ASCII text
+CHARS_PER_TOKEN = 4
+
+DIGEST_LEGEND = (
+    "Daily rows: date|pain 1-10|symptoms|factors "
+    "(P=period flow, BC=birth control, SICK=illness, S=stress 1-5).\n"
+    "Rollup rows: period|days logged|pain avg/max|symptom counts|"
+    "period days|sick days|stress avg."
+)
+
+# (days kept as daily rows, days kept as weekly rollups before switching to monthly)
+# Tried in order until the digest fits the token budget
+ROLLUP_PLANS = [
+    (None, None),
+    (60, None),
+    (30, 180),
+    (14, 0),
+    (0, 0),
+]
+
+Digest = namedtuple('Digest', ['text', 'stats'])
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _symptom_keys(entry):
+    return sorted(
+        s.get('symptom_key') if isinstance(s, dict) else s
+        for s in entry.get('symptoms') or []
+    )
+
+
+def _factor_tags(factors):
+    tags = []
+    if factors.get('period'):
+        tags.append(f"P:{factors.get('period_flow') or 'y'}")
+    if factors.get('birth_control'):
+        tags.append(f"BC:{factors.get('birth_control_type') or 'y'}")
+    if factors.get('sick'):
+        tags.append(f"SICK:{factors.get('sick_type') or 'y'}")
+    if factors.get('stress') is not None:
+        tags.append(f"S{factors['stress']}")
+    return tags
+
+
+def entry_row(entry):
+    """One entry as a compact pipe-separated line"""
+    factors = entry.get('factors') or {}
+    return '|'.join([
+        str(entry.get('entry_date')),
+        str(entry.get('pain_level', '')),
+        ','.join(_symptom_keys(entry)) or '-',
+        ','.join(_factor_tags(factors)) or '-',
+    ])
+
+
+def _rollup_row(label, entries):
+    """Aggregate several entries into one line"""
+    pains = [e['pain_level'] for e in entries if e.get('pain_level') is not None]
+    stresses = [(e.get('factors') or {}).get('stress') for e in entries]
+    stresses = [s for s in stresses if s is not None]
+    symptoms = Counter(key for e in entries for key in _symptom_keys(e))
+    period_days = sum(1 for e in entries if (e.get('factors') or {}).get('period'))
+    sick_days = sum(1 for e in entries if (e.get('factors') or {}).get('sick'))
+
+    return '|'.join([
+        label,
+        f"{len(entries)}d",
+        f"pain {sum(pains) / len(pains):.1f}/{max(pains)}" if pains else "pain -",
+        ','.join(f"{key}x{count}" for key, count in symptoms.most_common()) or '-',
+        f"P{period_days}",
+        f"SICK{sick_days}",
+        f"S{sum(stresses) / len(stresses):.1f}" if stresses else "S-",
+    ])
+
+
+def _week_label(day):
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _month_label(day):
+    return f"{day.year}-{day.month:02d}"
+
+
+def _group(entries, label_for):
+    """Group consecutive (date-sorted) entries by label, keeping order"""
+    groups = []
+    for entry in entries:
+        label = label_for(date.fromisoformat(str(entry['entry_date'])[:10]))
+        if groups and groups[-1][0] == label:
+            groups[-1][1].append(entry)
+        else:
+            groups.append((label, [entry]))
+    return groups
+
+
+def _render(entries, today, daily_days, weekly_days):
+    """Rows for one rollup plan; entries are sorted oldest first"""
+    daily, weekly, monthly = [], [], []
+    for entry in entries:
+        age = (today - date.fromisoformat(str(entry['entry_date'])[:10])).days
+        if daily_days is None or age < daily_days:
+            daily.append(entry)
+        elif weekly_days is None or age < weekly_days:
+            weekly.append(entry)
+        else:
+            monthly.append(entry)
+
+    monthly_rows = [_rollup_row(label, group) for label, group in _group(monthly, _month_label)]
+    weekly_rows = [_rollup_row(label, group) for label, group in _group(weekly, _week_label)]
+    daily_rows = [entry_row(entry) for entry in daily]
+    return monthly_rows, weekly_rows, daily_rows
+
+
+def build_entries_digest(entries, token_budget=DEFAULT_TOKEN_BUDGET, today=None):
+    """
+    Turn entries into a compact digest that fits `token_budget`.
+    Recent days stay as daily rows; older history is rolled up into weekly
+    and then monthly rows until it fits, and the oldest months are dropped
+    as a last resort. Returns Digest(text, stats).
+    """
+    today = today or date.today()
+    ordered = sorted(entries, key=lambda e: str(e.get('entry_date')))
+
+    for daily_days, weekly_days in ROLLUP_PLANS:
+        monthly_rows, weekly_rows, daily_rows = _render(ordered, today, daily_days, weekly_days)
+        text = '\n'.join([DIGEST_LEGEND, *monthly_rows, *weekly_rows, *daily_rows])
+        if estimate_tokens(text) <= token_budget:
+            break
+
+    dropped = 0
+    while estimate_tokens(text) > token_budget and monthly_rows:
+        monthly_rows.pop(0)
+        dropped += 1
+        text = '\n'.join([DIGEST_LEGEND, *monthly_rows, *weekly_rows, *daily_rows])
+
+    stats = {
+        'entries': len(entries),
+        'daily_rows': len(daily_rows),
+        'weekly_rows': len(weekly_rows),
+        'monthly_rows': len(monthly_rows),
+        'dropped_months': dropped,
+        'chars': len(text),
+        'est_tokens': estimate_tokens(text),
+        'token_budget': token_budget,
+    }
+    return Digest(text, stats)
@@ -0,0 +1,48 @@
+BUCKETS = ('day', 'week', 'month')
+
+# Most rows one stats request may return
+MAX_BUCKETS = 1000
+
+
+class StatsStore:
+    """Reads the per-user symptom_stats rollups maintained by save_journal_entry"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def fetch(self, user_id, bucket, date_from=None, date_to=None):
+        """
+        Rollup rows for one bucket size, oldest first, with means derived,
+        and whether older rows were left out: with more than MAX_BUCKETS in
+        the range, the newest MAX_BUCKETS are returned.
+        """
+        query = self.client.table('symptom_stats') \
+            .select('*') \
+            .eq('user_id', user_id) \
+            .eq('bucket', bucket)
+
+        if date_from:
+            query = query.gte('bucket_start', date_from)
+        if date_to:
+            query = query.lte('bucket_start', date_to)
+
+        # Newest first so a long history loses its oldest buckets, not its
+        # latest; one extra row tells whether anything was cut
+        result = query \
+            .order('bucket_start', desc=True) \
+            .limit(MAX_BUCKETS + 1) \
+            .execute()
+
+        rows = result.data or []
+        truncated = len(rows) > MAX_BUCKETS
+        return [self._with_means(row) for row in reversed(rows[:MAX_BUCKETS])], truncated
+
+    @staticmethod
+    def _with_means(row):
+        row = dict(row)
+        row.pop('user_id', None)
+        count = row.get('entry_count') or 0
+        stress_count = row.get('stress_count') or 0
+        row['pain_mean'] = round(row['pain_sum'] / count, 2) if count else None
+        row['stress_mean'] = round(row['stress_sum'] / stress_count, 2) if stress_count else None
+        return row
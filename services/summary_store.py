@@ -0,0 +1,66 @@
+DEFAULT_BATCH_SIZE = 50
+
+
+class SummaryStore:
+    """Data access for the entry_summaries table written by the batch worker"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def pending(self, after_id=0, limit=DEFAULT_BATCH_SIZE, date_from=None, date_to=None):
+        """
+        Journal entry rows (without symptoms/factors) that have no summary or
+        whose summary predates their last edit, ordered by id after `after_id`.
+        """
+        result = self.client.rpc('entries_needing_summary', {
+            'p_after_id': after_id,
+            'p_limit': limit,
+            'p_date_from': date_from,
+            'p_date_to': date_to
+        }).execute()
+        return result.data or []
+
+    def save_many(self, summaries):
+        """
+        Upsert summaries, each {entry_id, summary, model, entry_updated_at}.
+        One round-trip for the whole batch.
+        """
+        if not summaries:
+            return
+        self.client.table('entry_summaries') \
+            .upsert(summaries, on_conflict='entry_id') \
+            .execute()
+
+    def get(self, user_id, entry_date):
+        """
+        The summary for a user's entry on `entry_date`.
+        Returns None when there is no entry, otherwise
+        {entry_id, summary, created_at, stale}; summary is None if the worker
+        has not reached the entry yet, and stale is True if the entry was
+        edited after it was summarized.
+        """
+        result = self.client.table('journal_entries') \
+            .select('id, updated_at, entry_summaries(summary, entry_updated_at, created_at)') \
+            .eq('user_id', user_id) \
+            .eq('entry_date', entry_date) \
+            .limit(1) \
+            .execute()
+
+        if not result.data:
+            return None
+
+        row = result.data[0]
+        summary = row.get('entry_summaries')
+
+        # One-to-one embeds come back as an object or a single-item list
+        if isinstance(summary, list):
+            summary = summary[0] if summary else None
+
+        if not summary:
+            return {'entry_id': row['id'], 'summary': None, 'created_at': None, 'stale': False}
+        return {
+            'entry_id': row['id'],
+            'summary': summary['summary'],
+            'created_at': summary.get('created_at'),
+            'stale': summary.get('entry_updated_at') != row.get('updated_at')
+        }
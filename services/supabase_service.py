@@ -1,22 +1,84 @@
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import logging
+import time
+import config
+from services.lazy import Lazy
+from services import metrics
 
-load_dotenv()
+# Builder methods that decide what kind of query is sent
+QUERY_OPERATIONS = {'select', 'insert', 'upsert', 'update', 'delete'}
+
+logger = logging.getLogger(__name__)
+
+class _TimedQuery:
+    """Wraps a query builder; execute() is recorded as a downstream call"""
+    
+    def __init__(self, builder, target, operation):
+        self._builder = builder
+        self._target = target
+        self._operation = operation
+    
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if hasattr(attr, 'execute'):
+            # Properties such as `.not_` return the builder itself
+            return _TimedQuery(attr, self._target, self._operation)
+        if not callable(attr):
+            return attr
+        operation = name if name in QUERY_OPERATIONS else self._operation
+        
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, 'execute'):
+                return _TimedQuery(result, self._target, operation)
+            return result
+        return call
+    
+    def execute(self):
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = self._builder.execute()
+            ok = True
+        finally:
+            metrics.track('supabase', self._operation, self._target, time.perf_counter() - started, ok)
+        if isinstance(response.data, list):
+            metrics.registry.observe('advora_supabase_rows', len(response.data),
+                                     operation=self._operation, target=self._target)
+        return response
+
+class InstrumentedClient:
+    """
+    Supabase client whose table() and rpc() queries are timed per table or
+    function (see services.metrics). Everything else is passed through.
+    """
+    
+    def __init__(self, client):
+        self._client = client
+    
+    def table(self, name):
+        return _TimedQuery(self._client.table(name), name, 'select')
+    
+    def rpc(self, fn, *args, **kwargs):
+        return _TimedQuery(self._client.rpc(fn, *args, **kwargs), fn, 'rpc')
+    
+    def __getattr__(self, name):
+        return getattr(self._client, name)
 
 class SupabaseService:
     def __init__(self):
-        self.url = os.getenv("SUPABASE_URL")
-        self.key = os.getenv("SUPABASE_KEY")
+        self.url = config.SUPABASE_URL
+        self.key = config.SUPABASE_KEY
         
         if not self.url or not self.key:
             raise ValueError("Missing Supabase credentials")
         
-        self.client: Client = create_client(self.url, self.key)
-        print(f"✅ Supabase connected to: {self.url}")
+        # Imported here: the client library is slow to import and only needed once connected
+        from supabase import create_client
+        self.client = InstrumentedClient(create_client(self.url, self.key))
+        logger.info("Supabase client created for %s", self.url)
     
     def get_client(self):
         return self.client
 
-# Create a singleton instance
-supabase_service = SupabaseService()
\ No newline at end of file
+# Shared client, connected on first use rather than at import
+supabase_client = Lazy('supabase', lambda: SupabaseService().get_client())
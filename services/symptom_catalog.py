@@ -0,0 +1,58 @@
+import threading
+import time
+
+DEFAULT_TTL_SECONDS = 300
+
+# Minimum gap between reloads triggered by an unknown symptom id
+MISS_REFRESH_SECONDS = 10
+
+
+class SymptomCatalog:
+    """
+    In-process cache of the `symptoms` table.
+    The catalog is tiny and rarely changes, so it is loaded once and reused
+    until the TTL expires or refresh()/invalidate() is called.
+    """
+
+    def __init__(self, client, ttl=DEFAULT_TTL_SECONDS):
+        self.client = client
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._loaded_at = None
+
+    def refresh(self):
+        """Reload the catalog from the database now"""
+        result = self.client.table('symptoms') \
+            .select('id, symptom_key, label, icon') \
+            .execute()
+
+        by_id = {row['id']: row for row in result.data or []}
+        with self._lock:
+            self._by_id = by_id
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """Drop the cached catalog; the next lookup reloads it"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_fresh(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.ttl:
+            self.refresh()
+
+    def get_many(self, symptom_ids):
+        """Symptom rows for the given ids, in order. Unknown ids are skipped."""
+        self._ensure_fresh()
+        if any(symptom_id not in self._by_id for symptom_id in symptom_ids) \
+                and time.monotonic() - (self._loaded_at or 0) > MISS_REFRESH_SECONDS:
+            # A symptom was probably added since the last load
+            self.refresh()
+        by_id = self._by_id
+        return [dict(by_id[symptom_id]) for symptom_id in symptom_ids if symptom_id in by_id]
+
+    def keys(self):
+        """{id: symptom_key} for every known symptom"""
+        self._ensure_fresh()
+        return {symptom_id: row['symptom_key'] for symptom_id, row in self._by_id.items()}
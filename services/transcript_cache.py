@@ -0,0 +1,196 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from services import metrics
+from services.cache_backend import MemoryBackend
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_TTL_SECONDS = 3600
+
+# The disk tier is trimmed back to max_entries every this many writes
+DISK_PRUNE_EVERY = 100
+
+logger = logging.getLogger(__name__)
+
+
+def audio_digest(chunks, scope=None, model_id=''):
+    """
+    Cache key for a recording: sha256 of the audio bytes (an iterable of
+    chunks), namespaced by `scope` (the user) and the model, so one user's
+    audio never answers another's and a model change starts afresh.
+    """
+    digest = hashlib.sha256(f"{scope}\0{model_id}\0".encode())
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _Flight:
+    """An upstream call in progress that identical requests wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class TranscriptCache:
+    """
+    Transcripts keyed on the hash of the audio they came from, so a client
+    that retries an upload (timeout, double tap) is answered without
+    ElevenLabs transcribing, and billing, the same audio again.
+
+    Entries live in an in-process LRU of `max_entries` for `ttl` seconds,
+    and with a `directory` also in one file per entry there, which every
+    server process on the host reads. Concurrent requests for the same
+    audio in one process share a single upstream call. Failed
+    transcriptions are not cached.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL_SECONDS, directory=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.directory = directory
+        self.memory = MemoryBackend(max_entries)
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._disk_writes = 0
+        self.counters = {'hits': 0, 'disk_hits': 0, 'coalesced': 0, 'misses': 0}
+
+    def transcribe(self, digest, transcribe):
+        """
+        The cached transcript for `digest`, or the result of calling
+        `transcribe()`; if the same digest is already being transcribed,
+        waits for that call instead of making another.
+        """
+        transcript = self._lookup(digest)
+        if transcript is not None:
+            return transcript
+
+        with self._lock:
+            flight = self._flights.get(digest)
+            leader = flight is None
+            if leader:
+                flight = self._flights[digest] = _Flight()
+
+        if not leader:
+            self._count('coalesced')
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            # A flight that finished since the lookup above has cached its result
+            transcript = self.memory.get(digest)
+            if transcript is not None:
+                self._count('hits')
+            else:
+                self._count('misses')
+                transcript = transcribe()
+                if transcript:
+                    self._store(digest, transcript)
+            flight.result = transcript
+            return transcript
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[digest]
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = sum(counters.values())
+        hits = counters['hits'] + counters['disk_hits']
+        return {
+            **counters,
+            'hit_rate': round(hits / lookups, 3) if lookups else None,
+            'upstream_calls_saved': hits + counters['coalesced'],
+            'disk': bool(self.directory)
+        }
+
+    def _lookup(self, digest):
+        transcript = self.memory.get(digest)
+        if transcript is not None:
+            self._count('hits')
+            return transcript
+        transcript = self._read(digest)
+        if transcript is not None:
+            self._count('disk_hits')
+            self.memory.set(digest, transcript, self.ttl)
+        return transcript
+
+    def _store(self, digest, transcript):
+        self.memory.set(digest, transcript, self.ttl)
+        if not self.directory:
+            return
+        try:
+            self._write(digest, transcript)
+        except OSError as e:
+            logger.warning("Transcript cache write failed: %s", e)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+        metrics.registry.inc('advora_transcript_cache_requests', result=name)
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest)
+
+    def _read(self, digest):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(digest)) as f:
+                item = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if item['expires_at'] < time.time():
+            self._remove(self._path(digest))
+            return None
+        return item['transcript']
+
+    def _write(self, digest, transcript):
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        # Write then rename, so readers never see half a file; mkstemp makes it 0600
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'transcript': transcript, 'expires_at': time.time() + self.ttl}, f)
+        os.replace(tmp, self._path(digest))
+
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % DISK_PRUNE_EVERY == 0
+        if prune:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Drop expired files, then the oldest until at most max_entries remain"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.tmp'):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue
+        entries.sort()
+        expired_before = time.time() - self.ttl
+        excess = len(entries) - self.max_entries
+        for index, (mtime, path) in enumerate(entries):
+            if index < excess or mtime < expired_before:
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
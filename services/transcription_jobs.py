@@ -0,0 +1,251 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_JOB_TTL_SECONDS = 600
+DEFAULT_MAX_JOB_SECONDS = 300
+
+# How often wait() re-reads a job that is running in another process
+STORE_POLL_SECONDS = 1.0
+
+SHUTDOWN_ERROR = 'Server restarted before the job ran, please try again'
+EXPIRED_ERROR = 'Transcription took too long, please try again'
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobStore:
+    """
+    Copies of job state in the transcription_jobs table, so a job queued by
+    one server process can be polled through any other. Failures are logged
+    and otherwise ignored: the accepting process still has the job in memory.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def save(self, job):
+        try:
+            self.client.table('transcription_jobs').upsert({
+                'id': job['id'],
+                'user_id': job['user_id'],
+                'status': job['status'],
+                'data': TranscriptionJobs._public(job),
+                'updated_at': datetime.now(timezone.utc).isoformat()
+            }, on_conflict='id').execute()
+        except Exception as e:
+            logger.warning("Could not save transcription job %s: %s", job['id'], e)
+
+    def load(self, job_id, user_id):
+        try:
+            result = self.client.table('transcription_jobs') \
+                .select('data') \
+                .eq('id', job_id) \
+                .eq('user_id', user_id) \
+                .limit(1) \
+                .execute()
+        except Exception as e:
+            logger.warning("Could not load transcription job %s: %s", job_id, e)
+            return None
+        return result.data[0]['data'] if result.data else None
+
+    def prune(self, older_than):
+        """Delete jobs last written more than `older_than` seconds ago"""
+        cutoff = datetime.fromtimestamp(time.time() - older_than, timezone.utc).isoformat()
+        try:
+            self.client.table('transcription_jobs').delete().lt('updated_at', cutoff).execute()
+        except Exception as e:
+            logger.warning("Could not prune transcription jobs: %s", e)
+
+
+class TranscriptionJobs:
+    """
+    Runs transcriptions on a bounded background pool so the request that
+    uploads the audio can return straight away with a job id.
+
+    Jobs live in memory of the process that accepted them; finished jobs are
+    dropped after `job_ttl` seconds. With a `store`, job state is also
+    written to the database when it is queued and when it finishes, and
+    get()/wait() fall back to it for jobs accepted by another process.
+    A job still unfinished `max_job_seconds` after it was queued (say its
+    process crashed) can be failed with expire().
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, max_queue=DEFAULT_MAX_QUEUE,
+                 job_ttl=DEFAULT_JOB_TTL_SECONDS, store=None, max_job_seconds=DEFAULT_MAX_JOB_SECONDS):
+        self.max_queue = max_queue
+        self.job_ttl = job_ttl
+        self.max_job_seconds = max_job_seconds
+        self.store = store
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='transcribe')
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._done = {}
+        self._futures = {}
+        self._store_pruned_at = time.monotonic()
+
+    def submit(self, user_id, transcribe):
+        """
+        Queue a transcription and return the new job.
+        `transcribe` is called with no arguments on a pool thread and returns the transcript.
+        """
+        with self._lock:
+            self._prune()
+            pending = sum(1 for job in self._jobs.values() if job['status'] in ('queued', 'running'))
+            if pending >= self.max_queue:
+                raise QueueFull(f"{pending} transcriptions already pending")
+
+            job = {
+                'id': uuid.uuid4().hex,
+                'user_id': user_id,
+                'status': 'queued',
+                'transcript': None,
+                'error': None,
+                'created_at': time.time(),
+                'queued_ms': None,
+                'run_ms': None
+            }
+            self._jobs[job['id']] = job
+            self._done[job['id']] = threading.Event()
+            public = self._public(job)
+
+        if self.store:
+            self.store.save(job)
+            if time.monotonic() - self._store_pruned_at > self.job_ttl:
+                self._store_pruned_at = time.monotonic()
+                self.store.prune(self.job_ttl)
+
+        self._futures[job['id']] = self.executor.submit(self._run, job['id'], transcribe)
+        return public
+
+    def get(self, job_id, user_id):
+        """Current state of a job, or None if it is unknown or not owned by user_id"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                return self._public(job) if job['user_id'] == user_id else None
+        return self.store.load(job_id, user_id) if self.store else None
+
+    def wait(self, job_id, timeout, user_id=None):
+        """
+        Block until the job finishes or `timeout` seconds pass. Returns True if finished.
+        Jobs owned by another process are re-read from the store (needs user_id).
+        """
+        done = self._done.get(job_id)
+        if done:
+            return done.wait(timeout)
+        if not self.store or user_id is None:
+            return True
+
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.load(job_id, user_id)
+            if not job or job['status'] in ('done', 'failed'):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(STORE_POLL_SECONDS, remaining))
+
+    def expire(self, job_id, user_id):
+        """
+        Mark a job that is still queued or running as failed, here and in
+        the store, so nobody waits on it any longer. Returns its state.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                if job['user_id'] != user_id:
+                    return None
+                if job['status'] not in ('queued', 'running'):
+                    return self._public(job)
+                job.update({'status': 'failed', 'error': EXPIRED_ERROR, 'finished_at': time.time()})
+                self._done[job_id].set()
+
+        if not job:
+            stored = self.store.load(job_id, user_id) if self.store else None
+            if not stored or stored['status'] not in ('queued', 'running'):
+                return stored
+            # Owned by another process, which is most likely gone
+            job = {**stored, 'user_id': user_id, 'status': 'failed', 'error': EXPIRED_ERROR,
+                   'finished_at': time.time()}
+
+        logger.warning("Transcription job %s unfinished after %ss, marked failed", job_id, self.max_job_seconds)
+        if self.store:
+            self.store.save(job)
+        return self._public(job)
+
+    def shutdown(self, wait=True):
+        """
+        Stop taking work: jobs that have not started are marked failed so
+        clients see an error instead of waiting forever, running jobs finish.
+        """
+        cancelled = [job_id for job_id, future in list(self._futures.items()) if future.cancel()]
+        for job_id in cancelled:
+            with self._lock:
+                job = self._jobs[job_id]
+                job.update({'status': 'failed', 'error': SHUTDOWN_ERROR, 'finished_at': time.time()})
+            if self.store:
+                self.store.save(job)
+            self._done[job_id].set()
+        self.executor.shutdown(wait=wait)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'max_queue': self.max_queue, 'jobs': counts}
+
+    def _run(self, job_id, transcribe):
+        started = time.time()
+        with self._lock:
+            job = self._jobs[job_id]
+            job['status'] = 'running'
+            job['queued_ms'] = round((started - job['created_at']) * 1000)
+
+        try:
+            transcript = transcribe()
+            status, error = ('done', None) if transcript else ('failed', 'Transcription failed')
+        except Exception as e:
+            transcript, status, error = None, 'failed', str(e)
+
+        with self._lock:
+            if job.get('finished_at'):
+                # expire() gave up on it already; clients were told it failed
+                return
+            job.update({
+                'status': status,
+                'transcript': transcript,
+                'error': error,
+                'run_ms': round((time.time() - started) * 1000),
+                'finished_at': time.time()
+            })
+        if self.store:
+            self.store.save(job)
+        self._done[job_id].set()
+
+    def _prune(self):
+        """Forget finished jobs older than job_ttl. Caller holds the lock."""
+        cutoff = time.time() - self.job_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.get('finished_at') and job['finished_at'] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            del self._done[job_id]
+            self._futures.pop(job_id, None)
+
+    @staticmethod
+    def _public(job):
+        return {key: value for key, value in job.items() if key != 'user_id'}
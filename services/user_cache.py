@@ -0,0 +1,71 @@
+import logging
+import config
+from services.cache_backend import make_backend
+
+# Only these fields are cached, never the password
+PROFILE_FIELDS = ('id', 'email', 'name', 'age')
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    Profiles of logged-in users, keyed on user id.
+
+    Filled at login and dropped at logout, so /api/me can answer without
+    asking the users table whether session['user_id'] still exists. Anything
+    that changes or deletes a user must call invalidate(). With the in-process
+    backend each worker keeps its own copy and an entry can outlive a change
+    made in another worker by up to `ttl` seconds; set REDIS_URL to share one
+    cache between workers.
+    """
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, user_id):
+        return f"user:{user_id}"
+
+    def get(self, user_id):
+        try:
+            profile = self.backend.get(self._key(user_id))
+        except Exception as e:
+            logger.warning("User cache read failed: %s", e)
+            profile = None
+        if profile is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return profile
+
+    def put(self, user):
+        profile = {field: user.get(field) for field in PROFILE_FIELDS}
+        try:
+            self.backend.set(self._key(profile['id']), profile, self.ttl)
+        except Exception as e:
+            logger.warning("User cache write failed: %s", e)
+        return profile
+
+    def invalidate(self, user_id):
+        try:
+            self.backend.delete(self._key(user_id))
+        except Exception as e:
+            logger.warning("User cache delete failed: %s", e)
+
+    def stats(self):
+        return {
+            'backend': type(self.backend).__name__,
+            'shared': self.backend.shared,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+# Shared by the cache users in this process (see cache_backend.make_backend)
+cache_backend = make_backend(config.REDIS_URL, config.USER_CACHE_MAX)
+
+# Create a singleton instance
+user_cache = UserCache(cache_backend, config.USER_CACHE_TTL)
@@ -0,0 +1,1271 @@
+(function() {
+    // State variables - keeping ALL your existing state
+    let isAuthenticated = false;
+    let currentUser = null;
+    let symptomEntries = {};
+    let activeTab = "home";
+    let selectedSymptoms = [];
+    let painLevel = 3;
+    let currentFactors = {
+        period: false, periodFlow: "medium",
+        birthControl: false, birthControlType: "pill",
+        sick: false, sickType: "cold",
+        stress: 3
+    };
+    let authMode = 'login';
+    let entryDate = null;
+    let draftDate = null;
+
+    // Symptom library - KEEPING EXACTLY as you had it
+    const SYMPTOMS = [
+        { id: 'headache', label: 'Headache', icon: 'fa-solid fa-brain' },
+        { id: 'cramps', label: 'Cramps', icon: 'fa-solid fa-bolt' },
+        { id: 'nausea', label: 'Nausea', icon: 'fa-solid fa-face-frown' },
+        { id: 'fatigue', label: 'Fatigue', icon: 'fa-solid fa-bed' },
+        { id: 'brainFog', label: 'Brain Fog', icon: 'fa-solid fa-cloud' },
+        { id: 'bloating', label: 'Bloating', icon: 'fa-solid fa-circle' },
+        { id: 'breastTenderness', label: 'Tenderness', icon: 'fa-solid fa-heart' },
+        { id: 'backPain', label: 'Back Pain', icon: 'fa-solid fa-ribbon' },
+        { id: 'sex', label: 'Sex', icon: 'fa-solid fa-face-smile' }
+    ];
+
+    // Helper functions - KEEPING your existing functions
+    function getTodayDate() {
+        const d = new Date();
+        return `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+    }
+
+    function getSeverityClass(painLevel) {
+        if (!painLevel && painLevel !== 0) return 'severity-0';
+        const level = Math.min(10, Math.max(0, Math.floor(painLevel)));
+        return `severity-${level}`;
+    }
+
+    // ===== API Functions to connect to your Flask backend =====
+
+    // Last response body and ETag per URL, for conditional GETs
+    const responseCache = new Map();
+
+    // GET a JSON endpoint, sending the ETag of our copy; a 304 reuses the copy
+    async function fetchJSON(url) {
+        const cached = responseCache.get(url);
+        const response = await fetch(url, {
+            // We keep the copy ourselves, so skip the browser's HTTP cache
+            cache: 'no-store',
+            headers: cached ? { 'If-None-Match': cached.etag } : {}
+        });
+        if (response.status === 304 && cached) {
+            return cached.data;
+        }
+        if (!response.ok) {
+            const error = new Error(`Request to ${url} failed (${response.status})`);
+            error.status = response.status;
+            throw error;
+        }
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            responseCache.set(url, { etag, data });
+        } else {
+            responseCache.delete(url);
+        }
+        return data;
+    }
+
+    async function checkAuthStatus() {
+        try {
+            const data = await fetchJSON('/api/me');
+
+            if (data.user) {
+                isAuthenticated = true;
+                currentUser = data.user;
+                entryDate = getTodayDate();
+
+                // Load entries after authentication
+                await loadUserEntries();
+            } else {
+                isAuthenticated = false;
+                currentUser = null;
+            }
+
+            updateScreen();
+        } catch (error) {
+            console.error('Error checking auth:', error);
+            isAuthenticated = false;
+            currentUser = null;
+            updateScreen();
+        }
+    }
+
+    // ===== Offline entry cache (IndexedDB) =====
+    // Each user's entries live in the browser with a delta sync token,
+    // so reopening the app only downloads entries changed since.
+
+    function idbResult(request) {
+        return new Promise((resolve, reject) => {
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    function entryCacheName(userId) {
+        return `advora-entries-${userId}`;
+    }
+
+    async function openEntryCache(userId) {
+        if (!window.indexedDB) return null;
+        const request = indexedDB.open(entryCacheName(userId), 1);
+        request.onupgradeneeded = () => {
+            request.result.createObjectStore('entries', { keyPath: 'entry_date' });
+            request.result.createObjectStore('meta');
+        };
+        try {
+            return await idbResult(request);
+        } catch (error) {
+            // e.g. storage disabled: sync everything into memory instead
+            console.warn('Entry cache unavailable:', error);
+            return null;
+        }
+    }
+
+    async function readEntryCache(cache) {
+        if (!cache) return { entries: [], token: null };
+        const tx = cache.transaction(['entries', 'meta']);
+        const [entries, token] = await Promise.all([
+            idbResult(tx.objectStore('entries').getAll()),
+            idbResult(tx.objectStore('meta').get('sync_token'))
+        ]);
+        return { entries, token: token || null };
+    }
+
+    function writeEntryCache(cache, { put = [], remove = [], token = null, clear = false }) {
+        if (!cache) return Promise.resolve();
+        const tx = cache.transaction(['entries', 'meta'], 'readwrite');
+        const store = tx.objectStore('entries');
+        if (clear) store.clear();
+        remove.forEach(entryDate => store.delete(entryDate));
+        put.forEach(entry => store.put(entry));
+        tx.objectStore('meta').put(token, 'sync_token');
+        return new Promise((resolve, reject) => {
+            tx.oncomplete = resolve;
+            tx.onerror = () => reject(tx.error);
+        });
+    }
+
+    // Bring the cached entries up to date; returns them keyed by date
+    async function syncEntries(userId) {
+        const cache = await openEntryCache(userId);
+        try {
+            const { entries, token: cachedToken } = await readEntryCache(cache);
+            const byDate = {};
+            entries.forEach(entry => { byDate[entry.entry_date] = entry; });
+
+            let token = cachedToken;
+            let more = true;
+            while (more) {
+                const params = new URLSearchParams({ limit: '500' });
+                if (token) params.set('since', token);
+                let page;
+                try {
+                    page = await fetchJSON(`/api/entries/changes?${params}`);
+                } catch (error) {
+                    if (error.status === 400 && token) {
+                        // Token no longer understood: start over with a full sync
+                        Object.keys(byDate).forEach(date => delete byDate[date]);
+                        token = null;
+                        await writeEntryCache(cache, { clear: true });
+                        continue;
+                    }
+                    if (Object.keys(byDate).length && (!error.status || error.status >= 500)) {
+                        // Offline or server trouble: show what we have and catch up next time
+                        console.warn('Sync failed, using cached entries:', error);
+                        return byDate;
+                    }
+                    throw error;
+                }
+
+                // Only drop the entry the tombstone is for, not a newer one on that day
+                const removed = page.deleted
+                    .filter(gone => byDate[gone.entry_date] && byDate[gone.entry_date].id === gone.id)
+                    .map(gone => gone.entry_date);
+                removed.forEach(date => delete byDate[date]);
+                page.entries.forEach(entry => { byDate[entry.entry_date] = entry; });
+
+                if (page.next_token !== token) {
+                    await writeEntryCache(cache, { put: page.entries, remove: removed, token: page.next_token });
+                }
+                token = page.next_token;
+                more = page.more;
+            }
+            return byDate;
+        } finally {
+            if (cache) cache.close();
+        }
+    }
+
+    async function loadUserEntries() {
+        if (!isAuthenticated || !currentUser) return {};
+
+        try {
+            const byDate = await syncEntries(currentUser.id);
+
+            // Convert array to object keyed by date (EXACTLY your existing format)
+            const entriesObj = {};
+            Object.values(byDate).forEach(entry => {
+                // Format symptoms array to match your existing structure
+                const symptomsList = entry.symptoms ? entry.symptoms.map(s => 
+                    typeof s === 'object' ? s.symptom_key : s
+                ) : [];
+
+                entriesObj[entry.entry_date] = {
+                    text: entry.text || '',
+                    symptoms: symptomsList,
+                    painLevel: entry.pain_level || 3,
+                    factors: entry.factors ? {
+                        period: entry.factors.period || false,
+                        periodFlow: entry.factors.period_flow || 'medium',
+                        birthControl: entry.factors.birth_control || false,
+                        birthControlType: entry.factors.birth_control_type || 'pill',
+                        sick: entry.factors.sick || false,
+                        sickType: entry.factors.sick_type || 'cold',
+                        stress: entry.factors.stress || 3
+                    } : {
+                        period: false, periodFlow: 'medium',
+                        birthControl: false, birthControlType: 'pill',
+                        sick: false, sickType: 'cold',
+                        stress: 3
+                    }
+                };
+            });
+
+            symptomEntries = entriesObj;
+            return entriesObj;
+        } catch (error) {
+            console.error('Error loading entries:', error);
+            symptomEntries = {};
+            return {};
+        }
+    }
+
+    async function saveEntryToDB(entryData) {
+        try {
+            const response = await fetch('/api/entries', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(entryData)
+            });
+
+            if (response.ok) {
+                return await response.json();
+            } else {
+                const error = await response.text();
+                throw new Error(error);
+            }
+        } catch (error) {
+            console.error('Error saving entry:', error);
+            throw error;
+        }
+    }
+
+    async function transcribeAudio(audioBlob) {
+        const response = await fetch('/api/transcribe/jobs', {
+            method: 'POST',
+            headers: { 'Content-Type': audioBlob.type || 'audio/webm' },
+            body: audioBlob
+        });
+        let job = await response.json();
+        if (!response.ok) {
+            throw new Error(job.error || 'Transcription failed');
+        }
+
+        // Poll until the job finishes, backing off up to 2s between checks
+        let delay = 250;
+        while (job.status === 'queued' || job.status === 'running') {
+            await new Promise(resolve => setTimeout(resolve, delay));
+            delay = Math.min(delay * 2, 2000);
+            const poll = await fetch(`/api/transcribe/jobs/${job.id}`);
+            job = await poll.json();
+            if (!poll.ok) {
+                throw new Error(job.error || 'Transcription failed');
+            }
+        }
+
+        if (job.status !== 'done') {
+            throw new Error(job.error || 'Transcription failed');
+        }
+        return job.transcript;
+    }
+
+    async function login(email, password) {
+        try {
+            const response = await fetch('/api/login', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ email, password })
+            });
+
+            const data = await response.json();
+
+            if (data.success) {
+                isAuthenticated = true;
+                currentUser = data.user;
+                entryDate = getTodayDate();
+                await loadUserEntries();
+                updateScreen();
+                return { success: true };
+            } else {
+                alert(data.error || 'Invalid credentials');
+                return { success: false, error: data.error };
+            }
+        } catch (error) {
+            console.error('Login error:', error);
+            alert('Network error. Please try again.');
+            return { success: false, error: 'Network error' };
+        }
+    }
+
+    async function signup(name, email, password, age) {
+        // For now, just use login since signup isn't implemented in backend
+        alert('Sign up not implemented yet. Please use test accounts.\n\nsarah@test.com / test123\ndemo@advora.com / demo123');
+        return { success: false };
+    }
+
+    async function logout() {
+        try {
+            await fetch('/api/logout', { method: 'POST' });
+        } catch (error) {
+            console.error('Logout error:', error);
+        }
+
+        // Don't leave this user's journal behind in the browser
+        if (currentUser && window.indexedDB) {
+            indexedDB.deleteDatabase(entryCacheName(currentUser.id));
+        }
+
+        isAuthenticated = false;
+        currentUser = null;
+        symptomEntries = {};
+        responseCache.clear();
+        updateScreen();
+    }
+
+    // ===== ALL YOUR EXISTING RENDER FUNCTIONS (KEEP THEM EXACTLY AS IS) =====
+
+    function renderAuth() {
+        return `
+            <div class="auth-container">
+                <div class="auth-header">
+                    <h1>🌸 Advora</h1>
+                    <p>Your personal health advocate</p>
+                </div>
+
+                <div class="auth-tabs">
+                    <div class="auth-tab ${authMode === 'login' ? 'active' : ''}" id="loginTab">Log In</div>
+                    <div class="auth-tab ${authMode === 'signup' ? 'active' : ''}" id="signupTab">Sign Up</div>
+                </div>
+
+                <div class="auth-form">
+                    ${authMode === 'signup' ? `
+                        <div class="auth-input-group">
+                            <label>Full Name</label>
+                            <input type="text" id="signupName" class="auth-input" placeholder="Enter your name" value="Sarah">
+                        </div>
+                    ` : ''}
+
+                    <div class="auth-input-group">
+                        <label>Email</label>
+                        <input type="email" id="authEmail" class="auth-input" placeholder="sarah@example.com" value="sarah@test.com">
+                    </div>
+
+                    <div class="auth-input-group">
+                        <label>Password</label>
+                        <input type="password" id="authPassword" class="auth-input" placeholder="••••••••" value="test123">
+                    </div>
+
+                    ${authMode === 'signup' ? `
+                        <div class="auth-input-group">
+                            <label>Age</label>
+                            <input type="number" id="signupAge" class="auth-input" placeholder="Your age" value="28">
+                        </div>
+                    ` : ''}
+
+                    <button class="auth-button" id="authSubmitBtn">
+                        ${authMode === 'login' ? 'Log In' : 'Create Account'}
+                    </button>
+                </div>
+
+                <div class="auth-divider">or</div>
+
+                <div class="test-credentials">
+                    <p><i class="fa-regular fa-flask"></i> Test Accounts</p>
+                    <small>📧 sarah@test.com / test123</small>
+                    <small>📧 demo@advora.com / demo123</small>
+                    <small style="margin-top:8px;">👆 Use these to log in instantly</small>
+                </div>
+            </div>
+        `;
+    }
+
+    function renderHome() {
+        const today = getTodayDate();
+        const dateToEdit = entryDate || today;
+        const existing = symptomEntries[dateToEdit] || { text: "", symptoms: [], painLevel: 3, factors: null };
+
+        if (existing.factors) {
+            selectedSymptoms = existing.symptoms || [];
+            painLevel = existing.painLevel || 3;
+            if (existing.factors.period) {
+                currentFactors.period = true;
+                currentFactors.periodFlow = existing.factors.period !== true ? existing.factors.period : "medium";
+            } else { currentFactors.period = false; }
+            currentFactors.birthControl = !!existing.factors.birthControl;
+            currentFactors.birthControlType = (typeof existing.factors.birthControl === 'string') ? existing.factors.birthControl : "pill";
+            currentFactors.sick = !!existing.factors.sick;
+            currentFactors.sickType = (typeof existing.factors.sick === 'string') ? existing.factors.sick : "cold";
+            currentFactors.stress = existing.factors.stress || 3;
+        } else {
+            if (draftDate !== dateToEdit) {
+                selectedSymptoms = [];
+                painLevel = 3;
+                currentFactors = {
+                    period: false, periodFlow: "medium",
+                    birthControl: false, birthControlType: "pill",
+                    sick: false, sickType: "cold",
+                    stress: 3
+                };
+                draftDate = dateToEdit;
+            }
+        }
+
+        const symptomChips = SYMPTOMS.map(s => `
+            <div class="symptom-chip ${selectedSymptoms.includes(s.id) ? 'active' : ''}" data-symptom="${s.id}">
+                <i class="${s.icon}"></i>
+                <span>${s.label}</span>
+            </div>
+        `).join('');
+
+        return `
+            <div style="margin-bottom: 8px;">
+                <div class="greeting">🌸 Hello, ${currentUser?.name || 'User'}</div>
+                <div class="sub-greeting"><i class="fa-regular fa-calendar-check"></i> Check-in • ${dateToEdit}</div>
+            </div>
+            <div style="margin: 10px 0 14px; display:flex; gap:10px; align-items:center;">
+                <span style="color:#ffd0f0; font-weight:600; font-size:14px;">Edit date</span>
+                <input
+                type="text"
+                id="entryDateInput"
+                value="${dateToEdit}"
+                style="flex:1; background:#1f1520; color:#ffd0f0; border:1px solid #5a3a60; border-radius:10px; padding:10px 12px;"
+                />
+            </div>
+
+            <div class="input-card">
+                <div class="section-label"><i class="fa-regular fa-comment"></i> How are you feeling?</div>
+
+                <div class="voice-button" id="simulateVoiceBtn">
+                    <span><i class="fa-solid fa-microphone"></i> Record voice memo</span>
+                    <i class="fa-solid fa-arrow-right"></i>
+                </div>
+
+                <textarea id="symptomTextInput" rows="2" placeholder="Tell me more...">${(existing.text || '').replace(/"/g, '&quot;')}</textarea>
+
+                <div class="section-label"><i class="fa-solid fa-list"></i> Select your symptoms</div>
+                <div class="symptom-grid" id="symptomGrid">
+                    ${symptomChips}
+                </div>
+
+                <div class="pain-scale-container">
+                    <div class="section-label"><i class="fa-solid fa-gauge-high"></i> Pain Level: <span id="painValue">${painLevel}</span>/10</div>
+                    <div class="pain-scale-labels">
+                        <span>Mild</span>
+                        <span>Moderate</span>
+                        <span>Severe</span>
+                    </div>
+                    <input type="range" id="painSlider" class="pain-slider" min="1" max="10" value="${painLevel}" step="1">
+                </div>
+
+                <div class="section-label"><i class="fa-regular fa-face-smile"></i> Health factors</div>
+
+                <!-- Period chip -->
+                <div style="display: flex; flex-wrap: wrap; gap: 10px; align-items: center; margin-bottom: 12px;">
+                <div class="chip ${currentFactors.period ? 'active' : ''}" id="chipPeriod">
+                    <i class="fa-regular fa-calendar"></i> Period
+                </div>
+
+                <select id="periodFlowSelect"
+                    style="background:#3a2340; color:#ffd0f0; border-radius:30px; padding:10px; border:1px solid #ff80d0; display:${currentFactors.period ? 'block' : 'none'};">
+                    <option value="light" ${currentFactors.periodFlow === 'light' ? 'selected' : ''}>Light flow</option>
+                    <option value="medium" ${currentFactors.periodFlow === 'medium' ? 'selected' : ''}>Medium flow</option>
+                    <option value="heavy" ${currentFactors.periodFlow === 'heavy' ? 'selected' : ''}>Heavy flow</option>
+                </select>
+                </div>
+
+                <!-- Birth control chip -->
+                <div style="display: flex; flex-wrap: wrap; gap: 10px; align-items: center; margin-bottom: 12px;">
+                <div class="chip ${currentFactors.birthControl ? 'active' : ''}" id="chipBirthControl">
+                    <i class="fa-solid fa-pills"></i> Birth control
+                </div>
+
+                <select id="birthControlSelect"
+                    style="background:#3a2340; color:#ffd0f0; border-radius:30px; padding:10px; border:1px solid #ff80d0; display:${currentFactors.birthControl ? 'block' : 'none'};">
+                    <option value="pill" ${currentFactors.birthControlType === 'pill' ? 'selected' : ''}>Pill</option>
+                    <option value="iud" ${currentFactors.birthControlType === 'iud' ? 'selected' : ''}>IUD</option>
+                    <option value="implant" ${currentFactors.birthControlType === 'implant' ? 'selected' : ''}>Implant</option>
+                </select>
+                </div>
+
+                <!-- Sick chip -->
+                <div style="display: flex; flex-wrap: wrap; gap: 10px; align-items: center; margin-bottom: 12px;">
+                <div class="chip ${currentFactors.sick ? 'active' : ''}" id="chipSick">
+                    <i class="fa-solid fa-face-frown"></i> Feeling sick
+                </div>
+
+                <select id="sickSelect"
+                    style="background:#3a2340; color:#ffd0f0; border-radius:30px; padding:10px; border:1px solid #ff80d0; display:${currentFactors.sick ? 'block' : 'none'};">
+                    <option value="cold" ${currentFactors.sickType === 'cold' ? 'selected' : ''}>Cold</option>
+                    <option value="flu" ${currentFactors.sickType === 'flu' ? 'selected' : ''}>Flu</option>
+                    <option value="allergies" ${currentFactors.sickType === 'allergies' ? 'selected' : ''}>Allergies</option>
+                </select>
+                </div>
+
+                <!-- Stress slider -->
+                <div style="margin: 18px 0 8px;">
+                    <div style="display: flex; justify-content: space-between; color:#ffd0f0;">
+                        <span>Stress level</span>
+                        <span id="stressValue">${currentFactors.stress}/5</span>
+                    </div>
+                    <input type="range" id="stressSlider" min="1" max="5" value="${currentFactors.stress}" style="width:100%; background:#3a2340;">
+                </div>
+
+                <button class="save-button" id="saveEntryBtn">
+                    <i class="fa-regular fa-floppy-disk"></i> Save Today's Entry
+                </button>
+            </div>
+        `;
+    }
+
+    function renderCalendar() {
+        const days = [];
+        for (let i = 1; i <= 28; i++) {
+            const dateStr = `2026-02-${String(i).padStart(2, '0')}`;
+            const entry = symptomEntries[dateStr];
+            const painLevel = entry?.painLevel || 0;
+            days.push({
+                date: i,
+                dateStr,
+                hasEntry: !!entry,
+                painLevel,
+                entry
+            });
+        }
+
+        let calendarHtml = `
+            <div class="calendar-placeholder">
+                <div class="month-header">
+                    <span><i class="fa-regular fa-chevron-left"></i></span>
+                    <span>February 2026</span>
+                    <span><i class="fa-regular fa-chevron-right"></i></span>
+                </div>
+
+                <div class="severity-legend">
+                    <div class="legend-item"><span class="legend-color severity-1"></span> Mild (1-3)</div>
+                    <div class="legend-item"><span class="legend-color severity-5"></span> Moderate (4-7)</div>
+                    <div class="legend-item"><span class="legend-color severity-9"></span> Severe (8-10)</div>
+                </div>
+
+                <div class="weekdays">
+                    <span>S</span><span>M</span><span>T</span><span>W</span><span>T</span><span>F</span><span>S</span>
+                </div>
+                <div class="days-grid" id="calendarDays">
+        `;
+
+        days.forEach(d => {
+            const severityClass = d.hasEntry ? getSeverityClass(d.painLevel) : 'severity-0';
+            const symptomIcons = d.entry?.symptoms?.slice(0, 2).map(s => {
+                const sym = SYMPTOMS.find(sym => sym.id === s);
+                return sym ? `<i class="${sym.icon}" style="font-size: 8px; margin: 0 1px;"></i>` : '';
+            }).join('') || '';
+
+            calendarHtml += `
+                <div class="day-cell ${severityClass}" data-date="${d.dateStr}">
+                    ${d.date}
+                    <div style="display: flex; gap: 2px; margin-top: 2px; font-size: 8px;">
+                        ${symptomIcons}
+                    </div>
+                </div>
+            `;
+        });
+
+        calendarHtml += `</div></div>`;
+
+        // Preview area
+        calendarHtml += `
+            <div id="calendarPreview" style="background:#2a1d28; border-radius:28px; padding:20px; margin-top: 20px; border:1px solid #ffb0e020;">
+                <div style="color:#ffd0f0; margin-bottom: 10px;"><i class="fa-regular fa-circle-info"></i> Tap a date to see details</div>
+                <div id="previewContent" style="color:#e0c0e0; min-height: 60px;"></div>
+            </div>
+        `;
+
+        return calendarHtml;
+    }
+
+    function renderInsights() {
+        // Prepare data for charts
+        const last14Days = [];
+        for (let i = 14; i >= 0; i--) {
+            const d = new Date(2026, 1, 21 - i); // Feb 21 minus i days
+            const dateStr = `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+            const entry = symptomEntries[dateStr];
+            last14Days.push({
+                date: `${d.getMonth() + 1}/${d.getDate()}`,
+                painLevel: entry?.painLevel || null,
+                hasEntry: !!entry
+            });
+        }
+
+        // Calculate patterns
+        const entries = Object.values(symptomEntries);
+        const symptomFrequency = {};
+        entries.forEach(entry => {
+            entry.symptoms?.forEach(s => {
+                symptomFrequency[s] = (symptomFrequency[s] || 0) + 1;
+            });
+        });
+
+        const topSymptoms = Object.entries(symptomFrequency)
+            .sort((a, b) => b[1] - a[1])
+            .slice(0, 3)
+            .map(([id, count]) => {
+                const sym = SYMPTOMS.find(s => s.id === id);
+                return { label: sym?.label || id, count };
+            });
+
+        // Period correlation
+        const periodEntries = entries.filter(e => e.factors?.period);
+        const avgPainDuringPeriod = periodEntries.length ?
+            Math.round(periodEntries.reduce((sum, e) => sum + (e.painLevel || 0), 0) / periodEntries.length) : 0;
+        const avgPainOverall = entries.length ?
+            Math.round(entries.reduce((sum, e) => sum + (e.painLevel || 0), 0) / entries.length) : 0;
+
+        return `
+            <div style="margin-top: 8px;">
+                <div class="greeting" style="font-size: 22px;">📊 Health Intelligence</div>
+
+                <!-- Pain Trend Chart -->
+                <div class="insight-card">
+                    <div style="font-weight: 600; margin-bottom: 14px; color:#ffd0f0;">
+                        <i class="fa-solid fa-chart-line"></i> Pain Severity Trend
+                    </div>
+                    <div class="chart-container">
+                        <canvas id="painChart"></canvas>
+                    </div>
+                </div>
+
+                <!-- Key Insights Grid -->
+                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 12px; margin-bottom: 20px;">
+                    <div class="insight-card" style="padding: 16px;">
+                        <div style="color:#ffb0f0; font-size: 13px;">Most Common</div>
+                        <div style="font-size: 24px; font-weight: 600; color:white;">${topSymptoms[0]?.label || '—'}</div>
+                        <div style="color:#b090b0;">${topSymptoms[0]?.count || 0} occurrences</div>
+                    </div>
+                    <div class="insight-card" style="padding: 16px;">
+                        <div style="color:#ffb0f0; font-size: 13px;">Avg Pain (Period)</div>
+                        <div style="font-size: 24px; font-weight: 600; color:white;">${avgPainDuringPeriod}/10</div>
+                        <div style="color:#b090b0;">vs ${Math.round(entries.reduce((s, e) => s + (e.painLevel || 0), 0) / entries.length) || 0}/10 overall</div>
+                    </div>
+                </div>
+
+                <!-- AI Pattern Detection -->
+                <div class="insight-card">
+                    <div style="font-weight: 600; margin-bottom: 14px; color:#ffd0f0;">
+                        <i class="fa-solid fa-brain"></i> AI Pattern Analysis
+                    </div>
+
+                    <div style="margin-bottom: 16px;">
+                        <div class="insight-badge">
+                            <i class="fa-solid fa-triangle-exclamation"></i> Red Flag Check
+                        </div>
+                        <p style="color:#e0c0e0; margin-top: 10px;">
+                            ${avgPainDuringPeriod > 7 ?
+                'Severe pain detected during period (avg 8/10). Consider discussing with doctor.' :
+                'No red flags detected. Pain levels within normal range.'}
+                        </p>
+                    </div>
+
+                    <div style="margin-bottom: 16px;">
+                        <div class="insight-badge" style="background:#5a4a80;">
+                            <i class="fa-solid fa-calendar"></i> Cycle Correlation
+                        </div>
+                        <p style="color:#e0c0e0; margin-top: 10px;">
+                            ${topSymptoms[0]?.label || 'Symptoms'} tend to peak ${avgPainDuringPeriod > 5 ? 'during' : 'before'} your period.
+                            ${entries.filter(e => e.symptoms?.includes('headache')).length > 3 ?
+                'Headaches show a cyclical pattern.' : ''}
+                        </p>
+                    </div>
+
+                    <div style="background: #1f1520; border-radius: 20px; padding: 16px; margin-top: 16px;">
+                        <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 12px;">
+                            <i class="fa-solid fa-file-medical" style="color:#ffb0f0; font-size: 24px;"></i>
+                            <div style="font-weight: 600; color:#ffd0f0;">Doctor Discussion Guide</div>
+                        </div>
+                        <ul style="color:#e0c0e0; margin-left: 20px; line-height: 1.6;">
+                            <li>Peak pain level: ${Math.max(...entries.map(e => e.painLevel || 0))}/10 on ${Object.entries(symptomEntries).find(([_, e]) => e.painLevel === Math.max(...entries.map(ee => ee.painLevel || 0)))?.[0]}</li>
+                            <li>Most frequent: ${topSymptoms.map(s => s.label).join(', ')}</li>
+                            <li>Period pain correlation: ${avgPainDuringPeriod}/10 average</li>
+                            <li>${entries.filter(e => e.factors?.stress > 4).length} high-stress days recorded</li>
+                        </ul>
+                        <button class="save-button" id="mockDocBtn" style="padding: 12px; font-size: 14px; margin-top: 12px;">
+                            <i class="fa-regular fa-copy"></i> Generate Full Report
+                        </button>
+                        <div id="aiReport" style="color:#e0c0e0; margin-top: 12px; white-space: pre-wrap; line-height: 1.5;"></div>
+                    </div>
+                </div>
+            </div>
+        `;
+    }
+
+    function renderProfile() {
+        const totalEntries = Object.keys(symptomEntries).length;
+        return `
+        <div style="text-align: center; padding: 20px 0;">
+            <div style="background: #8a4a80; width: 100px; height: 100px; border-radius: 50%; margin: 10px auto; display: flex; align-items: center; justify-content: center; font-size: 48px; border: 3px solid #ffb0f0;">
+🐦
+</div>
+            <h3 style="color:#ffe0ff;">${currentUser?.name || 'User'}, ${currentUser?.age || '?'}</h3>
+            <p style="color:#d0b0d0;">Member since Feb 2026 • ${totalEntries} entries</p>
+
+            <div style="background: #2a1d28; border-radius: 30px; padding: 24px; margin-top: 30px; border:1px solid #ffb0e020;">
+                <div style="display: flex; justify-content: space-between; margin: 10px 0; color:#ffd0f0;">
+                    <span>Avg cycle length</span> 
+                    <strong>28 days</strong>
+                </div>
+                <div style="display: flex; justify-content: space-between; margin: 10px 0; color:#ffd0f0;">
+                    <span>Birth control</span> 
+                    <strong>Combination pill</strong>
+                </div>
+                <div style="display: flex; justify-content: space-between; margin: 10px 0; color:#ffd0f0;">
+                    <span>Last period</span> 
+                    <strong>Feb 18</strong>
+                </div>
+                <div style="display: flex; justify-content: space-between; margin: 10px 0; color:#ffd0f0;">
+                    <span>Tracking streak</span> 
+                    <strong>14 days</strong>
+                </div>
+            </div>
+
+            <div style="background: #2a1d28; border-radius: 30px; padding: 24px; margin-top: 20px;">
+                <div style="font-weight: 600; margin-bottom: 15px; color:#ffd0f0;">Health Summary</div>
+                <div style="display: grid; grid-template-columns: repeat(2,1fr); gap: 15px;">
+                    <div>
+                        <div style="font-size: 28px; color:#ffb0f0;">${totalEntries}</div>
+                        <div style="font-size: 12px; color:#b090b0;">Days tracked</div>
+                    </div>
+                    <div>
+                        <div style="font-size: 28px; color:#ffb0f0;">${Object.values(symptomEntries).filter(e => e.factors?.period).length}</div>
+                        <div style="font-size: 12px; color:#b090b0;">Period days</div>
+                    </div>
+                </div>
+            </div>
+
+            <button class="logout-button" id="logoutBtn">
+                <i class="fa-solid fa-sign-out-alt"></i> Log Out
+            </button>
+
+            <p class="footer-note">🔐 Your data is private and encrypted</p>
+        </div>
+    `;
+    }
+
+    function renderTabs() {
+        const tabBar = document.getElementById('tabBar');
+        if (!tabBar) return;
+
+        if (!isAuthenticated) {
+            tabBar.innerHTML = `
+                <div class="tab-item active" data-tab="auth">
+                    <i class="fa-solid fa-lock"></i>
+                    <span>Sign In</span>
+                </div>
+            `;
+        } else {
+            tabBar.innerHTML = `
+                <div class="tab-item ${activeTab === 'home' ? 'active' : ''}" data-tab="home">
+                    <i class="fa-solid fa-house"></i>
+                    <span>Home</span>
+                </div>
+                <div class="tab-item ${activeTab === 'calendar' ? 'active' : ''}" data-tab="calendar">
+                    <i class="fa-solid fa-calendar"></i>
+                    <span>Calendar</span>
+                </div>
+                <div class="tab-item ${activeTab === 'insights' ? 'active' : ''}" data-tab="insights">
+                    <i class="fa-solid fa-chart-line"></i>
+                    <span>Insights</span>
+                </div>
+                <div class="tab-item ${activeTab === 'profile' ? 'active' : ''}" data-tab="profile">
+                    <i class="fa-solid fa-user"></i>
+                    <span>You</span>
+                </div>
+            `;
+        }
+
+        // Re-attach tab event listeners
+        document.querySelectorAll('.tab-item').forEach(tab => {
+            tab.addEventListener('click', (e) => {
+                document.querySelectorAll('.tab-item').forEach(t => t.classList.remove('active'));
+                tab.classList.add('active');
+                activeTab = tab.dataset.tab;
+                updateScreen();
+            });
+        });
+    }
+
+    function updateScreen() {
+        const contentDiv = document.getElementById('screenContent');
+        if (!contentDiv) return;
+
+        renderTabs();
+
+        if (!isAuthenticated) {
+            contentDiv.innerHTML = renderAuth();
+            attachAuthEvents();
+            return;
+        }
+
+        switch (activeTab) {
+            case 'home':
+                contentDiv.innerHTML = renderHome();
+                attachHomeEvents();
+                break;
+            case 'calendar':
+                contentDiv.innerHTML = renderCalendar();
+                attachCalendarEvents();
+                break;
+            case 'insights':
+                contentDiv.innerHTML = renderInsights();
+                setTimeout(() => attachInsightsEvents(), 100);
+                break;
+            case 'profile':
+                contentDiv.innerHTML = renderProfile();
+                attachProfileEvents();
+                break;
+        }
+    }
+
+    // ===== UPDATED EVENT ATTACHMENT FUNCTIONS =====
+
+    function attachAuthEvents() {
+        // Tab switching
+        document.getElementById('loginTab')?.addEventListener('click', () => {
+            authMode = 'login';
+            updateScreen();
+        });
+
+        document.getElementById('signupTab')?.addEventListener('click', () => {
+            authMode = 'signup';
+            updateScreen();
+        });
+
+        // Auth submit
+        document.getElementById('authSubmitBtn')?.addEventListener('click', async () => {
+            const email = document.getElementById('authEmail')?.value;
+            const password = document.getElementById('authPassword')?.value;
+
+            if (authMode === 'login') {
+                await login(email, password);
+            } else {
+                // Sign up
+                const name = document.getElementById('signupName')?.value;
+                const age = document.getElementById('signupAge')?.value;
+
+                if (email && password && name) {
+                    await signup(name, email, password, age);
+                } else {
+                    alert('Please fill in all fields');
+                }
+            }
+        });
+    }
+
+    function attachProfileEvents() {
+        document.getElementById('logoutBtn')?.addEventListener('click', async () => {
+            await logout();
+        });
+    }
+
+    function attachHomeEvents() {
+        // Initialize Flatpickr for date selection
+        if (document.getElementById('entryDateInput')) {
+            flatpickr("#entryDateInput", {
+                dateFormat: "Y-m-d",
+                defaultDate: entryDate,
+                maxDate: "today",
+                onChange: function (selectedDates, dateStr) {
+                    entryDate = dateStr;
+                    updateScreen();
+                }
+            });
+        }
+
+        // Voice recording variables
+        let mediaRecorder;
+        let audioChunks = [];
+        let isRecording = false;
+
+        // Voice memo button
+        const voiceBtn = document.getElementById('simulateVoiceBtn');
+        if (voiceBtn) {
+            voiceBtn.addEventListener('click', async () => {
+                if (!isRecording) {
+                    // Start recording
+                    try {
+                        const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+                        mediaRecorder = new MediaRecorder(stream);
+                        audioChunks = [];
+
+                        mediaRecorder.ondataavailable = event => {
+                            audioChunks.push(event.data);
+                        };
+
+                        mediaRecorder.onstop = async () => {
+                            // Update UI to show processing
+                            voiceBtn.innerHTML = `
+                    <span><i class="fa-solid fa-spinner fa-spin"></i> <span>Transcribing...</span></span>
+                    <i class="fa-solid fa-arrow-right"></i>
+                `;
+
+                            // Upload the recording as raw audio, no base64 round-trip
+                            const audioBlob = new Blob(audioChunks, { type: 'audio/webm' });
+
+                            try {
+                                // Queue the audio and wait for the transcript
+                                const transcript = await transcribeAudio(audioBlob);
+                                document.getElementById('symptomTextInput').value = transcript;
+
+                                // Reset button
+                                voiceBtn.innerHTML = `
+                        <span><i class="fa-solid fa-microphone"></i> <span>Record voice memo</span></span>
+                        <i class="fa-solid fa-arrow-right"></i>
+                    `;
+                                voiceBtn.style.background = '#3a2340';
+
+                                // Optional: Show success indicator
+                                voiceBtn.style.borderColor = '#90ff90';
+                                setTimeout(() => {
+                                    voiceBtn.style.borderColor = '#ffa0e060';
+                                }, 2000);
+                            } catch (error) {
+                                console.error('Transcription error:', error);
+
+                                // Show error state
+                                voiceBtn.innerHTML = `
+                        <span><i class="fa-solid fa-exclamation-triangle" style="color:#ff8080;"></i> <span>Try again</span></span>
+                        <i class="fa-solid fa-arrow-right"></i>
+                    `;
+                                voiceBtn.style.background = '#4a2a50';
+                                voiceBtn.style.borderColor = '#ff8080';
+
+                                // Reset after 3 seconds
+                                setTimeout(() => {
+                                    voiceBtn.innerHTML = `
+                            <span><i class="fa-solid fa-microphone"></i> <span>Record voice memo</span></span>
+                            <i class="fa-solid fa-arrow-right"></i>
+                        `;
+                                    voiceBtn.style.background = '#3a2340';
+                                    voiceBtn.style.borderColor = '#ffa0e060';
+                                }, 3000);
+                            }
+
+                            // Stop all audio tracks
+                            stream.getTracks().forEach(track => track.stop());
+                        };
+
+                        // Start recording
+                        mediaRecorder.start();
+                        isRecording = true;
+
+                        // Update UI for recording state
+                        voiceBtn.innerHTML = `
+                <span><i class="fa-solid fa-stop" style="color:#ff8080;"></i> <span>Recording... Click to stop</span></span>
+                <i class="fa-solid fa-arrow-right"></i>
+            `;
+                        voiceBtn.style.background = '#ff80d0';
+                        voiceBtn.style.borderColor = '#ff80d0';
+
+                        // Auto-stop after 15 seconds max
+                        setTimeout(() => {
+                            if (isRecording && mediaRecorder && mediaRecorder.state === 'recording') {
+                                mediaRecorder.stop();
+                                isRecording = false;
+                            }
+                        }, 15000);
+
+                    } catch (error) {
+                        console.error('Error accessing microphone:', error);
+
+                        // Handle microphone permission errors
+                        if (error.name === 'NotAllowedError') {
+                            alert('Please allow microphone access to use voice input.');
+                        } else if (error.name === 'NotFoundError') {
+                            alert('No microphone found. Please connect a microphone.');
+                        } else {
+                            alert('Could not access microphone. Please check permissions.');
+                        }
+                    }
+                } else {
+                    // Stop recording
+                    if (mediaRecorder && mediaRecorder.state === 'recording') {
+                        mediaRecorder.stop();
+                        isRecording = false;
+                    }
+                }
+            });
+        }
+
+        // Symptom chips
+        document.querySelectorAll('.symptom-chip').forEach(chip => {
+            chip.addEventListener('click', () => {
+                const symptom = chip.dataset.symptom;
+                if (selectedSymptoms.includes(symptom)) {
+                    selectedSymptoms = selectedSymptoms.filter(s => s !== symptom);
+                    chip.classList.remove('active');
+                } else {
+                    selectedSymptoms.push(symptom);
+                    chip.classList.add('active');
+                }
+            });
+        });
+
+        // Pain slider
+        document.getElementById('painSlider')?.addEventListener('input', (e) => {
+            painLevel = parseInt(e.target.value);
+            document.getElementById('painValue').innerText = painLevel;
+        });
+
+        // Period chip
+        document.getElementById('chipPeriod')?.addEventListener('click', () => {
+            currentFactors.period = !currentFactors.period;
+            const chip = document.getElementById('chipPeriod');
+            const sel = document.getElementById('periodFlowSelect');
+            chip?.classList.toggle('active', currentFactors.period);
+            if (sel) sel.style.display = currentFactors.period ? 'block' : 'none';
+        });
+
+        document.getElementById('chipBirthControl')?.addEventListener('click', () => {
+            currentFactors.birthControl = !currentFactors.birthControl;
+            const chip = document.getElementById('chipBirthControl');
+            const sel = document.getElementById('birthControlSelect');
+            chip?.classList.toggle('active', currentFactors.birthControl);
+            if (sel) sel.style.display = currentFactors.birthControl ? 'block' : 'none';
+        });
+
+        document.getElementById('chipSick')?.addEventListener('click', () => {
+            currentFactors.sick = !currentFactors.sick;
+            const chip = document.getElementById('chipSick');
+            const sel = document.getElementById('sickSelect');
+            chip?.classList.toggle('active', currentFactors.sick);
+            if (sel) sel.style.display = currentFactors.sick ? 'block' : 'none';
+        });
+
+        // Selects and sliders
+        document.getElementById('periodFlowSelect')?.addEventListener('change', (e) => {
+            currentFactors.periodFlow = e.target.value;
+        });
+
+        document.getElementById('birthControlSelect')?.addEventListener('change', (e) => {
+            currentFactors.birthControlType = e.target.value;
+        });
+
+        document.getElementById('sickSelect')?.addEventListener('change', (e) => {
+            currentFactors.sickType = e.target.value;
+        });
+
+        document.getElementById('stressSlider')?.addEventListener('input', (e) => {
+            currentFactors.stress = parseInt(e.target.value);
+            document.getElementById('stressValue').innerText = currentFactors.stress + '/5';
+        });
+
+        // Save button - UPDATED to use database
+        document.getElementById('saveEntryBtn')?.addEventListener('click', async () => {
+            const text = document.getElementById('symptomTextInput').value;
+            const dateToSave = entryDate || getTodayDate();
+
+            const savedFactors = {
+                period: currentFactors.period,
+                period_flow: currentFactors.period ? currentFactors.periodFlow : null,
+                birth_control: currentFactors.birthControl,
+                birth_control_type: currentFactors.birthControl ? currentFactors.birthControlType : null,
+                sick: currentFactors.sick,
+                sick_type: currentFactors.sick ? currentFactors.sickType : null,
+                stress: currentFactors.stress
+            };
+
+            const entryData = {
+                entry_date: dateToSave,
+                text: text,
+                pain_level: painLevel,
+                symptoms: selectedSymptoms,
+                factors: savedFactors
+            };
+
+            try {
+                // Show saving indicator
+                const saveBtn = document.getElementById('saveEntryBtn');
+                const originalText = saveBtn.innerHTML;
+                saveBtn.innerHTML = '<i class="fa-solid fa-spinner fa-spin"></i> Saving...';
+                saveBtn.disabled = true;
+
+                const result = await saveEntryToDB(entryData);
+
+                if (result.success) {
+                    // Update local cache
+                    symptomEntries[dateToSave] = {
+                        text: text,
+                        symptoms: selectedSymptoms,
+                        painLevel: painLevel,
+                        factors: {
+                            period: currentFactors.period ? currentFactors.periodFlow : false,
+                            birthControl: currentFactors.birthControl ? currentFactors.birthControlType : false,
+                            sick: currentFactors.sick ? currentFactors.sickType : false,
+                            stress: currentFactors.stress
+                        }
+                    };
+
+                    alert('Entry saved! Check Insights for AI analysis.');
+
+                    // Switch to insights tab
+                    document.querySelectorAll('.tab-item').forEach(t => t.classList.remove('active'));
+                    document.querySelector('[data-tab="insights"]')?.classList.add('active');
+                    activeTab = 'insights';
+                    updateScreen();
+                }
+            } catch (error) {
+                console.error('Error saving:', error);
+                alert('Failed to save entry. Please try again.');
+            } finally {
+                // Restore button
+                const saveBtn = document.getElementById('saveEntryBtn');
+                if (saveBtn) {
+                    saveBtn.innerHTML = '<i class="fa-regular fa-floppy-disk"></i> Save Today\'s Entry';
+                    saveBtn.disabled = false;
+                }
+            }
+        });
+    }
+
+    function attachCalendarEvents() {
+        document.querySelectorAll('.day-cell[data-date]').forEach(cell => {
+            cell.addEventListener('click', (e) => {
+                const dateStr = cell.dataset.date;
+                const entry = symptomEntries[dateStr];
+                const previewDiv = document.getElementById('previewContent');
+
+                if (previewDiv) {
+                    if (entry) {
+                        const symptoms = entry.symptoms?.map(s => {
+                            const sym = SYMPTOMS.find(sym => sym.id === s);
+                            return sym ? sym.label : s;
+                        }).join(', ') || 'none';
+
+                        previewDiv.innerHTML = `
+                            <strong style="color:#ffb0f0;">${dateStr}</strong><br>
+                            <span style="color:#ffe0ff;">"${entry.text}"</span><br>
+                            <div style="margin-top: 8px;">
+                                <span class="pill">Pain: ${entry.painLevel}/10</span>
+                                <span class="pill">Symptoms: ${symptoms}</span>
+                                ${entry.factors?.period ? '<span class="pill">Period</span>' : ''}
+                            </div>
+                        `;
+                    } else {
+                        previewDiv.innerHTML = `<span style="color:#b090b0;">No entry for this date.</span>`;
+                    }
+                }
+            });
+        });
+    }
+
+    function attachInsightsEvents() {
+        // Create pain chart
+        const ctx = document.getElementById('painChart')?.getContext('2d');
+        if (ctx) {
+            // Prepare last 14 days data
+            const labels = [];
+            const painData = [];
+
+            for (let i = 14; i >= 0; i--) {
+                const d = new Date(2026, 1, 21 - i);
+                const dateStr = `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+                const entry = symptomEntries[dateStr];
+                labels.push(`${d.getMonth() + 1}/${d.getDate()}`);
+                painData.push(entry?.painLevel || null);
+            }
+
+            new Chart(ctx, {
+                type: 'line',
+                data: {
+                    labels: labels,
+                    datasets: [{
+                        label: 'Pain Level (1-10)',
+                        data: painData,
+                        borderColor: '#ff80d0',
+                        backgroundColor: 'rgba(255, 128, 208, 0.1)',
+                        tension: 0.4,
+                        fill: true,
+                        pointBackgroundColor: painData.map(v => v > 7 ? '#ff0000' : '#ffb0f0'),
+                        pointRadius: 5
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: { display: false }
+                    },
+                    scales: {
+                        y: {
+                            beginAtZero: true,
+                            max: 10,
+                            grid: { color: '#3a2a3a' },
+                            ticks: { color: '#b090b0' }
+                        },
+                        x: {
+                            grid: { display: false },
+                            ticks: { color: '#b090b0', maxRotation: 45 }
+                        }
+                    }
+                }
+            });
+        }
+
+        document.getElementById('mockDocBtn')?.addEventListener('click', () => {
+            const report = document.getElementById('aiReport');
+            report.innerHTML = '<i class="fa-solid fa-spinner fa-spin"></i> Analyzing your entries...';
+
+            // Stream the report so text shows up as the model writes it
+            const source = new EventSource('/api/insights/stream');
+            let started = false;
+            source.addEventListener('meta', event => {
+                if (JSON.parse(event.data).entry_count === 0) {
+                    report.textContent = 'Log a few entries to get a report.';
+                }
+            });
+            source.addEventListener('chunk', event => {
+                if (!started) {
+                    report.textContent = '';
+                    started = true;
+                }
+                report.textContent += JSON.parse(event.data).text;
+            });
+            source.addEventListener('done', () => source.close());
+            source.addEventListener('error', event => {
+                source.close();
+                if (!started) {
+                    console.error('Insights stream error:', event);
+                    report.textContent = 'Unable to generate report right now. Please try again later.';
+                }
+            });
+        });
+    }
+
+    // Check auth status on page load
+    checkAuthStatus();
+})();
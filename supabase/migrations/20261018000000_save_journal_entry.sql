@@ -0,0 +1,66 @@
+-- Atomic save for POST /api/entries.
+--
+-- save_journal_entry upserts the day's journal entry and replaces its symptom
+-- links and factors in a single transaction, so the API makes one round-trip
+-- per save and a failure can no longer leave a half-written entry.
+--
+-- The unique constraint below will fail if a user already has two entries
+-- on the same day. Find them first with:
+--   select user_id, entry_date, count(*) from journal_entries
+--   group by 1, 2 having count(*) > 1;
+
+alter table public.journal_entries
+    add constraint journal_entries_user_id_entry_date_key unique (user_id, entry_date);
+
+create or replace function public.save_journal_entry(
+    p_user_id public.journal_entries.user_id%type,
+    p_entry_date public.journal_entries.entry_date%type,
+    p_text public.journal_entries.text%type,
+    p_pain_level public.journal_entries.pain_level%type,
+    p_symptom_keys text[],
+    p_factors jsonb
+)
+returns public.journal_entries.id%type
+language plpgsql
+as $$
+declare
+    v_entry_id public.journal_entries.id%type;
+begin
+    if not exists (select 1 from public.users where id = p_user_id) then
+        raise exception 'User not found' using errcode = 'P0002';
+    end if;
+
+    insert into public.journal_entries (user_id, entry_date, text, pain_level)
+    values (p_user_id, p_entry_date, p_text, p_pain_level)
+    on conflict (user_id, entry_date) do update
+        set text = excluded.text,
+            pain_level = excluded.pain_level,
+            updated_at = now()
+    returning id into v_entry_id;
+
+    delete from public.entry_symptoms where entry_id = v_entry_id;
+    delete from public.entry_factors where entry_id = v_entry_id;
+
+    insert into public.entry_symptoms (entry_id, symptom_id)
+    select v_entry_id, s.id
+    from public.symptoms s
+    where s.symptom_key = any(coalesce(p_symptom_keys, '{}'));
+
+    insert into public.entry_factors (
+        entry_id, period, period_flow, birth_control, birth_control_type,
+        sick, sick_type, stress
+    )
+    values (
+        v_entry_id,
+        coalesce((p_factors->>'period')::boolean, false),
+        p_factors->>'period_flow',
+        coalesce((p_factors->>'birth_control')::boolean, false),
+        p_factors->>'birth_control_type',
+        coalesce((p_factors->>'sick')::boolean, false),
+        p_factors->>'sick_type',
+        coalesce((p_factors->>'stress')::integer, 3)
+    );
+
+    return v_entry_id;
+end;
+$$;
@@ -0,0 +1,183 @@
+-- Pre-aggregated per-user symptom statistics.
+--
+-- symptom_stats keeps one row per user per day, ISO week and month. Each row
+-- holds entry counts, pain sum/max, stress, period and sick days, and symptom
+-- counts overall, on period days and on high-stress days. save_journal_entry
+-- refreshes the three buckets that contain the saved date in the same
+-- transaction, so trend views read O(buckets) rows instead of every entry.
+
+-- user_id must match journal_entries.user_id, whatever type the project uses
+do $$
+declare
+    v_user_type text;
+begin
+    select format_type(atttypid, atttypmod) into v_user_type
+    from pg_attribute
+    where attrelid = 'public.journal_entries'::regclass and attname = 'user_id';
+
+    execute format($sql$
+        create table if not exists public.symptom_stats (
+            user_id %s not null,
+            bucket text not null check (bucket in ('day', 'week', 'month')),
+            bucket_start date not null,
+            entry_count integer not null default 0,
+            pain_sum integer not null default 0,
+            pain_max integer,
+            stress_sum integer not null default 0,
+            stress_count integer not null default 0,
+            high_stress_days integer not null default 0,
+            period_days integer not null default 0,
+            period_high_stress_days integer not null default 0,
+            sick_days integer not null default 0,
+            symptom_counts jsonb not null default '{}',
+            period_symptom_counts jsonb not null default '{}',
+            high_stress_symptom_counts jsonb not null default '{}',
+            updated_at timestamptz not null default now(),
+            primary key (user_id, bucket, bucket_start)
+        )
+    $sql$, v_user_type);
+end;
+$$;
+
+-- Recompute the day, week and month buckets containing p_entry_date
+create or replace function public.refresh_symptom_stats(
+    p_user_id public.journal_entries.user_id%type,
+    p_entry_date public.journal_entries.entry_date%type
+)
+returns void
+language plpgsql
+as $$
+declare
+    v_bucket text;
+    v_start date;
+    v_end date;
+begin
+    foreach v_bucket in array array['day', 'week', 'month'] loop
+        v_start := date_trunc(v_bucket, p_entry_date::timestamp)::date;
+        v_end := (v_start + ('1 ' || v_bucket)::interval)::date;
+
+        delete from public.symptom_stats
+        where user_id = p_user_id and bucket = v_bucket and bucket_start = v_start;
+
+        insert into public.symptom_stats (
+            user_id, bucket, bucket_start, entry_count, pain_sum, pain_max,
+            stress_sum, stress_count, high_stress_days, period_days,
+            period_high_stress_days, sick_days, symptom_counts,
+            period_symptom_counts, high_stress_symptom_counts
+        )
+        select
+            p_user_id,
+            v_bucket,
+            v_start,
+            count(*),
+            coalesce(sum(e.pain_level), 0),
+            max(e.pain_level),
+            coalesce(sum(f.stress), 0),
+            count(f.stress),
+            count(*) filter (where f.stress >= 4),
+            count(*) filter (where f.period),
+            count(*) filter (where f.period and f.stress >= 4),
+            count(*) filter (where f.sick),
+            coalesce((
+                select jsonb_object_agg(t.symptom_key, t.n) from (
+                    select s.symptom_key, count(*) as n
+                    from public.journal_entries e2
+                    join public.entry_symptoms es on es.entry_id = e2.id
+                    join public.symptoms s on s.id = es.symptom_id
+                    where e2.user_id = p_user_id
+                      and e2.entry_date >= v_start and e2.entry_date < v_end
+                    group by s.symptom_key
+                ) t
+            ), '{}'),
+            coalesce((
+                select jsonb_object_agg(t.symptom_key, t.n) from (
+                    select s.symptom_key, count(*) as n
+                    from public.journal_entries e2
+                    join public.entry_factors f2 on f2.entry_id = e2.id and f2.period
+                    join public.entry_symptoms es on es.entry_id = e2.id
+                    join public.symptoms s on s.id = es.symptom_id
+                    where e2.user_id = p_user_id
+                      and e2.entry_date >= v_start and e2.entry_date < v_end
+                    group by s.symptom_key
+                ) t
+            ), '{}'),
+            coalesce((
+                select jsonb_object_agg(t.symptom_key, t.n) from (
+                    select s.symptom_key, count(*) as n
+                    from public.journal_entries e2
+                    join public.entry_factors f2 on f2.entry_id = e2.id and f2.stress >= 4
+                    join public.entry_symptoms es on es.entry_id = e2.id
+                    join public.symptoms s on s.id = es.symptom_id
+                    where e2.user_id = p_user_id
+                      and e2.entry_date >= v_start and e2.entry_date < v_end
+                    group by s.symptom_key
+                ) t
+            ), '{}')
+        from public.journal_entries e
+        left join public.entry_factors f on f.entry_id = e.id
+        where e.user_id = p_user_id
+          and e.entry_date >= v_start and e.entry_date < v_end
+        having count(*) > 0;
+    end loop;
+end;
+$$;
+
+-- Same as before, plus the rollup refresh at the end
+create or replace function public.save_journal_entry(
+    p_user_id public.journal_entries.user_id%type,
+    p_entry_date public.journal_entries.entry_date%type,
+    p_text public.journal_entries.text%type,
+    p_pain_level public.journal_entries.pain_level%type,
+    p_symptom_keys text[],
+    p_factors jsonb
+)
+returns public.journal_entries.id%type
+language plpgsql
+as $$
+declare
+    v_entry_id public.journal_entries.id%type;
+begin
+    if not exists (select 1 from public.users where id = p_user_id) then
+        raise exception 'User not found' using errcode = 'P0002';
+    end if;
+
+    insert into public.journal_entries (user_id, entry_date, text, pain_level)
+    values (p_user_id, p_entry_date, p_text, p_pain_level)
+    on conflict (user_id, entry_date) do update
+        set text = excluded.text,
+            pain_level = excluded.pain_level,
+            updated_at = now()
+    returning id into v_entry_id;
+
+    delete from public.entry_symptoms where entry_id = v_entry_id;
+    delete from public.entry_factors where entry_id = v_entry_id;
+
+    insert into public.entry_symptoms (entry_id, symptom_id)
+    select v_entry_id, s.id
+    from public.symptoms s
+    where s.symptom_key = any(coalesce(p_symptom_keys, '{}'));
+
+    insert into public.entry_factors (
+        entry_id, period, period_flow, birth_control, birth_control_type,
+        sick, sick_type, stress
+    )
+    values (
+        v_entry_id,
+        coalesce((p_factors->>'period')::boolean, false),
+        p_factors->>'period_flow',
+        coalesce((p_factors->>'birth_control')::boolean, false),
+        p_factors->>'birth_control_type',
+        coalesce((p_factors->>'sick')::boolean, false),
+        p_factors->>'sick_type',
+        coalesce((p_factors->>'stress')::integer, 3)
+    );
+
+    perform public.refresh_symptom_stats(p_user_id, p_entry_date);
+
+    return v_entry_id;
+end;
+$$;
+
+-- Backfill from existing history (recomputes each bucket once per entry in it)
+select public.refresh_symptom_stats(user_id, entry_date)
+from public.journal_entries;
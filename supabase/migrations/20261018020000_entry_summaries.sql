@@ -0,0 +1,54 @@
+-- Daily summaries written by the offline batch worker (workers/daily_summaries.py).
+--
+-- One row per journal entry. entry_updated_at records which version of the
+-- entry was summarized: once the entry is edited the summary counts as stale
+-- and entries_needing_summary returns the entry again, so a worker run that
+-- crashed part-way simply picks up what is still missing.
+
+do $$
+declare
+    v_entry_type text;
+    v_updated_type text;
+begin
+    -- Match journal_entries column types so ids and timestamps compare exactly
+    select format_type(atttypid, atttypmod) into v_entry_type
+    from pg_attribute
+    where attrelid = 'public.journal_entries'::regclass and attname = 'id';
+
+    select format_type(atttypid, atttypmod) into v_updated_type
+    from pg_attribute
+    where attrelid = 'public.journal_entries'::regclass and attname = 'updated_at';
+
+    execute format($sql$
+        create table if not exists public.entry_summaries (
+            entry_id %s primary key references public.journal_entries (id) on delete cascade,
+            summary text not null,
+            model text,
+            entry_updated_at %s,
+            created_at timestamptz not null default now()
+        )
+    $sql$, v_entry_type, v_updated_type);
+end;
+$$;
+
+-- Entries with no summary or a stale one, in id order after p_after_id
+create or replace function public.entries_needing_summary(
+    p_after_id public.journal_entries.id%type,
+    p_limit integer,
+    p_date_from date default null,
+    p_date_to date default null
+)
+returns setof public.journal_entries
+language sql
+stable
+as $$
+    select e.*
+    from public.journal_entries e
+    left join public.entry_summaries s on s.entry_id = e.id
+    where e.id > p_after_id
+      and (p_date_from is null or e.entry_date >= p_date_from)
+      and (p_date_to is null or e.entry_date <= p_date_to)
+      and (s.entry_id is null or s.entry_updated_at is distinct from e.updated_at)
+    order by e.id
+    limit p_limit;
+$$;
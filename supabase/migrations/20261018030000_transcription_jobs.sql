@@ -0,0 +1,29 @@
+-- Shared state for background transcription jobs.
+--
+-- Each server process runs the jobs it accepted, but writes their state here
+-- when they are queued and when they finish, so a client polling through a
+-- different gunicorn worker still finds its job. Rows are pruned by the app
+-- once they are older than TRANSCRIBE_JOB_TTL.
+
+do $$
+declare
+    v_user_type text;
+begin
+    select format_type(atttypid, atttypmod) into v_user_type
+    from pg_attribute
+    where attrelid = 'public.users'::regclass and attname = 'id';
+
+    execute format($sql$
+        create table if not exists public.transcription_jobs (
+            id text primary key,
+            user_id %s not null references public.users (id) on delete cascade,
+            status text not null,
+            data jsonb not null,
+            updated_at timestamptz not null default now()
+        )
+    $sql$, v_user_type);
+end;
+$$;
+
+create index if not exists transcription_jobs_updated_at_idx
+    on public.transcription_jobs (updated_at);
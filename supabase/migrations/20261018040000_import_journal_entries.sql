@@ -0,0 +1,176 @@
+-- Bulk import for POST /api/entries/import.
+--
+-- import_journal_entries writes a batch of entries with set-based statements:
+-- one multi-row upsert into journal_entries, then one delete and one
+-- multi-row insert each for entry_symptoms and entry_factors, all in the
+-- caller's transaction. Each affected symptom_stats bucket is then rebuilt
+-- once, not once per entry in it.
+--
+-- p_entries is a JSON array of
+--   {entry_date, text, pain_level, symptom_keys: [...], factors: {...}}
+-- with at most one element per entry_date (the API rejects duplicates).
+
+-- One bucket of refresh_symptom_stats, split out so imports can refresh
+-- each bucket once
+create or replace function public.refresh_symptom_stats_bucket(
+    p_user_id public.journal_entries.user_id%type,
+    p_bucket text,
+    p_start date
+)
+returns void
+language plpgsql
+as $$
+declare
+    v_end date := (p_start + ('1 ' || p_bucket)::interval)::date;
+begin
+    delete from public.symptom_stats
+    where user_id = p_user_id and bucket = p_bucket and bucket_start = p_start;
+
+    insert into public.symptom_stats (
+        user_id, bucket, bucket_start, entry_count, pain_sum, pain_max,
+        stress_sum, stress_count, high_stress_days, period_days,
+        period_high_stress_days, sick_days, symptom_counts,
+        period_symptom_counts, high_stress_symptom_counts
+    )
+    select
+        p_user_id,
+        p_bucket,
+        p_start,
+        count(*),
+        coalesce(sum(e.pain_level), 0),
+        max(e.pain_level),
+        coalesce(sum(f.stress), 0),
+        count(f.stress),
+        count(*) filter (where f.stress >= 4),
+        count(*) filter (where f.period),
+        count(*) filter (where f.period and f.stress >= 4),
+        count(*) filter (where f.sick),
+        coalesce((
+            select jsonb_object_agg(t.symptom_key, t.n) from (
+                select s.symptom_key, count(*) as n
+                from public.journal_entries e2
+                join public.entry_symptoms es on es.entry_id = e2.id
+                join public.symptoms s on s.id = es.symptom_id
+                where e2.user_id = p_user_id
+                  and e2.entry_date >= p_start and e2.entry_date < v_end
+                group by s.symptom_key
+            ) t
+        ), '{}'),
+        coalesce((
+            select jsonb_object_agg(t.symptom_key, t.n) from (
+                select s.symptom_key, count(*) as n
+                from public.journal_entries e2
+                join public.entry_factors f2 on f2.entry_id = e2.id and f2.period
+                join public.entry_symptoms es on es.entry_id = e2.id
+                join public.symptoms s on s.id = es.symptom_id
+                where e2.user_id = p_user_id
+                  and e2.entry_date >= p_start and e2.entry_date < v_end
+                group by s.symptom_key
+            ) t
+        ), '{}'),
+        coalesce((
+            select jsonb_object_agg(t.symptom_key, t.n) from (
+                select s.symptom_key, count(*) as n
+                from public.journal_entries e2
+                join public.entry_factors f2 on f2.entry_id = e2.id and f2.stress >= 4
+                join public.entry_symptoms es on es.entry_id = e2.id
+                join public.symptoms s on s.id = es.symptom_id
+                where e2.user_id = p_user_id
+                  and e2.entry_date >= p_start and e2.entry_date < v_end
+                group by s.symptom_key
+            ) t
+        ), '{}')
+    from public.journal_entries e
+    left join public.entry_factors f on f.entry_id = e.id
+    where e.user_id = p_user_id
+      and e.entry_date >= p_start and e.entry_date < v_end
+    having count(*) > 0;
+end;
+$$;
+
+-- Same behaviour as before, now built on refresh_symptom_stats_bucket
+create or replace function public.refresh_symptom_stats(
+    p_user_id public.journal_entries.user_id%type,
+    p_entry_date public.journal_entries.entry_date%type
+)
+returns void
+language plpgsql
+as $$
+declare
+    v_bucket text;
+begin
+    foreach v_bucket in array array['day', 'week', 'month'] loop
+        perform public.refresh_symptom_stats_bucket(
+            p_user_id, v_bucket, date_trunc(v_bucket, p_entry_date::timestamp)::date
+        );
+    end loop;
+end;
+$$;
+
+create or replace function public.import_journal_entries(
+    p_user_id public.journal_entries.user_id%type,
+    p_entries jsonb
+)
+returns integer
+language plpgsql
+as $$
+declare
+    v_count integer;
+    v_bucket text;
+    v_start date;
+begin
+    if not exists (select 1 from public.users where id = p_user_id) then
+        raise exception 'User not found' using errcode = 'P0002';
+    end if;
+
+    insert into public.journal_entries (user_id, entry_date, text, pain_level)
+    select p_user_id, i.entry_date, i.text, i.pain_level
+    from jsonb_to_recordset(p_entries) as i(entry_date date, text text, pain_level integer)
+    on conflict (user_id, entry_date) do update
+        set text = excluded.text,
+            pain_level = excluded.pain_level,
+            updated_at = now();
+    get diagnostics v_count = row_count;
+
+    delete from public.entry_symptoms es
+    using public.journal_entries e, jsonb_to_recordset(p_entries) as i(entry_date date)
+    where e.user_id = p_user_id and e.entry_date = i.entry_date and es.entry_id = e.id;
+
+    delete from public.entry_factors ef
+    using public.journal_entries e, jsonb_to_recordset(p_entries) as i(entry_date date)
+    where e.user_id = p_user_id and e.entry_date = i.entry_date and ef.entry_id = e.id;
+
+    insert into public.entry_symptoms (entry_id, symptom_id)
+    select e.id, s.id
+    from jsonb_to_recordset(p_entries) as i(entry_date date, symptom_keys jsonb)
+    join public.journal_entries e on e.user_id = p_user_id and e.entry_date = i.entry_date
+    cross join lateral jsonb_array_elements_text(coalesce(i.symptom_keys, '[]')) as k(symptom_key)
+    join public.symptoms s on s.symptom_key = k.symptom_key;
+
+    insert into public.entry_factors (
+        entry_id, period, period_flow, birth_control, birth_control_type,
+        sick, sick_type, stress
+    )
+    select
+        e.id,
+        coalesce((i.factors->>'period')::boolean, false),
+        i.factors->>'period_flow',
+        coalesce((i.factors->>'birth_control')::boolean, false),
+        i.factors->>'birth_control_type',
+        coalesce((i.factors->>'sick')::boolean, false),
+        i.factors->>'sick_type',
+        coalesce((i.factors->>'stress')::integer, 3)
+    from jsonb_to_recordset(p_entries) as i(entry_date date, factors jsonb)
+    join public.journal_entries e on e.user_id = p_user_id and e.entry_date = i.entry_date;
+
+    for v_bucket, v_start in
+        select distinct b.bucket, date_trunc(b.bucket, i.entry_date::timestamp)::date
+        from jsonb_to_recordset(p_entries) as i(entry_date date)
+        cross join unnest(array['day', 'week', 'month']) as b(bucket)
+    loop
+        perform public.refresh_symptom_stats_bucket(p_user_id, v_bucket, v_start);
+    end loop;
+
+    return v_count;
+end;
+$$;
@@ -0,0 +1,91 @@
+-- Delta sync for GET /api/entries/changes.
+--
+-- A client remembers the (updated_at, id) of the last entry it received and
+-- asks only for entries after it. save_journal_entry and
+-- import_journal_entries replace an entry's symptom and factor rows in the
+-- same transaction that updates the entry, so updated_at moves whenever any
+-- of them change. Deleted entries leave a row in entry_tombstones.
+--
+-- Keyset reads on updated_at only work if, per user, timestamps follow
+-- commit order; with now() (the transaction start) a slow writer could
+-- commit a time older than a cursor a client already holds. So every write
+-- to a user's entries first takes a per-user advisory lock, held until
+-- commit, and stamps clock_timestamp() after getting it: a later writer for
+-- the same user waits for the earlier one and always stamps a later time.
+
+create index if not exists journal_entries_user_id_updated_at_idx
+    on public.journal_entries (user_id, updated_at, id);
+
+-- user_id and entry_id must match journal_entries, whatever types the project uses
+do $$
+declare
+    v_user_type text;
+    v_id_type text;
+begin
+    select format_type(atttypid, atttypmod) into v_user_type
+    from pg_attribute
+    where attrelid = 'public.journal_entries'::regclass and attname = 'user_id';
+
+    select format_type(atttypid, atttypmod) into v_id_type
+    from pg_attribute
+    where attrelid = 'public.journal_entries'::regclass and attname = 'id';
+
+    execute format($sql$
+        create table if not exists public.entry_tombstones (
+            entry_id %s primary key,
+            user_id %s not null,
+            entry_date date not null,
+            deleted_at timestamptz not null
+        )
+    $sql$, v_id_type, v_user_type);
+end;
+$$;
+
+create index if not exists entry_tombstones_user_id_deleted_at_idx
+    on public.entry_tombstones (user_id, deleted_at, entry_id);
+
+-- Serialize writes per user and return a timestamp later than every
+-- earlier commit for that user
+create or replace function public.lock_user_journal(
+    p_user_id public.journal_entries.user_id%type
+)
+returns timestamptz
+language plpgsql
+as $$
+begin
+    perform pg_advisory_xact_lock(hashtextextended('journal_entries:' || p_user_id::text, 0));
+    return clock_timestamp();
+end;
+$$;
+
+create or replace function public.stamp_journal_entry()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := public.lock_user_journal(new.user_id);
+    return new;
+end;
+$$;
+
+create or replace function public.record_entry_tombstone()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into public.entry_tombstones (entry_id, user_id, entry_date, deleted_at)
+    values (old.id, old.user_id, old.entry_date, public.lock_user_journal(old.user_id))
+    on conflict (entry_id) do update set deleted_at = excluded.deleted_at;
+    return old;
+end;
+$$;
+
+drop trigger if exists journal_entries_stamp on public.journal_entries;
+create trigger journal_entries_stamp
+    before insert or update on public.journal_entries
+    for each row execute function public.stamp_journal_entry();
+
+drop trigger if exists journal_entries_tombstone on public.journal_entries;
+create trigger journal_entries_tombstone
+    after delete on public.journal_entries
+    for each row execute function public.record_entry_tombstone();
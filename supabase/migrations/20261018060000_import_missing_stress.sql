@@ -0,0 +1,74 @@
+-- Imports keep a missing stress level missing.
+--
+-- import_journal_entries stored 3 for an entry without factors.stress,
+-- inventing a value the user never recorded. Stress is now stored as null,
+-- which symptom_stats already leaves out of stress_sum and stress_count.
+-- (A missing pain_level is rejected by the importer before it gets here.)
+
+create or replace function public.import_journal_entries(
+    p_user_id public.journal_entries.user_id%type,
+    p_entries jsonb
+)
+returns integer
+language plpgsql
+as $$
+declare
+    v_count integer;
+    v_bucket text;
+    v_start date;
+begin
+    if not exists (select 1 from public.users where id = p_user_id) then
+        raise exception 'User not found' using errcode = 'P0002';
+    end if;
+
+    insert into public.journal_entries (user_id, entry_date, text, pain_level)
+    select p_user_id, i.entry_date, i.text, i.pain_level
+    from jsonb_to_recordset(p_entries) as i(entry_date date, text text, pain_level integer)
+    on conflict (user_id, entry_date) do update
+        set text = excluded.text,
+            pain_level = excluded.pain_level,
+            updated_at = now();
+    get diagnostics v_count = row_count;
+
+    delete from public.entry_symptoms es
+    using public.journal_entries e, jsonb_to_recordset(p_entries) as i(entry_date date)
+    where e.user_id = p_user_id and e.entry_date = i.entry_date and es.entry_id = e.id;
+
+    delete from public.entry_factors ef
+    using public.journal_entries e, jsonb_to_recordset(p_entries) as i(entry_date date)
+    where e.user_id = p_user_id and e.entry_date = i.entry_date and ef.entry_id = e.id;
+
+    insert into public.entry_symptoms (entry_id, symptom_id)
+    select e.id, s.id
+    from jsonb_to_recordset(p_entries) as i(entry_date date, symptom_keys jsonb)
+    join public.journal_entries e on e.user_id = p_user_id and e.entry_date = i.entry_date
+    cross join lateral jsonb_array_elements_text(coalesce(i.symptom_keys, '[]')) as k(symptom_key)
+    join public.symptoms s on s.symptom_key = k.symptom_key;
+
+    insert into public.entry_factors (
+        entry_id, period, period_flow, birth_control, birth_control_type,
+        sick, sick_type, stress
+    )
+    select
+        e.id,
+        coalesce((i.factors->>'period')::boolean, false),
+        i.factors->>'period_flow',
+        coalesce((i.factors->>'birth_control')::boolean, false),
+        i.factors->>'birth_control_type',
+        coalesce((i.factors->>'sick')::boolean, false),
+        i.factors->>'sick_type',
+        (i.factors->>'stress')::integer
+    from jsonb_to_recordset(p_entries) as i(entry_date date, factors jsonb)
+    join public.journal_entries e on e.user_id = p_user_id and e.entry_date = i.entry_date;
+
+    for v_bucket, v_start in
+        select distinct b.bucket, date_trunc(b.bucket, i.entry_date::timestamp)::date
+        from jsonb_to_recordset(p_entries) as i(entry_date date)
+        cross join unnest(array['day', 'week', 'month']) as b(bucket)
+    loop
+        perform public.refresh_symptom_stats_bucket(p_user_id, v_bucket, v_start);
+    end loop;
+
+    return v_count;
+end;
+$$;
@@ -0,0 +1,22 @@
+-- Validator for GET /api/entries/changes.
+--
+-- The endpoint's ETag used to come from the app's per-user data version,
+-- which only the app's own writes bump, so an entry deleted or edited
+-- straight in the database kept getting 304s until the user next saved.
+-- Every write to journal_entries, from anywhere, moves the user's newest
+-- updated_at (stamp_journal_entry) or newest tombstone (record_entry_tombstone),
+-- so those two values are the ETag instead. Both come off the
+-- (user_id, updated_at, id) and (user_id, deleted_at, entry_id) indexes.
+
+create or replace function public.journal_sync_position(
+    p_user_id public.journal_entries.user_id%type
+)
+returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'updated_at', (select max(updated_at) from public.journal_entries where user_id = p_user_id),
+        'deleted_at', (select max(deleted_at) from public.entry_tombstones where user_id = p_user_id)
+    );
+$$;
@@ -1,12 +1,9 @@
-import os
-from dotenv import load_dotenv
+import config
 from supabase import create_client
 
-load_dotenv()
-
 # Get credentials
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
+url = config.SUPABASE_URL
+key = config.SUPABASE_KEY
 
 print(f"URL: {url}")
 print(f"Key starts with: {key[:10]}...")
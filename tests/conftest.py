@@ -0,0 +1,60 @@
+"""
+Shared fixtures. Tests run against benchmarks/fake_supabase.py and the
+mock STT server, so they need no network, database or API keys:
+
+    python -m pytest -q
+"""
+import itertools
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import mock_stt_server
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.seed import seed_symptoms, seed_user
+from benchmarks.suite import PASSWORD, build_app
+
+_user_ids = itertools.count(1)
+
+# Wired up at import, before any test module imports the app's services:
+# every Supabase client is this fake and ElevenLabs is the mock server
+_db = FakeSupabase()
+seed_symptoms(_db)
+_stt = mock_stt_server.start()
+_app = build_app(_db, f"http://127.0.0.1:{_stt.server_address[1]}/v1")
+
+
+@pytest.fixture(scope='session')
+def db():
+    """One fake database for the session (the app's clients are built once); tests use their own users"""
+    return _db
+
+
+@pytest.fixture(scope='session')
+def stt():
+    yield _stt
+    _stt.shutdown()
+
+
+@pytest.fixture(scope='session')
+def app():
+    return _app
+
+
+@pytest.fixture
+def user(db):
+    return seed_user(db, f"user{next(_user_ids)}@advora.com", PASSWORD)
+
+
+@pytest.fixture
+def client(app, user):
+    """A test client logged in as `user`"""
+    client = app.test_client()
+    response = client.post('/api/login', json={'email': user['email'], 'password': PASSWORD})
+    assert response.status_code == 200, response.get_json()
+    return client
@@ -0,0 +1,56 @@
+import gzip
+
+import pytest
+
+import build_assets
+from services.assets import IMMUTABLE_CACHE_CONTROL
+from services.compression import brotli
+
+
+@pytest.fixture(scope='module')
+def bundles():
+    """{name: (url, built bytes)} of a fresh build"""
+    return {name: (f"/static/dist/{built_name}", built)
+            for name, (_, built, built_name) in build_assets.build().items()}
+
+
+@pytest.mark.parametrize('name', build_assets.ASSETS)
+def test_bundle_is_sent_precompressed_to_gzip_clients(app, bundles, name):
+    url, built = bundles[name]
+    response = app.test_client().get(url, headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert response.headers['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+    assert response.mimetype == app.test_client().get(url).mimetype
+    assert gzip.decompress(response.data) == built
+    assert len(response.data) < len(built) / 3
+
+
+@pytest.mark.skipif(brotli is None, reason='brotli is not installed')
+def test_brotli_is_preferred_when_accepted(app, bundles):
+    url, built = bundles['app.js']
+    response = app.test_client().get(url, headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.data) == built
+
+
+def test_bundle_is_sent_as_is_without_accept_encoding(app, bundles):
+    url, built = bundles['app.js']
+    response = app.test_client().get(url, headers={'Accept-Encoding': 'identity'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.vary
+    assert response.data == built
+
+
+def test_precompressed_bundle_revalidates(app, bundles):
+    url, _ = bundles['app.css']
+    client = app.test_client()
+    etag = client.get(url, headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+
+    response = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+
+    assert response.status_code == 304
@@ -0,0 +1,116 @@
+import pytest
+
+from benchmarks.seed import seed_entries
+from services.entry_store import EntryStore
+
+
+@pytest.mark.parametrize('days', [30, 365, 3 * 365])
+def test_fetch_entries_is_one_round_trip_at_any_history_size(db, user, days):
+    seed_entries(db, user['id'], days)
+    store = EntryStore(db)
+    store.fetch_entries(user['id'])  # loads the symptom catalog
+
+    db.reset_round_trips()
+    entries = store.fetch_entries(user['id'])
+
+    assert db.round_trips == 1
+    assert len(entries) == days
+    assert all('symptoms' in entry and 'factors' in entry for entry in entries)
+
+
+def test_walking_pages_costs_one_round_trip_per_page(db, user):
+    seed_entries(db, user['id'], 250)
+    store = EntryStore(db)
+    store.fetch_entries(user['id'])
+
+    db.reset_round_trips()
+    dates, cursor, pages = [], None, 0
+    while True:
+        page, cursor = store.fetch_page(user['id'], limit=100, cursor=cursor)
+        dates.extend(entry['entry_date'] for entry in page)
+        pages += 1
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert db.round_trips == 3
+    assert len(dates) == len(set(dates)) == 250
+
+
+@pytest.mark.parametrize('days', [30, 2 * 365])
+def test_get_entries_endpoint_round_trips_stay_flat(db, client, user, days):
+    seed_entries(db, user['id'], days)
+    client.get('/api/entries')  # loads the symptom catalog
+
+    db.reset_round_trips()
+    response = client.get('/api/entries', query_string={'limit': 500})
+
+    assert response.status_code == 200
+    assert db.round_trips == 1
+    assert len(response.get_json()['entries']) == min(days, 500)
+
+
+def test_conditional_get_entries_makes_no_round_trip(db, client, user):
+    seed_entries(db, user['id'], 30)
+    etag = client.get('/api/entries').headers['ETag']
+
+    db.reset_round_trips()
+    response = client.get('/api/entries', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert db.round_trips == 0
+
+
+def test_save_entry_is_one_round_trip(db, client):
+    client.get('/api/entries')
+
+    db.reset_round_trips()
+    response = client.post('/api/entries', json={
+        'entry_date': '2026-01-05',
+        'text': 'Headache after lunch',
+        'pain_level': 6,
+        'symptoms': ['headache', 'nausea'],
+        'factors': {'stress': 4}
+    })
+
+    assert response.status_code == 200, response.get_json()
+    assert db.round_trips == 1
+    entry = client.get('/api/entries').get_json()['entries'][0]
+    assert entry['pain_level'] == 6
+    assert sorted(symptom['symptom_key'] for symptom in entry['symptoms']) == ['headache', 'nausea']
+
+
+def sync(client, token=None, etag=None):
+    return client.get('/api/entries/changes', query_string={'since': token} if token else {},
+                      headers={'If-None-Match': etag} if etag else {})
+
+
+def test_unchanged_delta_sync_is_one_small_round_trip(db, client, user):
+    seed_entries(db, user['id'], 30)
+    token = sync(client).get_json()['next_token']
+    etag = sync(client, token).headers['ETag']
+
+    db.reset_round_trips()
+    response = sync(client, token, etag)
+
+    assert response.status_code == 304
+    assert db.round_trips == 1
+
+
+def test_delta_sync_sees_entries_deleted_in_the_database(db, client, user):
+    seed_entries(db, user['id'], 30)
+    token = sync(client).get_json()['next_token']
+    etag = sync(client, token).headers['ETag']
+
+    # Deleted outside the app: no data version bump, only the tombstone trigger
+    entry = next(row for row in db.tables['journal_entries'] if row['user_id'] == user['id'])
+    db.tables['journal_entries'].remove(entry)
+    db.tables.setdefault('entry_tombstones', []).append({
+        'entry_id': entry['id'], 'user_id': user['id'],
+        'entry_date': entry['entry_date'], 'deleted_at': db.now()
+    })
+
+    response = sync(client, token, etag)
+
+    assert response.status_code == 200
+    assert response.get_json()['deleted'] == [{'id': entry['id'], 'entry_date': entry['entry_date']}]
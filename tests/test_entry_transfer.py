@@ -0,0 +1,75 @@
+import io
+import json
+
+import pytest
+
+import config
+from benchmarks.seed import SYMPTOMS
+from services.entry_transfer import ImportTooLarge, InvalidImport, parse_import
+
+KNOWN = {key for key, _, _ in SYMPTOMS}
+
+
+def ndjson(*records):
+    return io.BytesIO(''.join(json.dumps(record) + '\n' for record in records).encode())
+
+
+def test_missing_stress_stays_missing():
+    [entry] = parse_import(ndjson({'entry_date': '2026-01-01', 'pain_level': 4, 'factors': {'period': True}}),
+                           'ndjson', KNOWN, max_entries=10)
+
+    assert entry['pain_level'] == 4
+    assert entry['factors']['stress'] is None
+    assert entry['factors']['period'] is True
+
+
+def test_missing_pain_level_is_a_line_error():
+    upload = ndjson({'entry_date': '2026-01-01', 'pain_level': 4},
+                    {'entry_date': '2026-01-02', 'factors': {'stress': 2}})
+
+    with pytest.raises(InvalidImport) as error:
+        parse_import(upload, 'ndjson', KNOWN, max_entries=10)
+
+    assert error.value.errors == [{'line': 2, 'error': 'pain_level is required'}]
+
+
+def test_csv_blank_pain_level_and_stress():
+    upload = io.BytesIO(b"entry_date,pain_level,text,stress\n2026-01-01,5,ok,\n2026-01-02,,missing,3\n")
+
+    with pytest.raises(InvalidImport) as error:
+        parse_import(upload, 'csv', KNOWN, max_entries=10)
+
+    assert error.value.errors == [{'line': 3, 'error': 'pain_level is required'}]
+
+
+def test_imported_entry_without_stress_is_stored_as_null(db, client):
+    response = client.post('/api/entries/import?format=ndjson',
+                           data=b'{"entry_date": "2025-03-04", "pain_level": 6}\n',
+                           content_type='application/x-ndjson')
+
+    assert response.status_code == 200, response.get_json()
+    entry = client.get('/api/entries').get_json()['entries'][0]
+    assert entry['pain_level'] == 6
+    assert entry['factors']['stress'] is None
+
+
+def test_chunked_import_over_the_limit_is_rejected_while_reading(db, client, monkeypatch):
+    monkeypatch.setattr(config, 'IMPORT_MAX_BYTES', 1024)
+    body = ndjson(*({'entry_date': f"2025-01-{day:02d}", 'pain_level': 3, 'text': 'x' * 100}
+                    for day in range(1, 29)))
+
+    # No Content-Length: the server only knows the size once it has read the body
+    response = client.post('/api/entries/import?format=ndjson', input_stream=body,
+                           headers={'Transfer-Encoding': 'chunked', 'Content-Type': 'application/x-ndjson'},
+                           environ_overrides={'wsgi.input_terminated': True})
+
+    assert response.status_code == 413
+    assert response.get_json() == {'error': 'Import is larger than 1024 bytes'}
+    assert client.get('/api/entries').get_json()['entries'] == []
+
+
+def test_parse_import_stops_reading_past_max_bytes():
+    upload = ndjson(*({'entry_date': f"2025-01-{day:02d}", 'pain_level': 3} for day in range(1, 29)))
+
+    with pytest.raises(ImportTooLarge):
+        parse_import(upload, 'ndjson', KNOWN, max_entries=100, max_bytes=200)
@@ -0,0 +1,175 @@
+from datetime import date, timedelta
+
+import pytest
+
+import routes.insights
+from services.cache_backend import MemoryBackend
+from services.data_version import data_versions
+from services.gemini_service import ANALYSIS_PROMPT, GeminiService
+from services.insights_cache import InsightsCache
+
+
+class StubChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubStream:
+    def __init__(self, texts):
+        self.texts = texts
+        self.closed = False
+
+    def __iter__(self):
+        for text in self.texts:
+            if self.closed:
+                return
+            yield StubChunk(text)
+
+    def close(self):
+        self.closed = True
+
+
+class StubModels:
+    """Records every call the service makes to genai's client.models"""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.calls = []
+        self.streams = []
+
+    def generate_content(self, model, contents):
+        self.calls.append(('generate_content', model, contents))
+        return StubChunk(''.join(self.texts))
+
+    def generate_content_stream(self, model, contents):
+        self.calls.append(('generate_content_stream', model, contents))
+        stream = StubStream(self.texts)
+        self.streams.append(stream)
+        return stream
+
+
+class StubClient:
+    def __init__(self, texts):
+        self.models = StubModels(texts)
+
+
+@pytest.fixture
+def models(monkeypatch):
+    client = StubClient(['Pain ', 'peaks ', 'with stress.'])
+    monkeypatch.setattr(routes.insights, 'gemini', GeminiService(client=client))
+    return client.models
+
+
+@pytest.fixture
+def entry_date(client):
+    day = (date.today() - timedelta(days=1)).isoformat()
+    response = client.post('/api/entries', json={
+        'entry_date': day,
+        'text': 'Cramps all afternoon',
+        'pain_level': 7,
+        'symptoms': ['headache', 'cramps'],
+        'factors': {'stress': 4}
+    })
+    assert response.status_code == 200, response.get_json()
+    return day
+
+
+def sse_events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((lines['event'], lines['data']))
+    return events
+
+
+def test_stream_sends_the_entries_prompt_and_relays_chunks(client, models, entry_date):
+    response = client.get('/api/insights/stream')
+    events = sse_events(response.get_data(as_text=True))
+
+    assert response.mimetype == 'text/event-stream'
+    assert [name for name, _ in events] == ['meta', 'chunk', 'chunk', 'chunk', 'done']
+    assert [data for name, data in events if name == 'chunk'] == \
+        ['{"text": "Pain "}', '{"text": "peaks "}', '{"text": "with stress."}']
+
+    [(method, model, prompt)] = models.calls
+    assert method == 'generate_content_stream'
+    assert model == routes.insights.gemini.model_name
+    assert prompt.startswith(ANALYSIS_PROMPT.split('{digest}')[0])
+    assert f"{entry_date}|7|cramps,headache|S4" in prompt
+    assert models.streams[0].closed
+
+
+def test_streamed_result_is_cached(client, models, entry_date):
+    client.get('/api/insights/stream').get_data()
+
+    events = sse_events(client.get('/api/insights/stream').get_data(as_text=True))
+
+    assert len(models.calls) == 1
+    assert events[0] == ('meta', '{"cached": true, "entry_count": 1}')
+    assert events[1] == ('chunk', '{"text": "Pain peaks with stress."}')
+
+
+def test_client_disconnect_closes_the_model_stream(client, models, entry_date):
+    response = client.get('/api/insights/stream', buffered=False)
+    body = iter(response.response)
+    next(body)  # meta
+    next(body)  # first chunk
+
+    response.close()
+
+    assert models.streams[0].closed
+
+
+def test_insights_sends_the_same_prompt_without_streaming(client, models, entry_date):
+    response = client.get('/api/insights')
+
+    assert response.status_code == 200
+    assert response.get_json()['insights'] == 'Pain peaks with stress.'
+    [(method, _, prompt)] = models.calls
+    assert method == 'generate_content'
+    assert f"{entry_date}|7|cramps,headache|S4" in prompt
+
+
+def test_no_entries_means_no_model_call(client, models):
+    events = sse_events(client.get('/api/insights/stream').get_data(as_text=True))
+
+    assert events == [('meta', '{"cached": false, "entry_count": 0}'), ('done', '{}')]
+    assert models.calls == []
+
+
+def test_write_through_another_worker_is_not_answered_from_cache(client, models, db, user, entry_date):
+    client.get('/api/insights')
+
+    # Another worker saves the entry: the row and the shared data version
+    # change, but this process's cache is never told
+    [row] = [row for row in db.tables['journal_entries'] if row['user_id'] == user['id']]
+    row['pain_level'] = 3
+    data_versions.bump(user['id'])
+
+    response = client.get('/api/insights')
+
+    assert response.get_json()['cached'] is False
+    assert len(models.calls) == 2
+    assert f"{entry_date}|3|cramps,headache|S4" in models.calls[1][2]
+
+
+def test_unchanged_version_is_answered_without_the_database(client, models, db, entry_date):
+    client.get('/api/insights')
+    db.reset_round_trips()
+
+    response = client.get('/api/insights')
+
+    assert response.get_json()['cached'] is True
+    assert db.round_trips == 0
+    assert len(models.calls) == 1
+
+
+def test_result_is_shared_by_every_worker_on_the_backend():
+    backend = MemoryBackend()
+    first, second = InsightsCache(backend), InsightsCache(backend)
+    first.put(1, 'patterns:90', 'hash', {'insights': 'Pain peaks with stress.'}, 'v1')
+
+    assert second.get_recent(1, 'patterns:90', 'v1') == {'insights': 'Pain peaks with stress.'}
+    assert second.get_recent(1, 'patterns:90', 'v2') is None
+    assert second.get(1, 'patterns:90', 'hash', 'v2') == {'insights': 'Pain peaks with stress.'}
+    assert first.get_recent(1, 'patterns:90', 'v2') == {'insights': 'Pain peaks with stress.'}
@@ -0,0 +1,56 @@
+import os
+
+from services.metrics import MetricsFiles, Registry, merge_snapshots
+
+
+def make_files(directory):
+    registry = Registry()
+    registry.counter('requests', 'Requests')
+    return registry, MetricsFiles(registry, str(directory), flush_seconds=3600)
+
+
+def total(files):
+    merged = merge_snapshots(files.collect())
+    return sum(merged['requests']['series'].values())
+
+
+def test_retired_worker_is_kept_when_its_pid_is_reused(tmp_path):
+    old_registry, old_worker = make_files(tmp_path)
+    old_registry.inc('requests', 5)
+    old_worker.start()
+    old_worker.flush()
+    old_worker.retire()
+    assert not os.path.exists(tmp_path / f"{os.getpid()}.json")
+
+    # A new worker with the same pid writes the same <pid>.json
+    new_registry, new_worker = make_files(tmp_path)
+    new_registry.inc('requests', 2)
+    new_worker.start()
+    new_worker.flush()
+    assert total(new_worker) == 7
+
+
+def test_killed_worker_is_folded_in_by_the_next_with_its_pid(tmp_path):
+    old_registry, old_worker = make_files(tmp_path)
+    old_registry.inc('requests', 5)
+    old_worker.start()
+    old_worker.flush()
+
+    new_registry, new_worker = make_files(tmp_path)
+    new_registry.inc('requests', 2)
+    new_worker.start()
+    new_worker.flush()
+    assert total(new_worker) == 7
+
+
+def test_retired_worker_stops_flushing(tmp_path):
+    registry, worker = make_files(tmp_path)
+    registry.inc('requests', 3)
+    worker.start()
+    worker.retire()
+    registry.inc('requests')
+    worker.flush()
+    assert not os.path.exists(tmp_path / f"{os.getpid()}.json")
+
+    _, scraper = make_files(tmp_path)
+    assert total(scraper) == 3
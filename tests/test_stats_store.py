@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+
+from benchmarks.fake_supabase import FakeSupabase
+from services.stats_store import MAX_BUCKETS, StatsStore
+
+
+def seed_day_buckets(db, user_id, days, end):
+    for offset in range(days):
+        db.insert_row('symptom_stats', {
+            'user_id': user_id,
+            'bucket': 'day',
+            'bucket_start': (end - timedelta(days=offset)).isoformat(),
+            'entry_count': 1,
+            'pain_sum': 4,
+            'stress_count': 1,
+            'stress_sum': 2,
+        })
+
+
+def test_long_history_keeps_the_newest_buckets():
+    db = FakeSupabase()
+    end = date(2026, 10, 18)
+    seed_day_buckets(db, 1, MAX_BUCKETS + 200, end)
+
+    rows, truncated = StatsStore(db).fetch(1, 'day')
+
+    assert truncated
+    assert len(rows) == MAX_BUCKETS
+    assert rows[-1]['bucket_start'] == end.isoformat()
+    assert rows[0]['bucket_start'] == (end - timedelta(days=MAX_BUCKETS - 1)).isoformat()
+    assert [row['bucket_start'] for row in rows] == sorted(row['bucket_start'] for row in rows)
+
+
+def test_short_history_is_complete_and_oldest_first():
+    db = FakeSupabase()
+    end = date(2026, 10, 18)
+    seed_day_buckets(db, 1, 10, end)
+    seed_day_buckets(db, 2, 5, end)
+
+    rows, truncated = StatsStore(db).fetch(1, 'day')
+
+    assert not truncated
+    assert len(rows) == 10
+    assert rows[0]['bucket_start'] == (end - timedelta(days=9)).isoformat()
+    assert rows[-1]['pain_mean'] == 4 and rows[-1]['stress_mean'] == 2
+    assert 'user_id' not in rows[-1]
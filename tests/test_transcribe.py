@@ -0,0 +1,126 @@
+import io
+import os
+import time
+
+import pytest
+
+from benchmarks.mock_stt_server import MockSTTHandler
+from routes.transcribe import transcription_jobs
+from services.transcription_jobs import EXPIRED_ERROR
+
+
+@pytest.fixture
+def handler(stt):
+    """The mock STT server's handler class, reset after the test"""
+    handler = stt.RequestHandlerClass
+    yield handler
+    handler.fail_next = 0
+    handler.status = 200
+
+
+def upload(client, audio, path='/api/transcribe'):
+    return client.post(path, data={'audio': (io.BytesIO(audio), 'audio.webm', 'audio/webm')},
+                       content_type='multipart/form-data')
+
+
+def test_transcribes_a_multipart_upload(client, handler):
+    before = handler.requests_seen
+    audio = os.urandom(4096)
+
+    response = upload(client, audio)
+
+    assert response.status_code == 200
+    assert response.get_json() == {'transcript': MockSTTHandler.transcript}
+    assert handler.requests_seen - before == 1
+
+
+def test_retries_after_a_503(client, handler):
+    before = handler.requests_seen
+    handler.fail_next = 1
+
+    response = upload(client, os.urandom(4096))
+
+    assert response.status_code == 200
+    assert response.get_json()['transcript'] == MockSTTHandler.transcript
+    assert handler.requests_seen - before == 2
+
+
+def test_raw_body_is_retried_too(client, handler):
+    before = handler.requests_seen
+    handler.fail_next = 1
+
+    response = client.post('/api/transcribe', data=os.urandom(4096), content_type='audio/webm')
+
+    assert response.status_code == 200
+    assert handler.requests_seen - before == 2
+
+
+def test_client_errors_are_not_retried(client, handler):
+    before = handler.requests_seen
+    handler.status = 400
+
+    response = upload(client, os.urandom(4096))
+
+    assert response.status_code == 500
+    assert response.get_json() == {'error': 'Transcription failed'}
+    assert handler.requests_seen - before == 1
+
+
+def test_repeated_upload_is_answered_from_the_cache(client, handler):
+    audio = os.urandom(4096)
+    upload(client, audio)
+    before = handler.requests_seen
+
+    response = upload(client, audio)
+
+    assert response.get_json()['transcript'] == MockSTTHandler.transcript
+    assert handler.requests_seen == before
+
+
+def test_job_runs_in_the_background_and_can_be_polled(client, handler):
+    response = upload(client, os.urandom(4096), '/api/transcribe/jobs')
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job['status'] in ('queued', 'running')
+
+    assert transcription_jobs.wait(job['id'], 10)
+    polled = client.get(f"/api/transcribe/jobs/{job['id']}").get_json()
+
+    assert polled['status'] == 'done'
+    assert polled['transcript'] == MockSTTHandler.transcript
+
+
+def test_job_events_stream_the_result(client, handler):
+    job = upload(client, os.urandom(4096), '/api/transcribe/jobs').get_json()
+
+    response = client.get(f"/api/transcribe/jobs/{job['id']}/events")
+    body = response.get_data(as_text=True)
+
+    assert response.mimetype == 'text/event-stream'
+    assert body.startswith('event: status\n')
+    assert 'event: result\n' in body and MockSTTHandler.transcript in body
+
+
+def test_jobs_are_private_to_their_user(app, client, handler):
+    job = upload(client, os.urandom(4096), '/api/transcribe/jobs').get_json()
+    transcription_jobs.wait(job['id'], 10)
+
+    assert app.test_client().get(f"/api/transcribe/jobs/{job['id']}").status_code == 401
+
+
+def test_job_lost_with_its_process_ends_the_event_stream(db, client, user):
+    # Queued by a worker that then crashed: only the database row is left
+    db.insert_row('transcription_jobs', {
+        'id': 'lost-job',
+        'user_id': user['id'],
+        'status': 'running',
+        'data': {'id': 'lost-job', 'status': 'running', 'transcript': None, 'error': None,
+                 'created_at': time.time() - transcription_jobs.max_job_seconds - 1},
+        'updated_at': db.now()
+    })
+
+    body = client.get('/api/transcribe/jobs/lost-job/events').get_data(as_text=True)
+
+    assert 'event: result\n' in body
+    assert f'"error": "{EXPIRED_ERROR}"' in body
+    assert client.get('/api/transcribe/jobs/lost-job').get_json()['status'] == 'failed'
@@ -0,0 +1,188 @@
+"""
+Offline batch job that writes Gemini daily summaries for journal entries.
+
+Finds entries with no summary (or one older than the entry's last edit),
+summarizes them with bounded concurrency under a requests-per-minute limit,
+and upserts each batch into entry_summaries as soon as it finishes. The
+pending query only returns entries that still need work, so re-running
+after a crash or Ctrl-C resumes where the last saved batch left off.
+
+    python -m workers.daily_summaries                  # everything pending
+    python -m workers.daily_summaries --date 2026-10-18
+    python -m workers.daily_summaries --since 2026-10-01 --concurrency 8 --rpm 120
+
+Meant for cron or a scheduled job, e.g. every 15 minutes.
+"""
+import argparse
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+
+import config
+from services.entry_store import EntryStore
+from services.gemini_service import GeminiService
+from services.logging_setup import configure_logging
+from services.summary_store import SummaryStore, DEFAULT_BATCH_SIZE
+from services.supabase_service import supabase_client
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RPM = 60
+DEFAULT_MAX_RETRIES = 3
+
+# Backoff between retries of one entry, in seconds
+RETRY_BACKOFF_BASE = 2.0
+RETRY_BACKOFF_MAX = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Spaces calls at least 60/rpm seconds apart across all worker threads"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class SummaryWorker:
+    def __init__(self, gemini, entry_store, summary_store,
+                 batch_size=DEFAULT_BATCH_SIZE, concurrency=DEFAULT_CONCURRENCY,
+                 rpm=DEFAULT_RPM, max_retries=DEFAULT_MAX_RETRIES):
+        self.gemini = gemini
+        self.entry_store = entry_store
+        self.summary_store = summary_store
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rpm)
+        self.max_retries = max_retries
+        self.counts = {'summarized': 0, 'failed': 0, 'batches': 0}
+
+    def _summarize(self, entry):
+        """Summary text for one entry, retrying model errors with backoff"""
+        prompt = self.gemini.build_daily_prompt(entry)
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                text = self.gemini.complete(prompt)
+                if text:
+                    return text
+                raise ValueError("Empty response")
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.0)
+                logger.warning("Entry %s attempt %d failed (%s); retrying in %.1fs", entry['id'], attempt + 1, e, delay)
+                time.sleep(delay)
+
+    def _run_batch(self, rows, executor):
+        """Summarize one batch and save whatever finished, even if interrupted"""
+        updated_at = {row['id']: row.get('updated_at') for row in rows}
+        entries = self.entry_store.fetch_by_ids(list(updated_at))
+        done = []
+        try:
+            futures = {executor.submit(self._summarize, entry): entry for entry in entries}
+            for future in as_completed(futures):
+                entry = futures[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    self.counts['failed'] += 1
+                    logger.error("Entry %s not summarized: %s", entry['id'], e)
+                    continue
+                done.append({
+                    'entry_id': entry['id'],
+                    'summary': text,
+                    'model': self.gemini.model_name,
+                    # The version that was read, so later edits make it stale
+                    'entry_updated_at': updated_at[entry['id']]
+                })
+        finally:
+            self.summary_store.save_many(done)
+            self.counts['summarized'] += len(done)
+            self.counts['batches'] += 1
+
+    def run(self, date_from=None, date_to=None, limit=None):
+        """
+        Summarize every pending entry in the date range, oldest id first.
+        Entries that fail are left pending for the next run.
+        """
+        after_id = 0
+        seen = 0
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            while limit is None or seen < limit:
+                size = self.batch_size if limit is None else min(self.batch_size, limit - seen)
+                rows = self.summary_store.pending(after_id, size, date_from, date_to)
+                if not rows:
+                    break
+                self._run_batch(rows, executor)
+                after_id = rows[-1]['id']
+                seen += len(rows)
+                logger.info("%d summarized, %d failed", self.counts['summarized'], self.counts['failed'])
+        finally:
+            # On Ctrl-C, don't start model calls that would never be saved
+            executor.shutdown(wait=False, cancel_futures=True)
+        return self.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    window = parser.add_mutually_exclusive_group()
+    window.add_argument('--date', help='only entries for this day (YYYY-MM-DD)')
+    window.add_argument('--since', help='only entries on or after this day (YYYY-MM-DD)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int,
+                        default=config.SUMMARY_WORKER_CONCURRENCY)
+    parser.add_argument('--rpm', type=int, default=config.SUMMARY_WORKER_RPM,
+                        help='maximum model calls per minute (0 = unlimited)')
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES)
+    parser.add_argument('--limit', type=int, help='stop after this many entries')
+    args = parser.parse_args()
+    configure_logging(config.LOG_LEVEL, config.LOG_FORMAT)
+
+    for value in (args.date, args.since):
+        try:
+            value and date.fromisoformat(value)
+        except ValueError:
+            parser.error(f"invalid date: {value}")
+
+    if not supabase_client:
+        parser.exit(1, "Supabase is not available, check SUPABASE_URL / SUPABASE_KEY\n")
+    worker = SummaryWorker(
+        GeminiService(),
+        EntryStore(supabase_client),
+        SummaryStore(supabase_client),
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        rpm=args.rpm,
+        max_retries=args.max_retries
+    )
+
+    started = time.monotonic()
+    try:
+        counts = worker.run(
+            date_from=args.date or args.since,
+            date_to=args.date,
+            limit=args.limit
+        )
+    except KeyboardInterrupt:
+        counts = worker.counts
+        logger.warning("Interrupted; finished summaries were saved, re-run to continue")
+    print(f"✅ Done in {time.monotonic() - started:.1f}s: {counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+"""
+WSGI entry point for production servers:
+
+    gunicorn wsgi:app
+
+Settings live in gunicorn.conf.py. `python app.py` is for local development only.
+"""
+from app import app